@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Cross-Validation Runner for Econ Research Workflow
+==================================================
+
+Re-estimates every specification listed in one or more manifests with
+Python and compares coefficients, SEs, R² and N against the Stata results
+(PASS/FAIL per tolerance). Each dataset is loaded once and shared by all
+specs that use it.
+
+Usage:
+  python scripts/cross_validate.py v1/code/python/crossval.json
+  python scripts/cross_validate.py tests/*/crossval.json --json
+  python scripts/cross_validate.py crossval.json --only twfe_controls
+"""
+
+import sys
+
+from crossval import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Manifest-driven Stata vs Python cross-validation.
+
+Usage:
+  python scripts/cross_validate.py tests/test1-did/crossval.json
+  python scripts/cross_validate.py v1/code/python/crossval.json --json
+  python scripts/cross_validate.py crossval.json --only twfe_controls
+  python scripts/cross_validate.py crossval.json --no-batch   # one fit per spec
+  python scripts/cross_validate.py --extract output/logs/03_did_main.log
+  python scripts/cross_validate.py crossval.json --cache-dir /tmp/cv   # or --no-cache
+  python scripts/cross_validate.py tests/ -j 32   # every crossval.json below tests/
+  python scripts/cross_validate.py crossval.json --crosscheck numpy
+
+Specs sharing data, sample, weights, fixed effects and vcov are estimated
+together from one demeaning pass (see batch.py). Datasets are read through a
+Parquet cache holding only the columns the specs use (see data.py). Batches
+and single specs of all manifests run in one process pool (see parallel.py).
+The ``numpy`` backend (numpy_backend.py) re-fits specs independently of
+pyfixest and takes over when pyfixest cannot be imported; bootstrap.py adds
+wild cluster bootstrap p-values to compare with ``boottest``, and
+staggered.py Callaway-Sant'Anna ATTs and Bacon decompositions to compare with
+``csdid`` and ``bacondecomp``; rdd.py fits sharp RD designs as ``rdrobust``
+does, and iv.py adds LIML and weak-instrument diagnostics to IV specs.
+"""
+
+from .backends import BACKENDS, BackendUnavailable, fit_spec, get_backend
+from .batch import fit_batch, plan_batches
+from .bootstrap import wild_cluster_bootstrap
+from .cli import main
+from .data import ColumnarCache, DataStore, data_fingerprint, read_dataset
+from .engine import compare, run_manifest, run_spec, summarize
+from .iv import IVModel, fit_iv
+from .manifest import DEFAULT_TOLERANCE, ManifestError, load_manifest, resolve_reference
+from .numpy_backend import fit_numpy
+from .parallel import discover, run_manifests
+from .rdd import RDData, density_test, fit_rdd
+from .report import print_report
+from .staggered import bacon_decomposition, fit_staggered, group_time_att
+from .stata import load_results, parse_log, read_estimates
+
+__all__ = [
+    "BACKENDS", "BackendUnavailable", "ColumnarCache", "DEFAULT_TOLERANCE",
+    "DataStore", "IVModel", "ManifestError", "RDData", "bacon_decomposition",
+    "compare", "data_fingerprint", "density_test", "discover", "fit_batch", "fit_iv", "fit_numpy",
+    "fit_rdd", "fit_spec", "fit_staggered", "get_backend", "group_time_att",
+    "load_manifest", "load_results", "main", "parse_log", "plan_batches",
+    "print_report", "read_dataset", "read_estimates", "resolve_reference",
+    "run_manifest", "run_manifests", "run_spec", "summarize",
+    "wild_cluster_bootstrap",
+]
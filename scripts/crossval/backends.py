@@ -0,0 +1,96 @@
+"""
+Python estimation backends for cross-validation.
+
+A backend takes a DataFrame and a normalized spec and returns an estimate:
+
+    {"coef": {term: b}, "se": {term: se}, "n": N, "r2": R2, "r2_within": R2w}
+
+``r2_within`` is None for models without absorbed fixed effects, and both
+R² are None for IV models.
+
+``pyfixest`` is the default; ``numpy`` (numpy_backend.py) is an independent
+implementation used to cross-check it and as the fallback when pyfixest
+cannot be imported. ``staggered`` (staggered.py) fits specs with a ``did``
+block: Callaway-Sant'Anna ATT aggregations or a Bacon decomposition.
+``rdd`` (rdd.py) fits specs with an ``rdd`` block: sharp RD estimates as in
+``rdrobust``, with the bandwidth used as ``h``. ``iv`` (iv.py) fits IV
+specs with an ``iv`` block by 2SLS or LIML and adds the weak-instrument and
+overidentification statistics ``fs_f``, ``kp_f``, ``hansen_j`` and ``ar_f``.
+"""
+
+import math
+
+from .iv import fit_iv
+from .numpy_backend import fit_numpy
+from .rdd import fit_rdd
+from .staggered import fit_staggered
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised when a backend's estimation library cannot be imported."""
+
+
+def _import_pyfixest():
+    try:
+        import pyfixest
+    except ImportError as e:
+        raise BackendUnavailable(
+            "pyfixest not installed. Run: pip install pyfixest") from e
+    return pyfixest
+
+
+def _statistic(value) -> float | None:
+    if value is None or math.isnan(value):
+        return None
+    return float(value)
+
+
+def estimate_from_pyfixest(model) -> dict:
+    """Collect the compared quantities from a fitted pyfixest model."""
+    coef = model.coef()
+    se = model.se()
+    return {
+        "coef": {k: float(v) for k, v in coef.items()},
+        "se": {k: float(v) for k, v in se.items()},
+        "n": int(model._N),
+        "r2": _statistic(model._r2),
+        "r2_within": _statistic(getattr(model, "_r2_within", None)),
+    }
+
+
+def fit_pyfixest(df, spec: dict) -> dict:
+    pf = _import_pyfixest()
+    model = pf.feols(spec["formula"], data=df, vcov=spec["vcov"],
+                     weights=spec["weights"])
+    return estimate_from_pyfixest(model)
+
+
+BACKENDS = {
+    "pyfixest": fit_pyfixest,
+    "numpy": fit_numpy,
+    "staggered": fit_staggered,
+    "rdd": fit_rdd,
+    "iv": fit_iv,
+}
+
+# Backend used when the requested one cannot be imported
+FALLBACK = {"pyfixest": "numpy"}
+
+
+def get_backend(name: str):
+    if name not in BACKENDS:
+        raise BackendUnavailable(
+            f"unknown backend '{name}' (available: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]
+
+
+def fit_spec(df, spec: dict, backend: str | None = None) -> tuple[dict, str]:
+    """Fit ``spec`` with ``backend`` (default: the spec's); returns (estimate, backend used)."""
+    name = backend or spec["backend"]
+    try:
+        return get_backend(name)(df, spec), name
+    except BackendUnavailable:
+        if name not in FALLBACK:
+            raise
+        fallback = FALLBACK[name]
+        return get_backend(fallback)(df, spec), f"{fallback} ({name} unavailable)"
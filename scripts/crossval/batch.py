@@ -0,0 +1,262 @@
+"""
+Batched estimation of specifications that share fixed effects.
+
+Robustness tables re-estimate the same ``| fe1 + fe2`` model with many
+regressor sets and outcomes. Fitting them one by one rebuilds the model
+matrix and re-demeans the same columns for every variant. Here specs are
+grouped by (dataset, subset, weights, fixed effects, vcov); each group's
+estimation sample is built once, the union of its columns is demeaned in a
+single alternating-projections call, and every variant is then solved from
+sub-blocks of one Gram matrix.
+
+The results reproduce ``pyfixest.feols`` defaults: singleton observations
+dropped, small-sample factor (N-1)/(N-k) with fixed effects nested in the
+cluster variable not counted in k, and G/(G-1) for CRV1. Specs that do not
+fit this mould (IV, interactions, collinear regressors, ...) are returned as
+None so the caller fits them individually.
+"""
+
+import json
+import re
+import time
+
+import numpy as np
+
+NAME = re.compile(r"^[A-Za-z_]\w*$")
+
+# Reciprocal condition number below which a variant is handed back to the
+# full estimator, which knows how to drop collinear regressors
+COLLINEARITY_RCOND = 1e-9
+
+
+def parse_formula(formula: str) -> tuple[str, list[str], list[str]] | None:
+    """Split ``y ~ x1 + x2 | fe1 + fe2`` into (y, [x...], [fe...]).
+
+    Returns None for anything beyond plain variable names with absorbed
+    fixed effects.
+    """
+    parts = formula.split("|")
+    if len(parts) != 2 or "~" not in parts[0]:
+        return None
+    lhs, rhs = parts[0].split("~", 1)
+    depvar = lhs.strip()
+    regressors = [t.strip() for t in rhs.split("+")]
+    fixef = [t.strip() for t in parts[1].split("+")]
+    if not all(NAME.match(t) for t in (depvar, *regressors, *fixef)):
+        return None
+    if len(set(regressors)) != len(regressors) or depvar in regressors:
+        return None
+    return depvar, regressors, fixef
+
+
+def vcov_kind(vcov) -> tuple[str, str | None] | None:
+    if vcov == "iid":
+        return "iid", None
+    if vcov in ("hetero", "HC1"):
+        return "hetero", None
+    if isinstance(vcov, dict) and set(vcov) == {"CRV1"} and NAME.match(vcov["CRV1"]):
+        return "CRV1", vcov["CRV1"]
+    return None
+
+
+def batch_key(spec: dict) -> tuple | None:
+    """Grouping key of a spec, or None when it must be fitted on its own."""
+    if spec["backend"] != "pyfixest":
+        return None
+    parsed = parse_formula(spec["formula"])
+    if parsed is None or vcov_kind(spec["vcov"]) is None:
+        return None
+    return (spec["data"], spec["subset"], spec["weights"], tuple(parsed[2]),
+            json.dumps(spec["vcov"], sort_keys=True))
+
+
+def plan_batches(specs: list[dict]) -> tuple[list[list[dict]], list[dict]]:
+    """Partition specs into batches (two or more specs) and singles."""
+    groups = {}
+    singles = []
+    for spec in specs:
+        key = batch_key(spec)
+        if key is None:
+            singles.append(spec)
+        else:
+            groups.setdefault(key, []).append(spec)
+    batches = [g for g in groups.values() if len(g) > 1]
+    singles += [g[0] for g in groups.values() if len(g) == 1]
+    return batches, singles
+
+
+# ---------------------------------------------------------------------------
+# Sample construction
+# ---------------------------------------------------------------------------
+
+def drop_singletons(codes: np.ndarray) -> np.ndarray:
+    """Mask of rows kept after iteratively removing singleton FE levels."""
+    keep = np.ones(len(codes), dtype=bool)
+    while True:
+        changed = False
+        for j in range(codes.shape[1]):
+            counts = np.bincount(codes[keep, j], minlength=codes[:, j].max() + 1)
+            singleton = keep & (counts[codes[:, j]] == 1)
+            if singleton.any():
+                keep &= ~singleton
+                changed = True
+        if not changed:
+            return keep
+
+
+def factorize_columns(df, columns: list[str]) -> np.ndarray:
+    import pandas as pd
+
+    return np.column_stack([pd.factorize(df[c], sort=False)[0] for c in columns])
+
+
+def nested_in(fe_codes: np.ndarray, cluster_codes: np.ndarray) -> np.ndarray:
+    """Flag each FE whose levels all sit inside a single cluster."""
+    flags = []
+    for j in range(fe_codes.shape[1]):
+        # Any cluster seen with each level; nested iff every row agrees with it
+        seen = np.empty(fe_codes[:, j].max() + 1, dtype=cluster_codes.dtype)
+        seen[fe_codes[:, j]] = cluster_codes
+        flags.append(bool((seen[fe_codes[:, j]] == cluster_codes).all()))
+    return np.array(flags)
+
+
+def cluster_sums(values: np.ndarray, cluster_codes: np.ndarray) -> np.ndarray:
+    """Column sums of ``values`` within each cluster (clusters x columns)."""
+    g = cluster_codes.max() + 1
+    return np.column_stack([np.bincount(cluster_codes, weights=values[:, j], minlength=g)
+                            for j in range(values.shape[1])])
+
+
+def model_df(k: int, k_fe: np.ndarray, nested: np.ndarray, kind: str) -> int:
+    """Parameters counted in the small-sample factor (pyfixest's default ssc)."""
+    if len(k_fe) == 0:
+        return k
+    df_k = k + int(k_fe.sum()) - (len(k_fe) - 1)
+    if kind == "CRV1":
+        df_k -= int(k_fe[nested].sum()) - int(nested.sum())
+    return df_k
+
+
+def sandwich(bread: np.ndarray, scores: np.ndarray, u: np.ndarray, n: int, df_k: int,
+             kind: str, cluster_codes: np.ndarray | None) -> np.ndarray:
+    """Variance matrix of a (2S)LS fit from its bread and score regressors."""
+    if kind == "iid":
+        return bread * float(u @ u) / (n - df_k)
+    if kind == "hetero":
+        s = scores * u[:, None]
+        return bread @ (s.T @ s) @ bread * n / (n - df_k)
+    s = cluster_sums(scores * u[:, None], cluster_codes)
+    g = len(s)
+    adj = (n - 1) / (n - df_k) * g / (g - 1)
+    return bread @ (s.T @ s) @ bread * adj
+
+
+def demean(x: np.ndarray, codes: np.ndarray, weights: np.ndarray,
+           tol: float = 1e-8, maxiter: int = 10_000) -> np.ndarray:
+    """Alternating-projections demeaning of every column of ``x`` at once.
+
+    Uses pyfixest's compiled routine when available, the NumPy one otherwise.
+    """
+    try:
+        from pyfixest.core.demean import demean as demean_rs
+    except ImportError:
+        from .numpy_backend import FixedEffects
+
+        return FixedEffects(codes, weights).demean(x, tol, maxiter)
+
+    demeaned, converged = demean_rs(np.asfortranarray(x), codes.astype(np.uint64),
+                                    weights, tol, maxiter)
+    if not converged:
+        raise RuntimeError("fixed-effect demeaning did not converge")
+    return demeaned
+
+
+# ---------------------------------------------------------------------------
+# Solving a group
+# ---------------------------------------------------------------------------
+
+class SharedDesign:
+    """Demeaned union of a group's columns on one estimation sample."""
+
+    def __init__(self, df, columns: list[str], fixef: list[str], weights: str | None,
+                 cluster: str | None):
+        codes = factorize_columns(df, fixef)
+        keep = drop_singletons(codes)
+        df = df.loc[keep]
+        self.codes = factorize_columns(df, fixef)
+        self.n = len(df)
+        self.columns = {c: i for i, c in enumerate(columns)}
+        w = (df[weights].to_numpy(np.float64) if weights
+             else np.ones(self.n, dtype=np.float64))
+        raw = df[columns].to_numpy(np.float64)
+        self.sqrt_w = np.sqrt(w)
+        self.z = demean(raw, self.codes, w) * self.sqrt_w[:, None]
+        self.gram = self.z.T @ self.z
+        # Total sum of squares around the weighted mean, per column
+        mean = np.average(raw, axis=0, weights=w)
+        self.tss = (w[:, None] * (raw - mean) ** 2).sum(axis=0)
+
+        self.k_fe = self.codes.max(axis=0) + 1
+        self.cluster_codes = None
+        self.nested = np.zeros(len(fixef), dtype=bool)
+        if cluster is not None:
+            self.cluster_codes = factorize_columns(df, [cluster])[:, 0]
+            self.nested = nested_in(self.codes, self.cluster_codes)
+
+    def solve(self, depvar: str, regressors: list[str], kind: str) -> dict | None:
+        iy = self.columns[depvar]
+        ix = [self.columns[x] for x in regressors]
+        xtx = self.gram[np.ix_(ix, ix)]
+        scale = np.sqrt(np.diag(xtx))
+        if np.any(scale == 0):
+            return None
+        if 1 / np.linalg.cond(xtx / np.outer(scale, scale)) < COLLINEARITY_RCOND:
+            return None
+        bread = np.linalg.inv(xtx)
+        beta = bread @ self.gram[ix, iy]
+        x = self.z[:, ix]
+        u = self.z[:, iy] - x @ beta
+        ssr = float(u @ u)
+
+        df_k = model_df(len(ix), self.k_fe, self.nested, kind)
+        vcov = sandwich(bread, x, u, self.n, df_k, kind, self.cluster_codes)
+        se = np.sqrt(np.diag(vcov))
+        return {
+            "coef": dict(zip(regressors, map(float, beta))),
+            "se": dict(zip(regressors, map(float, se))),
+            "n": self.n,
+            "r2": 1 - ssr / float(self.tss[iy]),
+            "r2_within": 1 - ssr / float(self.gram[iy, iy]),
+        }
+
+
+def fit_batch(df, specs: list[dict]) -> tuple[list[dict | None], float]:
+    """Estimate a group of specs sharing fixed effects, sample and weights.
+
+    Returns one estimate per spec (None where the spec needs the full
+    estimator) and the wall time spent.
+    """
+    start = time.perf_counter()
+    parsed = [parse_formula(s["formula"]) for s in specs]
+    kind, cluster = vcov_kind(specs[0]["vcov"])
+    fixef = parsed[0][2]
+    weights = specs[0]["weights"]
+    extra = fixef + [c for c in (cluster, weights) if c]
+
+    # Listwise deletion differs by variable set, so specs are solved on
+    # shared designs per missing-value pattern
+    by_sample = {}
+    for i, (depvar, regressors, _) in enumerate(parsed):
+        used = [depvar, *regressors]
+        mask = df[used + extra].notna().all(axis=1).to_numpy()
+        by_sample.setdefault(np.packbits(mask).tobytes(), (mask, []))[1].append(i)
+
+    estimates = [None] * len(specs)
+    for mask, members in by_sample.values():
+        columns = sorted({c for i in members for c in (parsed[i][0], *parsed[i][1])})
+        design = SharedDesign(df.loc[mask], columns, fixef, weights, cluster)
+        for i in members:
+            depvar, regressors, _ = parsed[i]
+            estimates[i] = design.solve(depvar, regressors, kind)
+    return estimates, time.perf_counter() - start
@@ -0,0 +1,116 @@
+"""
+Command-line entry point for manifest-driven cross-validation.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .data import make_cache
+from .manifest import ManifestError, load_manifest
+from .parallel import discover, run_manifests
+from .report import print_report, print_summary
+from .stata import load_results
+
+
+def print_extracted(path: str) -> None:
+    """List the models found in a Stata log or export."""
+    index = load_results(path)
+    models = {id(m): m for m in index.values()}
+    print(f"{path}: {len(models)} model(s)")
+    for model in models.values():
+        names = [k for k, v in index.items() if v is model]
+        n = f"N={model['n']:.0f}" if model.get("n") is not None else ""
+        print(f"  {' / '.join(names):32s} {model['command']:12s} {n:10s} "
+              f"{len(model['coef'])} terms")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Cross-validate Stata estimates against Python re-estimation")
+    parser.add_argument("manifest", nargs="*",
+                        help="Cross-validation manifest(s) (JSON), or directories "
+                             "searched for crossval.json")
+    parser.add_argument("--extract", action="append", default=[], metavar="FILE",
+                        help="List the models found in a Stata .log or .dta export")
+    parser.add_argument("--only", action="append", metavar="SPEC",
+                        help="Run only the named spec (repeatable)")
+    parser.add_argument("--no-batch", action="store_true",
+                        help="Fit every spec separately instead of sharing FE demeaning")
+    parser.add_argument("--crosscheck", action="append", default=[], metavar="BACKEND",
+                        help="Also fit every spec with BACKEND (e.g. numpy) and compare")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Worker processes for the spec fits (default: all cores)")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Directory for the Parquet dataset cache "
+                             "(default: .crossval_cache/ beside each dataset)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Read .dta files directly instead of through the cache")
+    parser.add_argument("--allow-skip", action="store_true",
+                        help="Exit 0 when a manifest has no spec compared against Stata "
+                             "(default: exit 3)")
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    args = parser.parse_args(argv)
+    if not args.manifest and not args.extract:
+        parser.error("give at least one manifest or --extract FILE")
+
+    if args.extract:
+        results = {}
+        for path in args.extract:
+            try:
+                results[path] = load_results(path)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: {path}: {e}", file=sys.stderr)
+                return 2
+        if args.json:
+            print(json.dumps({p: {k: m for k, m in index.items()}
+                              for p, index in results.items()},
+                             indent=2, ensure_ascii=False))
+        else:
+            for path in args.extract:
+                print_extracted(path)
+        if not args.manifest:
+            return 0
+
+    paths = []
+    for target in args.manifest:
+        found = discover(target) if Path(target).is_dir() else [Path(target)]
+        if not found:
+            print(f"ERROR: no crossval.json under {target}", file=sys.stderr)
+            return 2
+        paths += found
+    try:
+        manifests = [load_manifest(path) for path in paths]
+    except ManifestError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    for manifest in manifests:
+        for spec in manifest["specs"]:
+            if (spec["rdd"] or spec["did"] and spec["did"]["aggregate"] != "bacon"
+                    or spec["iv"] and spec["iv"]["estimator"] != "2sls"):
+                continue  # RD, ATT and LIML estimates have no regression counterpart
+            spec["crosscheck"] += [b for b in args.crosscheck if b not in spec["crosscheck"]]
+
+    summary = run_manifests(manifests, jobs=args.jobs, only=args.only,
+                            batch=not args.no_batch,
+                            cache=make_cache(args.cache_dir, enabled=not args.no_cache))
+    reports = summary["manifests"]
+
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        for report in reports:
+            print_report(report)
+        if len(reports) > 1:
+            print_summary(summary)
+
+    if summary["status"] == "FAIL":
+        return 1
+    # Every spec of these skipped: no Stata reference was found for any of them
+    unchecked = [r["name"] for r in reports if r["status"] == "SKIP"]
+    if unchecked and not args.allow_skip:
+        print(f"ERROR: nothing compared against Stata in {', '.join(unchecked)} "
+              "(--allow-skip to accept)", file=sys.stderr)
+        return 3
+    return 0
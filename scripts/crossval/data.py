@@ -0,0 +1,260 @@
+"""
+Columnar dataset cache.
+
+``pd.read_stata`` parses the whole row-oriented .dta file on every run, even
+when a manifest only touches a handful of its columns. The first time a
+dataset is used it is converted to Parquet under ``.crossval_cache/`` next
+to it (or ``--cache-dir``), with string columns dictionary-encoded so that
+FE identifiers are stored once per level; later runs memory-map the Parquet
+file and read only the columns the specs reference.
+
+Cache files are keyed by the SHA-256 of the source, so an edited dataset is
+converted again and identical copies share one entry. As in the scorer's
+ResultCache, (size, mtime) is checked first and unchanged sources are never
+re-hashed. Without pyarrow everything falls back to ``pd.read_stata``.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+CACHE_DIR_NAME = ".crossval_cache"
+CACHE_VERSION = 1
+ROW_GROUP_ROWS = 1_000_000
+IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of a file, read in bounded chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Parquet cache
+# ---------------------------------------------------------------------------
+
+class ColumnarCache:
+    """Parquet copies of .dta files, converted once and read by column.
+
+    ``cache_dir=None`` keeps each cache beside its source dataset.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.conversions = 0
+
+    def _dir(self, source: Path) -> Path:
+        return self.cache_dir if self.cache_dir is not None else source.parent / CACHE_DIR_NAME
+
+    def _digest(self, source: Path, directory: Path) -> str:
+        """SHA-256 of the source, reusing the stored one while its stat is unchanged."""
+        index_path = directory / "index.json"
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = {}
+        st = source.stat()
+        key = str(source.resolve())
+        entry = index.get(key)
+        if entry and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return entry["sha256"]
+        digest = file_digest(source)
+        index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        tmp = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, indent=1), encoding="utf-8")
+        os.replace(tmp, index_path)
+        return digest
+
+    def _convert(self, source: Path, parquet: Path, meta_path: Path) -> dict:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        start = time.perf_counter()
+        frame = pd.read_stata(source)
+        for column in frame.columns:
+            if frame[column].dtype == object or isinstance(frame[column].dtype, pd.StringDtype):
+                frame[column] = frame[column].astype("category")
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp = parquet.with_name(f"{parquet.name}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS)
+        os.replace(tmp, parquet)
+        meta = {"version": CACHE_VERSION, "source": str(source), "rows": len(frame),
+                "columns": list(frame.columns),
+                "seconds": round(time.perf_counter() - start, 3)}
+        meta_path.write_text(json.dumps(meta, indent=1), encoding="utf-8")
+        self.conversions += 1
+        return meta
+
+    def ensure(self, source: str | Path) -> tuple[Path, dict]:
+        """Path of the Parquet copy of ``source`` and its metadata, converting if needed."""
+        source = Path(source)
+        directory = self._dir(source)
+        directory.mkdir(parents=True, exist_ok=True)
+        digest = self._digest(source, directory)[:24]
+        parquet = directory / f"{digest}.parquet"
+        meta_path = directory / f"{digest}.json"
+        if parquet.exists() and meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                meta = {}
+            if meta.get("version") == CACHE_VERSION:
+                return parquet, meta
+        return parquet, self._convert(source, parquet, meta_path)
+
+    def read(self, source: str | Path, columns: list[str] | None = None):
+        """Load ``columns`` (all when None) of ``source`` as a DataFrame."""
+        import pyarrow.parquet as pq
+
+        parquet, meta = self.ensure(source)
+        if columns is not None:
+            missing = set(columns) - set(meta["columns"])
+            if missing:
+                raise KeyError(f"{source}: no column(s) {sorted(missing)}")
+        return pq.read_table(parquet, columns=columns, memory_map=True).to_pandas()
+
+
+def make_cache(cache_dir: str | Path | None = None,
+               enabled: bool = True) -> ColumnarCache | None:
+    """A ColumnarCache, or None when disabled or pyarrow is not installed."""
+    if not enabled or not pyarrow_available():
+        return None
+    return ColumnarCache(cache_dir)
+
+
+def read_dataset(path: str | Path, columns: list[str] | None = None,
+                 cache_dir: str | Path | None = None):
+    """Read a .dta file through the columnar cache (for analysis and test scripts)."""
+    cache = make_cache(cache_dir)
+    if cache is not None:
+        try:
+            return cache.read(path, columns)
+        except OSError as e:
+            print(f"warning: dataset cache unavailable ({e}); reading {path} directly",
+                  file=sys.stderr)
+    import pandas as pd
+
+    return pd.read_stata(path, columns=columns)
+
+
+# ---------------------------------------------------------------------------
+# Column selection
+# ---------------------------------------------------------------------------
+
+def spec_names(spec: dict) -> set[str]:
+    """Every identifier a spec may use as a column.
+
+    Over-inclusive on purpose (function names in ``C(x)`` or ``log(y)``,
+    query keywords); callers intersect with the dataset's columns.
+    """
+    names = set(IDENTIFIER.findall(spec["formula"]))
+    if spec.get("subset"):
+        names.update(IDENTIFIER.findall(spec["subset"]))
+    if spec.get("weights"):
+        names.add(spec["weights"])
+    vcov = spec.get("vcov")
+    if isinstance(vcov, dict):
+        for value in vcov.values():
+            names.update(IDENTIFIER.findall(str(value)))
+    did = spec.get("did")
+    if did:
+        names.update(did[k] for k in ("ivar", "time", "gvar") if k in did)
+    return names
+
+
+def data_fingerprint(df, spec: dict) -> str:
+    """SHA-256 of the values of the spec's columns of ``df``, in row order.
+
+    Numeric columns are hashed as float64, so the storage types a .dta file
+    happens to use (e.g. after Stata's ``compress``) do not change it; other
+    columns are hashed as text. Used to tie fallback reference values to the
+    data they were recorded on.
+    """
+    import numpy as np
+    import pandas as pd
+
+    h = hashlib.sha256()
+    for column in sorted(spec_names(spec) & set(df.columns)):
+        values = df[column]
+        h.update(column.encode("utf-8") + b"\0")
+        if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype,
+                                                                     pd.CategoricalDtype):
+            array = values.to_numpy(np.float64, na_value=np.nan, copy=True)
+            array[np.isnan(array)] = np.nan  # one NaN bit pattern
+            h.update(array.tobytes())
+        else:
+            h.update("\0".join(values.astype(str)).encode("utf-8"))
+    return h.hexdigest()
+
+
+class DataStore:
+    """Datasets loaded once per process and shared by every spec using them.
+
+    With a ColumnarCache only the columns the specs reference are read, and
+    columns needed by later specs are added to the shared frame on demand;
+    without one each dataset is read in full with ``pd.read_stata``.
+    """
+
+    def __init__(self, cache: ColumnarCache | None = None):
+        self.cache = cache
+        self._frames = {}
+        self._available = {}
+        self.loads = 0
+
+    def _columns(self, path: str) -> list[str]:
+        if path not in self._available:
+            _, meta = self.cache.ensure(path)
+            self._available[path] = meta["columns"]
+        return self._available[path]
+
+    def load(self, path: str, names: set[str] | None = None):
+        """Frame of ``path`` holding at least the columns among ``names`` (None: all)."""
+        import pandas as pd
+
+        if not Path(path).exists():
+            raise FileNotFoundError(f"dataset not found: {path}")
+        if self.cache is None:
+            if path not in self._frames:
+                self._frames[path] = pd.read_stata(path)
+                self.loads += 1
+            return self._frames[path]
+
+        try:
+            available = self._columns(path)
+        except OSError as e:
+            print(f"warning: dataset cache unavailable ({e}); reading .dta files directly",
+                  file=sys.stderr)
+            self.cache = None
+            return self.load(path, names)
+        wanted = available if names is None else [c for c in available if c in names]
+        frame = self._frames.get(path)
+        have = set(frame.columns) if frame is not None else set()
+        missing = [c for c in wanted if c not in have]
+        if missing or frame is None:
+            part = self.cache.read(path, missing)
+            frame = part if frame is None else pd.concat([frame, part], axis=1)
+            self._frames[path] = frame
+            self.loads += 1
+        return frame
+
+    def frame_for(self, *specs: dict):
+        """Rows of the specs' dataset selected by ``subset`` (shared by all specs)."""
+        names = set().union(*(spec_names(s) for s in specs))
+        df = self.load(specs[0]["data"], names)
+        if specs[0]["subset"]:
+            df = df.query(specs[0]["subset"])
+        return df
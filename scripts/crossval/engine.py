@@ -0,0 +1,239 @@
+"""
+Cross-validation engine: fit every manifest spec once and compare it with
+the Stata reference values under the spec's tolerances.
+"""
+
+import time
+
+import numpy as np
+
+from .backends import BackendUnavailable, fit_spec, get_backend
+from .batch import fit_batch, plan_batches
+from .data import DataStore, data_fingerprint
+from .bootstrap import wild_cluster_bootstrap
+from .manifest import ManifestError, resolve_reference
+from .stata import SCALARS
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+RELATIVE = ("coef", "se", "fs_f", "kp_f", "ar_f", "hansen_j")
+
+
+def _diff(quantity: str, python: float, stata: float) -> float:
+    if quantity in RELATIVE and stata != 0:
+        return abs(python - stata) / abs(stata)
+    return abs(python - stata)
+
+
+def _check(quantity: str, term: str | None, python, stata, tolerance: float) -> dict:
+    if python is None:
+        return {"quantity": quantity, "term": term, "python": None, "stata": stata,
+                "diff": None, "tolerance": tolerance, "status": "FAIL"}
+    diff = _diff(quantity, python, stata)
+    return {"quantity": quantity, "term": term, "python": python, "stata": stata,
+            "diff": diff, "tolerance": tolerance,
+            "status": "PASS" if diff <= tolerance else "FAIL"}
+
+
+def compare(estimate: dict, reference: dict, spec: dict) -> list[dict]:
+    """One check per compared quantity; ``spec['check']`` limits the terms."""
+    tol = spec["tolerance"]
+    terms = spec["check"] or list(reference["coef"])
+    checks = []
+    for quantity in ("coef", "se"):
+        for term in terms:
+            if term in reference[quantity]:
+                checks.append(_check(quantity, term, estimate[quantity].get(term),
+                                     reference[quantity][term], tol[quantity]))
+    for quantity in SCALARS:
+        if quantity == "boot_p" and not spec["bootstrap"]:
+            continue  # boottest ran in Stata, but the spec asks for no bootstrap
+        if reference.get(quantity) is not None:
+            checks.append(_check(quantity, None, estimate.get(quantity),
+                                 reference[quantity], tol[quantity]))
+    return checks
+
+
+def post_estimation(df, spec: dict, estimate: dict) -> tuple[list[dict], list[str]]:
+    """Bootstrap and backend cross-checks of a fitted spec.
+
+    The bootstrap result is stored in ``estimate`` (``bootstrap`` and
+    ``boot_p``); cross-check comparisons are returned as (checks, notes).
+    """
+    checks, notes = [], []
+    options = spec["bootstrap"]
+    if options:
+        try:
+            boot = wild_cluster_bootstrap(
+                df, spec, options["term"], null=options["null"], reps=options["reps"],
+                weights=options["weights"], restricted=options["type"] == "WCR",
+                seed=options["seed"])
+        except Exception as e:
+            notes.append(f"bootstrap failed: {type(e).__name__}: {e}")
+        else:
+            estimate.update(bootstrap=boot, boot_p=boot["p"])
+    for name in spec["crosscheck"]:
+        if name == spec["backend"]:
+            continue
+        try:
+            other = get_backend(name)(df, spec)
+        except Exception as e:
+            notes.append(f"{name} cross-check failed: {type(e).__name__}: {e}")
+            continue
+        for check in compare(estimate, other, spec):
+            check["against"] = name
+            checks.append(check)
+    return checks, notes
+
+
+def check_truth(estimate: dict, spec: dict) -> list[dict]:
+    """Compare coefficients with known DGP values (synthetic test data)."""
+    return [_check("truth", term, estimate["coef"].get(term), float(t["value"]),
+                   t["tolerance"])
+            for term, t in spec["truth"].items()]
+
+
+def spec_status(checks: list[dict], reference: dict | None) -> str:
+    if any(c["status"] == "FAIL" for c in checks):
+        return "FAIL"
+    return "PASS" if reference is not None else "SKIP"
+
+
+# ---------------------------------------------------------------------------
+# Running manifests
+# ---------------------------------------------------------------------------
+
+def _new_result(spec: dict) -> dict:
+    return {"name": spec["name"], "formula": spec["formula"],
+            "backend": spec["backend"], "estimate": None, "checks": [],
+            "note": None, "seconds": 0.0}
+
+
+def error_result(spec: dict, note: str) -> dict:
+    result = _new_result(spec)
+    result.update(status="ERROR", note=note)
+    return result
+
+
+def _finish(result: dict, spec: dict, estimate: dict, reference: dict | None,
+            note: str | None, cross: tuple[list[dict], list[str]] = ([], [])) -> dict:
+    checks = compare(estimate, reference, spec) if reference else []
+    checks += cross[0]
+    checks += check_truth(estimate, spec)
+    note = "; ".join(filter(None, [note, *cross[1]])) or None
+    terms = spec["check"] or list((reference or estimate)["coef"])
+    result.update(estimate=estimate, checks=checks, note=note, terms=terms,
+                  status=spec_status(checks, reference))
+    return result
+
+
+def run_spec(spec: dict, base: str, store: DataStore) -> dict:
+    """Fit one spec and compare it; errors become an ERROR result."""
+    result = _new_result(spec)
+    start = time.perf_counter()
+    try:
+        df = store.frame_for(spec)
+        reference, note = resolve_reference(spec["stata"], base,
+                                            lambda: data_fingerprint(df, spec))
+        estimate, result["backend"] = fit_spec(df, spec)
+        cross = post_estimation(df, spec, estimate)
+    except (BackendUnavailable, FileNotFoundError, ManifestError) as e:
+        result.update(status="ERROR", note=str(e))
+        return result
+    except Exception as e:  # estimation failure in the backend
+        result.update(status="ERROR", note=f"{type(e).__name__}: {e}")
+        return result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+    return _finish(result, spec, estimate, reference, note, cross)
+
+
+def _run_alone(spec: dict, base: str, store: DataStore, reason: str) -> dict:
+    """run_spec for a spec the batch path could not fit, noting why."""
+    result = run_spec(spec, base, store)
+    result["note"] = "; ".join(filter(None, [result["note"], f"not batched: {reason}"]))
+    return result
+
+
+def run_batch(specs: list[dict], base: str, store: DataStore) -> list[dict]:
+    """Fit specs sharing fixed effects together; see batch.py.
+
+    Specs the batch solver hands back, or all of them when loading or
+    solving the batch fails, fall back to run_spec with the reason in the
+    result's note.
+    """
+    try:
+        df = store.frame_for(*specs)
+        references = [resolve_reference(s["stata"], base, lambda s=s: data_fingerprint(df, s))
+                      for s in specs]
+        estimates, seconds = fit_batch(df, specs)
+    except (BackendUnavailable, FileNotFoundError, ValueError, np.linalg.LinAlgError) as e:
+        reason = f"{type(e).__name__}: {e}"
+        return [_run_alone(spec, base, store, reason) for spec in specs]
+
+    results = []
+    for spec, (reference, note), estimate in zip(specs, references, estimates):
+        if estimate is None:
+            results.append(_run_alone(spec, base, store, "collinear regressors"))
+            continue
+        result = _new_result(spec)
+        start = time.perf_counter()
+        cross = post_estimation(df, spec, estimate)
+        result.update(backend=f"{spec['backend']}/batched",
+                      seconds=seconds / len(specs) + time.perf_counter() - start)
+        results.append(_finish(result, spec, estimate, reference, note, cross))
+    return results
+
+
+def summarize(results: list[dict]) -> dict:
+    counts = {s: 0 for s in ("PASS", "FAIL", "SKIP", "ERROR")}
+    for r in results:
+        counts[r["status"]] += 1
+    if counts["FAIL"] or counts["ERROR"]:
+        status = "FAIL"
+    elif counts["PASS"]:
+        status = "PASS"
+    else:
+        status = "SKIP"
+    return {"status": status, "counts": counts}
+
+
+def select_specs(manifest: dict, only: list[str] | None = None) -> list[dict]:
+    return [s for s in manifest["specs"] if not only or s["name"] in only]
+
+
+def plan_units(specs: list[dict], batch: bool = True) -> list[list[dict]]:
+    """Independent units of work: shared-FE batches, then single specs."""
+    batches, singles = plan_batches(specs) if batch else ([], specs)
+    return batches + [[spec] for spec in singles]
+
+
+def run_unit(specs: list[dict], base: str, store: DataStore) -> list[dict]:
+    if len(specs) > 1:
+        return run_batch(specs, base, store)
+    return [run_spec(specs[0], base, store)]
+
+
+def manifest_report(manifest: dict, specs: list[dict], results: list[dict]) -> dict:
+    """Assemble unit results into a report in manifest order."""
+    by_name = {r["name"]: r for r in results}
+    ordered = [by_name[s["name"]] for s in specs]
+    return {"manifest": manifest["path"], "name": manifest["name"],
+            "specs": ordered, **summarize(ordered)}
+
+
+def run_manifest(manifest: dict, store: DataStore | None = None,
+                 only: list[str] | None = None, batch: bool = True) -> dict:
+    """Run every spec of a loaded manifest (or just the names in ``only``).
+
+    With ``batch``, specs sharing data, sample, weights, fixed effects and
+    vcov are estimated together; results keep the manifest order.
+    """
+    store = store or DataStore()
+    specs = select_specs(manifest, only)
+    results = [r for unit in plan_units(specs, batch)
+               for r in run_unit(unit, manifest["base"], store)]
+    return manifest_report(manifest, specs, results)
@@ -0,0 +1,289 @@
+"""
+IV estimates and weak-instrument diagnostics from one set of projections.
+
+The absorbed fixed effects are swept out once (numpy_backend.Design) and the
+included exogenous regressors partialled out with one QR factorization. What
+is left — outcome y, endogenous X and excluded instruments Z, all n x small —
+is reduced to a QR of Z and a few cross products:
+
+    C = Q_z'[y X],   G = [y X]'[y X],   P = C'C = [y X]'P_z[y X]
+
+Every k-class estimator solves ((1-k) G_xx + k P_xx) b = (1-k) G_xy + k P_xy
+(k = 0: OLS, k = 1: 2SLS, k = 1 + smallest eigenvalue of (G - P)^-1 P: LIML).
+The reduced-form and first-stage residuals are [y X] - Q_z C, and the score
+sums Z_g'e_g of all of them and of the 2SLS residual are taken in one pass
+over the data. From there the first-stage F, the Kleibergen-Paap rk Wald F,
+Hansen's J and the Anderson-Rubin test are small-matrix algebra: at
+beta0 = b the AR regression of y - X b on Z has coefficients and score sums
+linear in (1, -b), so a whole grid of AR tests is one batched solve.
+
+F statistics use the spec's vcov with pyfixest's / reghdfe's small-sample
+factors, so the first-stage and reduced-form F match ``test`` after
+``reghdfe``. The KP rk statistic follows ``ranktest`` (symmetric square
+roots, no small-sample factor) and its F form ivreg2's scaling by
+(N - K)/N and, when clustered, (G - 1)/G.
+"""
+
+import numpy as np
+from scipy import linalg, stats
+
+from .batch import cluster_sums, sandwich
+from .numpy_backend import Design
+
+ESTIMATORS = ("2sls", "liml")
+AR_LEVEL = 0.95
+AR_POINTS = 2001
+AR_WIDTH = 10.0  # half-width of the AR grid, in 2SLS standard errors
+
+
+def _sqrtm(a: np.ndarray, power: float = 0.5) -> np.ndarray:
+    """Symmetric power of a symmetric positive definite matrix."""
+    values, vectors = np.linalg.eigh(a)
+    return (vectors * values ** power) @ vectors.T
+
+
+def _intervals(grid: np.ndarray, excess: np.ndarray) -> list[list[float | None]]:
+    """Runs of ``excess < 0`` on the grid, ends interpolated; None where a run
+    reaches the edge of the grid."""
+    accepted = excess < 0
+    runs = []
+    edges = np.flatnonzero(np.diff(accepted.astype(np.int8)))
+    starts = ([0] if accepted[0] else []) + [i + 1 for i in edges if not accepted[i]]
+    ends = [i for i in edges if accepted[i]] + ([len(grid) - 1] if accepted[-1] else [])
+
+    def crossing(i: int) -> float:  # zero of excess between grid[i] and grid[i + 1]
+        f0, f1 = excess[i], excess[i + 1]
+        return float(grid[i] + (grid[i + 1] - grid[i]) * f0 / (f0 - f1))
+
+    for start, end in zip(starts, ends):
+        runs.append([None if start == 0 else crossing(start - 1),
+                     None if end == len(grid) - 1 else crossing(end)])
+    return runs
+
+
+class IVModel:
+    """A linear IV spec reduced to its projections, for any number of estimators
+    and tests."""
+
+    def __init__(self, df, spec: dict):
+        design = Design(df, spec)
+        if not design.endog:
+            raise ValueError("IV specs take 'y ~ exog | fe | endog ~ instruments'")
+        dropped = set(design.exog) | set(design.endog)
+        dropped -= set(design.regressors)
+        if dropped:
+            raise ValueError(f"collinear regressors: {sorted(dropped)}")
+        self.design = design
+        self.n = design.n
+        self.k1 = len(design.endog)
+        self.l = len(design.instruments)
+        if self.l < self.k1:
+            raise ValueError("fewer excluded instruments than endogenous regressors")
+
+        yx = design.columns([design.depvar, *design.endog])
+        z = design.columns(design.instruments)
+        self.w = design.columns(design.exog)
+        self.q_w = self.r_w = None
+        if self.w.shape[1]:
+            self.q_w, self.r_w = np.linalg.qr(self.w)
+            yx = yx - self.q_w @ (self.q_w.T @ yx)
+            z = z - self.q_w @ (self.q_w.T @ z)
+        q_z, r_z = np.linalg.qr(z)
+        if np.abs(np.diag(r_z)).min() <= 1e-10 * np.abs(np.diag(r_z)).max():
+            raise ValueError("excluded instruments are collinear with the exogenous regressors")
+        self.z, self.yx = z, yx
+        self.c = q_z.T @ yx                  # L x (1 + K1)
+        self.gram = yx.T @ yx
+        self.proj = self.c.T @ self.c
+        self.a = r_z.T @ self.c              # Z'[y X]
+        self.zz = r_z.T @ r_z
+        self.resid = yx - q_z @ self.c       # reduced form, first stages
+        # LIML kappa = 1 + smallest root of |P - l (G - P)| = 0, accurate when kappa ~ 1
+        self.kappa = 1.0 + float(linalg.eigh(self.proj, self.gram - self.proj,
+                                             eigvals_only=True)[0])
+        self.b_2sls = self.k_class(1.0)
+
+        # First-stage regressors (exogenous + excluded) in the small-sample factor
+        self.df_first = design.df_k(len(design.exog) + self.l)
+        self.kind = design.kind
+        self.groups = None
+        if self.kind == "iid":
+            self.meat = None
+        else:
+            u = yx @ np.r_[1.0, -self.b_2sls]
+            e = np.column_stack([self.resid, u])
+            scores = (z[:, :, None] * e[:, None, :]).reshape(self.n, -1)
+            if self.kind == "CRV1":
+                scores = cluster_sums(scores, design.cluster_codes)
+                self.groups = len(scores)
+            m = e.shape[1]
+            # meat[a, j, b, k] = sum over groups of (Z_g'e_gj)_a (Z_g'e_gk)_b
+            self.meat = (scores.T @ scores).reshape(self.l, m, self.l, m)
+
+    # -----------------------------------------------------------------------
+    # Estimators
+    # -----------------------------------------------------------------------
+
+    def k_class(self, k: float) -> np.ndarray:
+        """Coefficients of the endogenous regressors for k-class parameter k."""
+        g, p = self.gram, self.proj
+        lhs = (1 - k) * g[1:, 1:] + k * p[1:, 1:]
+        rhs = (1 - k) * g[1:, 0] + k * p[1:, 0]
+        return np.linalg.solve(lhs, rhs)
+
+    def fit(self, estimator: str = "2sls") -> dict:
+        """Coefficients and standard errors of all regressors, as fit_numpy returns."""
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"unknown IV estimator '{estimator}' (use {', '.join(ESTIMATORS)})")
+        design = self.design
+        k = 1.0 if estimator == "2sls" else self.kappa
+        b_x = self.b_2sls if estimator == "2sls" else self.k_class(k)
+        x = design.columns(design.endog)
+        u = design.y - x @ b_x
+        b_w = np.zeros(0)
+        if self.q_w is not None:
+            b_w = linalg.solve_triangular(self.r_w, self.q_w.T @ u)
+            u = u - self.w @ b_w
+        # Score regressors of the k-class estimator: W and X - k M_[W,Z] X
+        xhat = np.column_stack([self.w, x - k * self.resid[:, 1:]])
+        bread = np.linalg.inv(xhat.T @ np.column_stack([self.w, x]))
+        vcov = sandwich(bread, xhat, u, self.n, design.df_k(), self.kind,
+                        design.cluster_codes)
+        names = [*design.exog, *design.endog]
+        beta = np.r_[b_w, b_x]
+        return {"coef": dict(zip(names, map(float, beta))),
+                "se": dict(zip(names, map(float, np.sqrt(np.diag(vcov)))))}
+
+    # -----------------------------------------------------------------------
+    # Tests
+    # -----------------------------------------------------------------------
+
+    def _denominator_df(self) -> int:
+        return self.groups - 1 if self.kind == "CRV1" else self.n - self.df_first
+
+    def wald_f(self, h: np.ndarray) -> np.ndarray:
+        """F statistics for Z having no effect on [y X] h, one per row of ``h``.
+
+        Row e_(1+j) is the first stage of the j-th endogenous regressor,
+        row (1, -b) the Anderson-Rubin test of beta = b.
+        """
+        h = np.atleast_2d(h)
+        if self.kind == "iid":
+            ssr = np.einsum("mj,jk,mk->m", h, self.resid.T @ self.resid, h)
+            explained = ((h @ self.c.T) ** 2).sum(axis=1)
+            return explained / self.l / (ssr / (self.n - self.df_first))
+        m = h.shape[1]
+        meat = np.einsum("ajbk,mj,mk->mab", self.meat[:, :m, :, :m], h, h)
+        if self.kind == "CRV1":
+            factor = (self.n - 1) / (self.n - self.df_first) * self.groups / (self.groups - 1)
+        else:
+            factor = self.n / (self.n - self.df_first)
+        a = h @ self.a.T
+        return (np.einsum("ma,ma->m", a, np.linalg.solve(meat, a[:, :, None])[:, :, 0])
+                / (factor * self.l))
+
+    def first_stage(self) -> dict:
+        """Per endogenous regressor: F on the excluded instruments and partial R²."""
+        f = self.wald_f(np.eye(1 + self.k1)[1:])
+        return {name: {"f": float(f[j]),
+                       "partial_r2": float(self.proj[1 + j, 1 + j] / self.gram[1 + j, 1 + j])}
+                for j, name in enumerate(self.design.endog)}
+
+    def kleibergen_paap(self) -> dict:
+        """rk Wald statistic for underidentification and its F form (``widstat``)."""
+        k1, l = self.k1, self.l
+        v = self.resid[:, 1:]
+        vv = v.T @ v
+        zz_inv_half = _sqrtm(self.zz, -0.5)
+        f = _sqrtm(vv, -0.5)
+        theta = zz_inv_half @ self.a[:, 1:] @ f
+        if self.kind == "iid":
+            s = np.kron(vv / self.n, self.zz)
+        else:
+            s = self.meat[:, 1:1 + k1, :, 1:1 + k1].transpose(1, 0, 3, 2).reshape(k1 * l, k1 * l)
+        var_theta = np.kron(f, zz_inv_half) @ s @ np.kron(f, zz_inv_half).T
+        u, _, vt = np.linalg.svd(theta)
+        q = k1 - 1
+        u22, v22 = u[q:, q:], vt.T[q:, q:]
+        a_q = u[:, q:] @ np.linalg.solve(u22, _sqrtm(u22 @ u22.T))
+        b_q = _sqrtm(v22 @ v22.T) @ np.linalg.solve(v22.T, vt[q:, :])
+        transform = np.kron(b_q, a_q.T)
+        lam = transform @ theta.ravel(order="F")
+        rk = float(lam @ np.linalg.solve(transform @ var_theta @ transform.T, lam))
+        scale = (self.n - self.df_first) / self.n
+        if self.kind == "CRV1":
+            scale *= (self.groups - 1) / self.groups
+        return {"rk": rk, "df": l - k1 + 1, "f": rk / l * scale}
+
+    def hansen_j(self) -> dict:
+        """Overidentification test: Hansen's J (two-step GMM), Sargan's under iid."""
+        df = self.l - self.k1
+        if df == 0:
+            return {"j": 0.0, "df": 0, "p": None}
+        if self.kind == "iid":
+            h = np.r_[1.0, -self.b_2sls]
+            j = float(((self.c @ h) ** 2).sum() / (h @ self.gram @ h / self.n))
+        else:
+            s = self.meat[:, -1, :, -1]
+            a_y, a_x = self.a[:, 0], self.a[:, 1:]
+            s_inv_x = np.linalg.solve(s, a_x)
+            b = np.linalg.solve(a_x.T @ s_inv_x, s_inv_x.T @ a_y)
+            g = a_y - a_x @ b
+            j = float(g @ np.linalg.solve(s, g))
+        return {"j": j, "df": df, "p": float(stats.chi2.sf(j, df))}
+
+    def anderson_rubin(self, beta0: np.ndarray | None = None) -> dict:
+        """AR test of beta = beta0 (default 0)."""
+        beta0 = np.zeros(self.k1) if beta0 is None else np.atleast_1d(beta0)
+        f = float(self.wald_f(np.r_[1.0, -beta0])[0])
+        return {"f": f, "p": float(stats.f.sf(f, self.l, self._denominator_df()))}
+
+    def ar_set(self, level: float = AR_LEVEL, points: int = AR_POINTS,
+               width: float = AR_WIDTH, se: float | None = None) -> list:
+        """AR confidence set by grid inversion (one endogenous regressor).
+
+        The grid spans the 2SLS estimate +- ``width`` standard errors; an
+        interval end of None means the set reaches the edge of the grid.
+        """
+        if self.k1 != 1:
+            raise ValueError("AR confidence sets need one endogenous regressor")
+        if se is None:
+            se = self.fit("2sls")["se"][self.design.endog[0]]
+        grid = self.b_2sls[0] + se * width * np.linspace(-1, 1, points)
+        h = np.column_stack([np.ones(points), -grid])
+        crit = stats.f.isf(1 - level, self.l, self._denominator_df())
+        return _intervals(grid, self.wald_f(h) - crit)
+
+
+def fit_iv(df, spec: dict) -> dict:
+    """Backend for specs with an ``iv`` block (see manifest.py).
+
+    Returns the 2SLS or LIML fit with ``fs_f`` (first-stage F, one
+    endogenous regressor), ``kp_f``, ``hansen_j`` and ``ar_f`` (AR test of
+    beta = 0) as scalars, and the full battery under ``iv``.
+    """
+    options = spec["iv"]
+    model = IVModel(df, spec)
+    fit = model.fit(options["estimator"])
+    first = model.first_stage()
+    kp = model.kleibergen_paap()
+    hansen = model.hansen_j()
+    ar = model.anderson_rubin()
+    if model.k1 == 1:
+        ar["set"] = model.ar_set(options["level"], options["points"], options["width"],
+                                 se=(fit["se"][model.design.endog[0]]
+                                     if options["estimator"] == "2sls" else None))
+        ar["level"] = options["level"]
+    return {
+        **fit,
+        "n": model.n,
+        "r2": None,
+        "r2_within": None,
+        "fs_f": next(iter(first.values()))["f"] if model.k1 == 1 else None,
+        "kp_f": kp["f"],
+        "hansen_j": hansen["j"],
+        "ar_f": ar["f"],
+        "iv": {"estimator": options["estimator"], "kappa": model.kappa,
+               "ols": dict(zip(model.design.endog, map(float, model.k_class(0.0)))),
+               "first_stage": first, "kp": kp, "hansen": hansen, "ar": ar},
+    }
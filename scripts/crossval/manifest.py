@@ -0,0 +1,325 @@
+"""
+Cross-validation manifests.
+
+A manifest is a JSON file listing the specifications of one project (or test
+case) together with the Stata reference values and tolerances for each:
+
+    {
+      "name": "test1-did",
+      "data": {"panel": "synthetic_panel.dta"},
+      "defaults": {"data": "panel", "vcov": {"CRV1": "state_id"}},
+      "specs": [
+        {"name": "twfe",
+         "formula": "consumption ~ treated + pop | state_id + year",
+         "check": ["treated"],
+         "stata": {"log": "output/logs/01_did_analysis.log",
+                   "model": "twfe_main"}}
+      ]
+    }
+
+Paths are relative to the manifest. Spec keys override ``defaults``, and
+``tolerance`` is merged key by key with DEFAULT_TOLERANCE. ``"crosscheck":
+["numpy"]`` also fits the spec with the listed backends and compares them
+with the main one under the same tolerances. ``"bootstrap": {"term":
+"treated", "weights": "mammen", "reps": 999}`` adds a wild cluster bootstrap
+p-value (bootstrap.py), compared with ``boottest`` output in the Stata log.
+A ``"did": {"ivar": "state_id", "time": "year", "gvar": "first_treat",
+"aggregate": "event"}`` block switches the spec to the staggered-DID backend
+(staggered.py), compared with ``csdid_stats`` / ``bacondecomp`` output.
+An ``"rdd": {"cutoff": 0, "bwselect": "cerrd"}`` block (formula ``y ~
+running``) switches it to the RD backend (rdd.py), compared with
+``rdrobust``; ``"density": true`` adds a manipulation test to the report.
+An ``"iv": {"estimator": "liml"}`` block on an IV formula switches it to the
+IV backend (iv.py): 2SLS or LIML with the first-stage F, Kleibergen-Paap rk
+F, Hansen J and Anderson-Rubin test, compared with ``ivreghdfe`` / ``ivreg2``.
+"""
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+from .stata import SCALARS, load_results, model_reference
+
+
+class ManifestError(ValueError):
+    """Raised for a malformed manifest or reference specification."""
+
+
+# coef/se: relative difference; r2/r2_within: absolute; n: observations;
+# boot_p: absolute, wide enough for the Monte Carlo error of 999 replications;
+# h: absolute, rdrobust prints bandwidths with three decimals; IV test
+# statistics: relative, kp_f wider for ivreg2's own small-sample scaling
+DEFAULT_TOLERANCE = {"coef": 0.001, "se": 0.005, "r2": 0.001, "r2_within": 0.001,
+                     "n": 0, "boot_p": 0.02, "h": 0.001, "fs_f": 0.001, "kp_f": 0.01,
+                     "ar_f": 0.001, "hansen_j": 0.01}
+
+SPEC_KEYS = {"name", "data", "formula", "vcov", "weights", "subset", "check",
+             "backend", "crosscheck", "bootstrap", "did", "rdd", "iv", "stata",
+             "tolerance", "truth"}
+
+BOOTSTRAP_DEFAULTS = {"null": 0.0, "reps": 9999, "weights": "rademacher", "type": "WCR",
+                      "seed": 12345}
+
+DID_DEFAULTS = {"aggregate": "simple", "control": "never"}
+DID_AGGREGATIONS = ("attgt", "simple", "event", "group", "bacon")
+
+RDD_DEFAULTS = {"cutoff": 0.0, "p": 1, "kernel": "triangular", "bwselect": "mserd",
+                "h": None, "b": None, "scale": 1.0, "density": False}
+
+IV_DEFAULTS = {"estimator": "2sls", "level": 0.95, "points": 2001, "width": 10.0}
+
+
+def _normalize_bootstrap(raw: dict | None, position: int) -> dict | None:
+    if raw is None:
+        return None
+    options = {**BOOTSTRAP_DEFAULTS, **raw}
+    if "term" not in options:
+        raise ManifestError(f"spec #{position}: bootstrap needs a 'term'")
+    unknown = set(options) - set(BOOTSTRAP_DEFAULTS) - {"term"}
+    if unknown:
+        raise ManifestError(f"spec #{position}: unknown bootstrap keys {sorted(unknown)}")
+    if options["weights"] not in ("rademacher", "webb", "mammen"):
+        raise ManifestError(f"spec #{position}: bootstrap weights must be "
+                            "rademacher, webb or mammen")
+    if options["type"] not in ("WCR", "WCU"):
+        raise ManifestError(f"spec #{position}: bootstrap type must be WCR or WCU")
+    return options
+
+
+def _normalize_did(raw: dict | None, position: int) -> dict | None:
+    if raw is None:
+        return None
+    options = {**DID_DEFAULTS, **raw}
+    unknown = set(options) - set(DID_DEFAULTS) - {"ivar", "time", "gvar"}
+    if unknown:
+        raise ManifestError(f"spec #{position}: unknown did keys {sorted(unknown)}")
+    if options["aggregate"] not in DID_AGGREGATIONS:
+        raise ManifestError(f"spec #{position}: did aggregate must be one of "
+                            f"{', '.join(DID_AGGREGATIONS)}")
+    if options["control"] not in ("never", "notyet"):
+        raise ManifestError(f"spec #{position}: did control must be never or notyet")
+    required = ["ivar", "time"] + (["gvar"] if options["aggregate"] != "bacon" else [])
+    missing = [k for k in required if k not in options]
+    if missing:
+        raise ManifestError(f"spec #{position}: did block needs {', '.join(missing)}")
+    return options
+
+
+def _normalize_rdd(raw: dict | None, position: int) -> dict | None:
+    if raw is None:
+        return None
+    options = {**RDD_DEFAULTS, **raw}
+    unknown = set(options) - set(RDD_DEFAULTS)
+    if unknown:
+        raise ManifestError(f"spec #{position}: unknown rdd keys {sorted(unknown)}")
+    if options["kernel"] not in ("triangular", "uniform", "epanechnikov"):
+        raise ManifestError(f"spec #{position}: rdd kernel must be triangular, uniform "
+                            "or epanechnikov")
+    if options["bwselect"] not in ("mserd", "cerrd"):
+        raise ManifestError(f"spec #{position}: rdd bwselect must be mserd or cerrd")
+    if not isinstance(options["p"], int) or options["p"] < 0:
+        raise ManifestError(f"spec #{position}: rdd p must be a non-negative integer")
+    return options
+
+
+def _normalize_iv(raw: dict | None, formula: str, position: int) -> dict | None:
+    if raw is None:
+        return None
+    options = {**IV_DEFAULTS, **raw}
+    unknown = set(options) - set(IV_DEFAULTS)
+    if unknown:
+        raise ManifestError(f"spec #{position}: unknown iv keys {sorted(unknown)}")
+    if options["estimator"] not in ("2sls", "liml"):
+        raise ManifestError(f"spec #{position}: iv estimator must be 2sls or liml")
+    if not 0 < options["level"] < 1:
+        raise ManifestError(f"spec #{position}: iv level must be between 0 and 1")
+    if formula.count("~") != 2:
+        raise ManifestError(f"spec #{position}: iv block needs 'y ~ x | fe | d ~ z'")
+    return options
+
+
+def _normalize_spec(raw: dict, defaults: dict, datasets: dict, base: Path,
+                    position: int) -> dict:
+    spec = {**defaults, **raw}
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ManifestError(f"spec #{position}: unknown keys {sorted(unknown)}")
+    if "formula" not in spec:
+        raise ManifestError(f"spec #{position}: missing 'formula'")
+
+    data = spec.get("data")
+    if data is None:
+        raise ManifestError(f"spec #{position}: no dataset given")
+    data = datasets.get(data, data)
+
+    tolerance = dict(DEFAULT_TOLERANCE)
+    tolerance.update(defaults.get("tolerance", {}))
+    tolerance.update(raw.get("tolerance", {}))
+
+    check = spec.get("check")
+    if isinstance(check, str):
+        check = [check]
+    crosscheck = spec.get("crosscheck") or []
+    if isinstance(crosscheck, str):
+        crosscheck = [crosscheck]
+    did = _normalize_did(spec.get("did"), position)
+    rdd = _normalize_rdd(spec.get("rdd"), position)
+    iv = _normalize_iv(spec.get("iv"), spec["formula"], position)
+    if sum(map(bool, (did, rdd, iv))) > 1:
+        raise ManifestError(f"spec #{position}: a spec takes one of did, rdd and iv")
+
+    return {
+        "name": spec.get("name") or f"spec{position}",
+        "data": str((base / data).resolve()),
+        "formula": spec["formula"],
+        "vcov": spec.get("vcov", "iid"),
+        "weights": spec.get("weights"),
+        "subset": spec.get("subset"),
+        "check": check,
+        "backend": spec.get("backend", "staggered" if did else "rdd" if rdd
+                            else "iv" if iv else "pyfixest"),
+        "crosscheck": crosscheck,
+        "bootstrap": _normalize_bootstrap(spec.get("bootstrap"), position),
+        "did": did,
+        "rdd": rdd,
+        "iv": iv,
+        "stata": spec.get("stata"),
+        "tolerance": tolerance,
+        "truth": spec.get("truth", {}),
+    }
+
+
+def load_manifest(path: str | Path) -> dict:
+    """Read and normalize a manifest; spec paths are resolved to absolute."""
+    path = Path(path).resolve()
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ManifestError(f"cannot read manifest {path}: {e}") from e
+
+    base = path.parent
+    datasets = raw.get("data", {})
+    defaults = raw.get("defaults", {})
+    specs = [_normalize_spec(s, defaults, datasets, base, i)
+             for i, s in enumerate(raw.get("specs", []), 1)]
+    names = [s["name"] for s in specs]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ManifestError(f"{path}: duplicate spec names {duplicates}")
+
+    return {"path": str(path), "base": str(base),
+            "name": raw.get("name", path.parent.name), "specs": specs}
+
+
+# ---------------------------------------------------------------------------
+# Stata reference values
+# ---------------------------------------------------------------------------
+
+def _read_dta_row(path: Path, row: int):
+    import pandas as pd
+
+    frame = pd.read_stata(path)
+    if row >= len(frame):
+        raise ManifestError(f"{path} has {len(frame)} rows, row {row} requested")
+    return frame.iloc[row]
+
+
+def _extracted_reference(stata: dict, base: str | Path) -> tuple[dict | None, str | None]:
+    kind = "log" if "log" in stata else "estimates"
+    path = Path(base) / stata[kind]
+    if not path.exists():
+        return None, f"Stata {kind} not found: {path}"
+    try:
+        index = load_results(path)
+    except ValueError as e:
+        raise ManifestError(str(e)) from e
+
+    label = stata.get("model")
+    if label is None:
+        models = {id(m): m for m in index.values()}
+        if len(models) != 1:
+            raise ManifestError(f"{path} holds {len(models)} models; set 'model'")
+        model = next(iter(models.values()))
+    elif label in index:
+        model = index[label]
+    else:
+        return None, (f"model '{label}' not in {path} "
+                      f"(found: {', '.join(sorted(index)) or 'none'})")
+
+    reference = model_reference(model, stata.get("rename"))
+    for quantity in stata.get("ignore", []):
+        if quantity not in SCALARS:
+            raise ManifestError(f"cannot ignore '{quantity}' (only {', '.join(SCALARS)})")
+        reference.pop(quantity, None)
+    return reference, None
+
+
+def resolve_reference(stata: dict | None, base: str | Path,
+                      fingerprint: Callable[[], str] | None = None
+                      ) -> tuple[dict | None, str | None]:
+    """Turn a spec's ``stata`` block into numbers.
+
+    ``"log"`` / ``"estimates"`` extract a model (``"model": label``) from a
+    Stata log or a .dta export, see stata.py; ``"rename"`` maps Stata term
+    names to Python ones and ``"ignore"`` drops scalars (N, R², boot_p) from
+    the comparison.
+    Otherwise literal numbers are used as-is, and when the block names an
+    export file (``"dta": "output/stata_iv_coefs.dta"``) string values are
+    column names in that file. A ``"fallback"`` block of literal numbers
+    (``{"coef": {...}, "se": {...}, "n": 750, "data_sha256": "..."}``) is
+    used instead when the log or export does not exist, so a checkout without
+    Stata output still compares against the last recorded Stata run. Its
+    ``data_sha256`` is the data.data_fingerprint of the dataset the values
+    were recorded on; ``fingerprint()`` gives that of the current dataset,
+    and on a mismatch (or without ``fingerprint``) the fallback is stale and
+    not used. Returns ``(reference, note)``; reference is None when the
+    values are not yet available, with the reason in ``note``.
+    """
+    if not stata:
+        return None, "no Stata reference values in manifest"
+    source = next((k for k in ("log", "estimates", "dta") if k in stata), None)
+    if source is not None and not (Path(base) / stata[source]).exists():
+        kind = "export" if source == "dta" else source
+        missing = f"Stata {kind} not found: {Path(base) / stata[source]}"
+        if "fallback" not in stata:
+            return None, missing
+        recorded = stata["fallback"].get("data_sha256")
+        if not recorded:
+            raise ManifestError("a Stata fallback needs the 'data_sha256' of the dataset "
+                                "its values were recorded on")
+        current = fingerprint() if fingerprint is not None else None
+        if current != recorded:
+            found = f"this dataset is {current}" if current else "no dataset to check"
+            return None, (f"{missing}; fallback values in the manifest are stale "
+                          f"(recorded on data {recorded[:12]}, {found})")
+        reference, note = resolve_reference(stata["fallback"], base)
+        return reference, "; ".join(filter(None, [note, f"{missing}, using the fallback "
+                                                        "values in the manifest"]))
+    if source in ("log", "estimates"):
+        return _extracted_reference(stata, base)
+
+    row = None
+    if source == "dta":
+        row = _read_dta_row(Path(base) / stata["dta"], stata.get("row", 0))
+
+    def value(v):
+        if v is None:
+            return None
+        if isinstance(v, str):
+            if row is None:
+                raise ManifestError(f"column reference '{v}' needs a 'dta' source")
+            if v not in row.index:
+                raise ManifestError(f"column '{v}' not in {stata['dta']}")
+            return float(row[v])
+        return float(v)
+
+    reference = {
+        "coef": {k: value(v) for k, v in stata.get("coef", {}).items()},
+        "se": {k: value(v) for k, v in stata.get("se", {}).items()},
+    }
+    for key in SCALARS:
+        if key in stata:
+            reference[key] = value(stata[key])
+    if any(v is None for v in reference["coef"].values()):
+        return None, "Stata reference values not filled in"
+    return reference, None
@@ -0,0 +1,209 @@
+"""
+NumPy reference estimator, independent of pyfixest.
+
+Fits the same formulas as the pyfixest backend — ``y ~ x1 + x2``,
+``y ~ x1 + x2 | fe1 + fe2`` and ``y ~ x1 | fe1 + fe2 | d ~ z1 + z2`` with
+plain variable names — by the within transformation: fixed effects are
+swept out by alternating projections over group means (``np.bincount``),
+then OLS or 2SLS is solved on the demeaned columns. Sample construction and
+standard errors follow pyfixest's defaults (singletons dropped, iid /
+hetero / CRV1 with the same small-sample factors), so both backends should
+agree to numerical precision and either can serve as a cross-check of the
+other. Only NumPy and pandas are needed.
+"""
+
+import numpy as np
+
+from .batch import (NAME, drop_singletons, factorize_columns, model_df, nested_in,
+                    sandwich, vcov_kind)
+
+# Relative pivot below which a regressor counts as collinear (pyfixest: 1e-10)
+COLLINEARITY_TOL = 1e-10
+
+
+def parse_formula(formula: str) -> tuple[str, list[str], list[str], list[str], list[str]]:
+    """Split a formula into (depvar, exog, fixef, endog, instruments)."""
+    parts = [p.strip() for p in formula.split("|")]
+    if "~" not in parts[0] or len(parts) > 3:
+        raise ValueError(f"numpy backend cannot parse formula: {formula}")
+    endog, instruments = [], []
+    if len(parts) > 1 and "~" in parts[-1]:
+        lhs, rhs = parts.pop().split("~", 1)
+        endog = [t.strip() for t in lhs.split("+")]
+        instruments = [t.strip() for t in rhs.split("+")]
+    if len(parts) > 2:
+        raise ValueError(f"numpy backend cannot parse formula: {formula}")
+    lhs, rhs = parts[0].split("~", 1)
+    depvar = lhs.strip()
+    exog = [t.strip() for t in rhs.split("+") if t.strip() not in ("1", "")]
+    fixef = [t.strip() for t in parts[1].split("+")] if len(parts) == 2 else []
+    names = [depvar, *exog, *fixef, *endog, *instruments]
+    bad = [t for t in names if not NAME.match(t)]
+    if bad:
+        raise ValueError(f"numpy backend supports plain variable names only: {bad}")
+    return depvar, exog, fixef, endog, instruments
+
+
+# ---------------------------------------------------------------------------
+# Fixed effects
+# ---------------------------------------------------------------------------
+
+class FixedEffects:
+    """Group structure of one or more FE dimensions on a fixed sample."""
+
+    def __init__(self, codes: np.ndarray, weights: np.ndarray):
+        self.codes = [np.ascontiguousarray(codes[:, j], dtype=np.intp)
+                      for j in range(codes.shape[1])]
+        weights = np.asarray(weights, dtype=np.float64)
+        # Unit weights are skipped in the sweeps: one pass over the data fewer
+        self.weights = None if (weights == 1).all() else weights
+        self.inv_size = [1.0 / np.bincount(c, weights=self.weights) for c in self.codes]
+
+    def _sweep(self, x: np.ndarray) -> float:
+        """Subtract each dimension's group means in turn; return the largest shift."""
+        shift = 0.0
+        for codes, inv_size in zip(self.codes, self.inv_size):
+            for j in range(x.shape[1]):
+                column = x[:, j] if self.weights is None else x[:, j] * self.weights
+                means = np.bincount(codes, weights=column) * inv_size
+                x[:, j] -= means[codes]
+                shift = max(shift, float(np.abs(means).max()))
+        return shift
+
+    def demean(self, x: np.ndarray, tol: float = 1e-10, maxiter: int = 10_000) -> np.ndarray:
+        """Residuals of every column of ``x`` on all FE dimensions."""
+        x = np.array(x, dtype=np.float64, order="F")
+        if x.ndim == 1:
+            x = x[:, None]
+        scale = max(float(np.abs(x).max()), 1.0) if x.size else 1.0
+        self._sweep(x)
+        if len(self.codes) == 1:
+            return x
+        for _ in range(maxiter):
+            if self._sweep(x) <= tol * scale:
+                return x
+        raise RuntimeError("fixed-effect demeaning did not converge")
+
+
+# ---------------------------------------------------------------------------
+# Estimation
+# ---------------------------------------------------------------------------
+
+def _independent(gram: np.ndarray) -> list[int]:
+    """Indices of a maximal set of linearly independent columns, in order."""
+    kept = []
+    for j in range(gram.shape[0]):
+        if gram[j, j] <= 0:
+            continue
+        if kept:
+            g = gram[np.ix_(kept, kept)]
+            b = gram[kept, j]
+            residual = gram[j, j] - b @ np.linalg.solve(g, b)
+        else:
+            residual = gram[j, j]
+        if residual > COLLINEARITY_TOL * gram[j, j]:
+            kept.append(j)
+    return kept
+
+
+class Design:
+    """A spec's estimation sample with its columns demeaned and weighted.
+
+    ``z`` holds the depvar, regressors and instruments after the within
+    transformation, multiplied by sqrt(weights); ``regressors`` excludes
+    collinear columns.
+    """
+
+    def __init__(self, df, spec: dict):
+        depvar, exog, fixef, endog, instruments = parse_formula(spec["formula"])
+        parsed = vcov_kind(spec["vcov"])
+        if parsed is None:
+            raise ValueError(f"numpy backend supports iid, hetero and CRV1 only: {spec['vcov']}")
+        self.kind, cluster = parsed
+        weights = spec["weights"]
+
+        used = list(dict.fromkeys([depvar, *exog, *endog, *instruments, *fixef,
+                                   *(c for c in (cluster, weights) if c)]))
+        df = df.loc[df[used].notna().all(axis=1)]
+        if fixef:
+            df = df.loc[drop_singletons(factorize_columns(df, fixef))]
+        self.df = df
+        self.n = n = len(df)
+        self.w = df[weights].to_numpy(np.float64) if weights else np.ones(n)
+
+        columns = list(dict.fromkeys([depvar, *exog, *endog, *instruments]))
+        raw = df[columns].to_numpy(np.float64)
+        if fixef:
+            codes = factorize_columns(df, fixef)
+            data = FixedEffects(codes, self.w).demean(raw)
+            self.k_fe = codes.max(axis=0) + 1
+        else:
+            data = np.column_stack([raw, np.ones(n)])
+            columns.append("Intercept")
+            exog = ["Intercept", *exog]
+            codes, self.k_fe = None, np.zeros(0, dtype=int)
+        self.z = data * np.sqrt(self.w)[:, None]
+        self.index = {c: i for i, c in enumerate(columns)}
+        self.depvar, self.exog, self.fixef = depvar, exog, fixef
+        self.endog, self.instruments = endog, instruments
+
+        # Collinear regressors are dropped, as pyfixest does
+        regressors = [*exog, *endog]
+        x = self.columns(regressors)
+        self.regressors = [regressors[i] for i in _independent(x.T @ x)]
+
+        self.nested = np.zeros(len(self.k_fe), dtype=bool)
+        self.cluster_codes = None
+        if cluster is not None:
+            self.cluster_codes = factorize_columns(df, [cluster])[:, 0]
+            if fixef:
+                self.nested = nested_in(codes, self.cluster_codes)
+
+    def columns(self, names: list[str]) -> np.ndarray:
+        return self.z[:, [self.index[c] for c in names]]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.z[:, self.index[self.depvar]]
+
+    def df_k(self, k: int | None = None) -> int:
+        k = len(self.regressors) if k is None else k
+        return model_df(k, self.k_fe, self.nested, self.kind)
+
+
+def fit_numpy(df, spec: dict) -> dict:
+    design = Design(df, spec)
+    y = design.y
+    x = design.columns(design.regressors)
+    if design.endog:
+        h = design.columns([*design.exog, *design.instruments])
+        h = h[:, _independent(h.T @ h)]
+        # First-stage fitted values: projection of the regressors on the instruments
+        xhat = h @ np.linalg.solve(h.T @ h, h.T @ x)
+        bread = np.linalg.inv(xhat.T @ x)
+        beta = bread @ (xhat.T @ y)
+        scores = xhat
+    else:
+        bread = np.linalg.inv(x.T @ x)
+        beta = bread @ (x.T @ y)
+        scores = x
+    u = y - x @ beta
+    vcov = sandwich(bread, scores, u, design.n, design.df_k(), design.kind,
+                    design.cluster_codes)
+
+    r2 = r2_within = None
+    if not design.endog:
+        ssr = float(u @ u)
+        w = design.w
+        y_raw = design.df[design.depvar].to_numpy(np.float64)
+        tss = float((w * (y_raw - np.average(y_raw, weights=w)) ** 2).sum())
+        r2 = 1 - ssr / tss
+        if design.fixef:
+            r2_within = 1 - ssr / float(y @ y)
+    return {
+        "coef": dict(zip(design.regressors, map(float, beta))),
+        "se": dict(zip(design.regressors, map(float, np.sqrt(np.diag(vcov))))),
+        "n": design.n,
+        "r2": r2,
+        "r2_within": r2_within,
+    }
@@ -0,0 +1,144 @@
+"""
+Parallel cross-validation across manifests.
+
+Every manifest is split into independent units (a shared-FE batch or a
+single spec, see engine.plan_units) and the units of all manifests are
+fanned out over one process pool, largest datasets first. Each worker keeps
+its own DataStore, so a dataset is read at most once per worker, and runs
+with BLAS / OpenMP thread pools capped at cores // workers so that the
+workers do not oversubscribe the machine.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+from .data import ColumnarCache, DataStore
+from .engine import (error_result, manifest_report, plan_units, run_unit, select_specs,
+                     summarize)
+
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                    "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS",
+                    "NUMEXPR_NUM_THREADS", "NUMBA_NUM_THREADS", "RAYON_NUM_THREADS")
+
+DISCOVER_SKIP = {".git", "__pycache__", ".crossval_cache", "node_modules", ".venv"}
+MANIFEST_NAME = "crossval.json"
+
+
+def discover(root: str | Path) -> list[Path]:
+    """Every crossval.json below ``root``, in path order."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in DISCOVER_SKIP)
+        if MANIFEST_NAME in filenames:
+            found.append(Path(dirpath) / MANIFEST_NAME)
+    return found
+
+
+@contextmanager
+def limited_threads(threads: int):
+    """Cap native thread pools in processes started inside the block.
+
+    BLAS libraries read these variables once, when they are loaded, so
+    they only take effect in freshly spawned workers.
+    """
+    saved = {k: os.environ.get(k) for k in THREAD_VARIABLES}
+    os.environ.update({k: str(threads) for k in THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_STORE: DataStore | None = None
+
+
+def _init_worker(cache: ColumnarCache | None) -> None:
+    global _STORE
+    _STORE = DataStore(cache)
+
+
+def _run_unit(specs: list[dict], base: str) -> list[dict]:
+    return run_unit(specs, base, _STORE)
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _unit_cost(specs: list[dict]) -> int:
+    try:
+        size = Path(specs[0]["data"]).stat().st_size
+    except OSError:
+        size = 0
+    return size * len(specs)
+
+
+def _warm_cache(cache: ColumnarCache | None, units: list) -> None:
+    """Convert datasets up front so that workers never race on a conversion."""
+    if cache is None:
+        return
+    for path in sorted({specs[0]["data"] for _, specs in units}):
+        if Path(path).exists():
+            try:
+                cache.ensure(path)
+            except OSError:
+                pass  # workers fall back to reading the .dta
+
+
+def run_manifests(manifests: list[dict], jobs: int | None = None,
+                  only: list[str] | None = None, batch: bool = True,
+                  cache: ColumnarCache | None = None) -> dict:
+    """Run several manifests in one process pool; returns a consolidated report.
+
+    ``jobs=None`` uses every core; with one job (or one unit of work) the
+    specs run in this process.
+    """
+    start = time.perf_counter()
+    selected = [select_specs(m, only) for m in manifests]
+    units = [(i, unit) for i, (m, specs) in enumerate(zip(manifests, selected))
+             for unit in plan_units(specs, batch)]
+    results = [[] for _ in manifests]
+
+    cores = os.cpu_count() or 1
+    jobs = min(jobs or cores, len(units)) or 1
+    if jobs == 1:
+        store = DataStore(cache)
+        for i, unit in units:
+            results[i] += run_unit(unit, manifests[i]["base"], store)
+    else:
+        _warm_cache(cache, units)
+        units.sort(key=lambda u: _unit_cost(u[1]), reverse=True)
+        # spawn, not fork: the parent has already loaded numpy with its
+        # default thread count, and the limits must apply before the import
+        context = multiprocessing.get_context("spawn")
+        with limited_threads(max(1, cores // jobs)), \
+                ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                                    initializer=_init_worker,
+                                    initargs=(cache,)) as pool:
+            futures = {pool.submit(_run_unit, unit, manifests[i]["base"]): (i, unit)
+                       for i, unit in units}
+            for future in as_completed(futures):
+                i, unit = futures[future]
+                try:
+                    results[i] += future.result()
+                except Exception as e:  # e.g. a worker killed by the OOM killer
+                    results[i] += [error_result(spec, f"{type(e).__name__}: {e}")
+                                   for spec in unit]
+
+    reports = [manifest_report(m, specs, r)
+               for m, specs, r in zip(manifests, selected, results)]
+    overall = summarize([s for r in reports for s in r["specs"]])
+    return {**overall, "jobs": jobs, "seconds": time.perf_counter() - start,
+            "manifests": reports}
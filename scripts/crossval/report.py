@@ -0,0 +1,119 @@
+"""
+Text rendering of cross-validation reports.
+"""
+
+from .engine import RELATIVE
+
+WIDTH = 70
+
+LABELS = {"coef": "Coef", "se": "SE", "n": "N", "r2": "R²", "r2_within": "Within R²",
+          "boot_p": "Bootstrap p", "h": "Bandwidth", "fs_f": "First-stage F",
+          "kp_f": "KP rk Wald F", "ar_f": "Anderson-Rubin F", "hansen_j": "Hansen J",
+          "truth": "True effect"}
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "—"
+    if isinstance(value, float) and value.is_integer() and abs(value) >= 100:
+        return f"{value:.0f}"
+    return f"{value:.6f}" if isinstance(value, float) else str(value)
+
+
+def _fmt_diff(check: dict) -> str:
+    if check["diff"] is None:
+        return "missing"
+    if check["quantity"] in RELATIVE:
+        return f"{check['diff']:.4%} (<= {check['tolerance']:.2%})"
+    return f"{check['diff']:.6g} (<= {check['tolerance']:g})"
+
+
+def _fmt_bound(value, unbounded: str) -> str:
+    return unbounded if value is None else f"{value:.4f}"
+
+
+def print_spec(result: dict) -> None:
+    print(f"\n[{result['status']}] {result['name']}  ({result['backend']}, "
+          f"{result['seconds']:.2f}s)")
+    print(f"  {result['formula']}")
+    if result["note"]:
+        print(f"  Note: {result['note']}")
+    estimate = result["estimate"]
+    if estimate is None:
+        return
+    boot = estimate.get("bootstrap")
+    if boot:
+        print(f"  Wild cluster bootstrap ({boot['type']}, {boot['weights']}, "
+              f"{boot['reps']} reps, {boot['clusters']} clusters): "
+              f"{boot['term']} = {boot['null']:g}: t = {boot['t']:.4f}, p = {boot['p']:.4f}")
+    bacon = estimate.get("bacon")
+    if bacon:
+        print("  Bacon decomposition: " + ", ".join(
+            f"{kind} {part['estimate']:.4f} (weight {part['weight']:.3f})"
+            for kind, part in bacon["summary"].items()))
+    iv = estimate.get("iv")
+    if iv:
+        hansen = iv["hansen"]
+        print(f"  IV diagnostics ({iv['estimator'].upper()}, kappa = {iv['kappa']:.6f}): "
+              f"KP rk Wald F = {iv['kp']['f']:.2f}, Hansen J = {hansen['j']:.4f}"
+              + (f" (p = {hansen['p']:.4f})" if hansen["p"] is not None
+                 else " (exactly identified)"))
+        print("  First stage: " + ", ".join(
+            f"{name} F = {s['f']:.2f} (partial R² {s['partial_r2']:.3f})"
+            for name, s in iv["first_stage"].items()))
+        ar = iv["ar"]
+        line = f"  Anderson-Rubin: F = {ar['f']:.4f}, p = {ar['p']:.4f}"
+        if "set" in ar:
+            line += f"; {ar['level']:.0%} set " + (" U ".join(
+                f"[{_fmt_bound(lo, '-inf')}, {_fmt_bound(hi, '+inf')}]" for lo, hi in ar["set"])
+                or "empty")
+        print(line)
+    density = estimate.get("density")
+    if density:
+        print(f"  Density test (h = {density['h']:.4f}): f- = {density['f_left']:.5f}, "
+              f"f+ = {density['f_right']:.5f}, t = {density['t']:.4f}, p = {density['p']:.4f}")
+
+    if result["checks"]:
+        print(f"  {'':30s} {'Python':>14s} {'Reference':>14s}  Diff")
+        for c in result["checks"]:
+            label = LABELS[c["quantity"]] + (f" ({c['term']})" if c["term"] else "")
+            if c.get("against"):
+                label += f" vs {c['against']}"
+            print(f"  {label:30s} {_fmt(c['python']):>14s} {_fmt(c['stata']):>14s}  "
+                  f"{_fmt_diff(c)}  [{c['status']}]")
+    else:
+        print("  Python estimates (for reference):")
+        for term in result["terms"]:
+            b = estimate["coef"].get(term)
+            se = estimate["se"].get(term)
+            print(f"    {term:18s} {_fmt(b):>14s}  (SE {_fmt(se)})")
+
+
+def print_report(report: dict) -> None:
+    print("=" * WIDTH)
+    print(f"Cross-Validation: Stata vs Python — {report['name']}")
+    print("=" * WIDTH)
+    for result in report["specs"]:
+        print_spec(result)
+    counts = report["counts"]
+    print("\n" + "-" * WIDTH)
+    print(f"OVERALL: {report['status']}  "
+          + "  ".join(f"{k}={v}" for k, v in counts.items() if v))
+    print("-" * WIDTH)
+
+
+def print_summary(summary: dict) -> None:
+    """One line per manifest after the individual reports of a multi-manifest run."""
+    reports = summary["manifests"]
+    n_specs = sum(len(r["specs"]) for r in reports)
+    print("\n" + "=" * WIDTH)
+    print(f"Cross-Validation Summary — {len(reports)} manifests, {n_specs} specs, "
+          f"{summary['seconds']:.1f}s ({summary['jobs']} worker(s))")
+    print("=" * WIDTH)
+    for report in reports:
+        counts = "  ".join(f"{k}={v}" for k, v in report["counts"].items() if v)
+        print(f"  [{report['status']:5s}] {report['name']:32s} {counts}")
+    print("-" * WIDTH)
+    print(f"OVERALL: {summary['status']}  "
+          + "  ".join(f"{k}={v}" for k, v in summary["counts"].items() if v))
+    print("-" * WIDTH)
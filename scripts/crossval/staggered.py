@@ -0,0 +1,342 @@
+"""
+Staggered-adoption DID: Callaway & Sant'Anna (2021) group-time ATTs and the
+Goodman-Bacon (2021) decomposition of two-way fixed effects.
+
+The outcome is pivoted once into a units x periods matrix with units sorted
+by cohort. Every ATT(g,t) cell is a difference of cohort means of
+``Y[:, t] - Y[:, base]``, so all cells come from one gather of the
+period-difference columns and one ``np.add.reduceat`` over the cohort blocks;
+the unit-level influence functions are built from the same matrix, and the
+aggregations (simple, event study, group) are matrix products of it.
+Standard errors are the analytical ones of ``csdid`` / R ``did``: clustered
+by unit and including the estimation effect of the cohort-share weights.
+
+The estimator is the unconditional one (no covariates), i.e. ``csdid y,
+ivar() time() gvar()``: never-treated (or not-yet-treated) controls, base
+period ``g-1`` after treatment and ``t-1`` before it (csdid's default
+"short gaps"). Units must be observed in every period; incomplete units are
+dropped, as csdid does for panel data.
+
+The Bacon decomposition uses cohort-by-period means and cumulative sums over
+periods, so every 2x2 comparison costs O(1) whatever the panel length; its
+weighted sum equals the TWFE coefficient of ``y ~ D | unit + period``.
+"""
+
+import numpy as np
+
+from .numpy_backend import fit_numpy, parse_formula
+
+AGGREGATIONS = ("attgt", "simple", "event", "group", "bacon")
+CONTROLS = ("never", "notyet")
+BACON_TYPES = ("Timing_groups", "Always_v_timing", "Never_v_timing")
+
+
+# ---------------------------------------------------------------------------
+# Panel
+# ---------------------------------------------------------------------------
+
+class Panel:
+    """A balanced panel as a units x periods outcome matrix (units and periods sorted)."""
+
+    def __init__(self, df, y: str, ivar: str, tvar: str, extra: list[str] = ()):
+        import pandas as pd
+
+        df = df.loc[df[[y, ivar, tvar, *extra]].notna().all(axis=1)]
+        unit_codes, units = pd.factorize(df[ivar], sort=True)
+        time_codes, periods = pd.factorize(df[tvar], sort=True)
+        n_units, n_periods = len(units), len(periods)
+        cell = unit_codes.astype(np.int64) * n_periods + time_codes
+        if len(np.unique(cell)) != len(cell):
+            raise ValueError(f"{ivar} x {tvar} does not identify observations")
+
+        # Only units observed in every period are kept
+        complete = np.bincount(unit_codes, minlength=n_units) == n_periods
+        keep = complete[unit_codes]
+        self.y = np.full((n_units, n_periods), np.nan)
+        self.y[unit_codes, time_codes] = df[y].to_numpy(np.float64)
+        self.y = self.y[complete]
+        self.units = np.asarray(units)[complete]
+        self.periods = np.asarray(periods, dtype=np.float64)
+        self.df = df.loc[keep]
+        self._codes = unit_codes[keep], time_codes[keep]
+        self._renumber = np.cumsum(complete) - 1
+        self.n_units = len(self.units)
+        self.n_obs = self.n_units * n_periods
+
+    def matrix(self, column: str) -> np.ndarray:
+        """``column`` of the kept observations as a units x periods matrix."""
+        units, times = self._codes
+        out = np.empty(self.y.shape)
+        out[self._renumber[units], times] = self.df[column].to_numpy(np.float64)
+        return out
+
+    def unit_values(self, column: str) -> np.ndarray:
+        """A column that must be constant within unit, one value per unit."""
+        values = self.matrix(column)
+        if (values != values[:, :1]).any():
+            raise ValueError(f"'{column}' varies within unit")
+        return values[:, 0]
+
+
+# ---------------------------------------------------------------------------
+# Group-time ATTs
+# ---------------------------------------------------------------------------
+
+class GroupTime:
+    """All ATT(g,t) cells of a panel with their unit-level influence functions.
+
+    Cohort 0 is never treated; units treated in the first
+    period are dropped and cohorts after the last period count as never
+    treated, as in R ``did``.
+    """
+
+    def __init__(self, panel: Panel, gvar: str, control: str = "never"):
+        if control not in CONTROLS:
+            raise ValueError(f"unknown control group '{control}' (use {', '.join(CONTROLS)})")
+        self.periods = periods = panel.periods
+        g = panel.unit_values(gvar)
+        g = np.where(g > periods[-1], 0.0, g)
+        keep = ~((g > 0) & (g <= periods[0]))
+        y, g = panel.y[keep], g[keep]
+
+        # Units sorted by cohort: every cohort is one contiguous block
+        order = np.argsort(g, kind="stable")
+        y, g = y[order], g[order]
+        groups, starts, sizes = np.unique(g, return_index=True, return_counts=True)
+        if groups[0] != 0:
+            raise ValueError("no never-treated units")
+        self.groups = groups[1:]
+        self.n = n = len(g)
+        self.n_obs = n * len(periods)
+        self.pg = sizes[1:] / n
+        self.unit_group = np.repeat(np.arange(-1, len(self.groups)), sizes)
+
+        # Cells: (cohort, period) with base g-1 after treatment, t-1 before
+        c, t = np.meshgrid(np.arange(len(self.groups)), np.arange(1, len(periods)),
+                           indexing="ij")
+        c, t = c.ravel(), t.ravel()
+        first = np.searchsorted(periods, self.groups)[c]
+        base = np.where(t >= first, first - 1, t - 1)
+        self.cell_group, self.cell_time, self.cell_base = c, t, base
+        self.names = [f"g{_label(self.groups[ci])}:t_{_label(periods[bi])}_{_label(periods[ti])}"
+                      for ci, bi, ti in zip(c, base, t)]
+
+        dy = y[:, t] - y[:, base]                              # units x cells
+        sums = np.add.reduceat(dy, starts, axis=0)             # (never + cohorts) x cells
+        if control == "never":
+            in_control = np.zeros((len(groups), len(c)), dtype=bool)
+            in_control[0] = True
+        else:
+            # Not yet treated by max(t, base) and not the cell's own cohort
+            last = periods[np.maximum(t, base)]
+            in_control = (groups[:, None] > last[None, :]) | (groups[:, None] == 0)
+            in_control[c + 1, np.arange(len(c))] = False
+        n_control = sizes @ in_control
+        if (n_control == 0).any():
+            raise ValueError("a group-time cell has no control units")
+        mean_treated = sums[c + 1, np.arange(len(c))] / sizes[c + 1]
+        mean_control = (sums * in_control).sum(axis=0) / n_control
+        self.att = mean_treated - mean_control
+
+        # Influence functions, scaled so that Var(att) = sum(psi**2) / n**2
+        block = self.unit_group[:, None]
+        treated = block == c[None, :]
+        controls = in_control[block[:, 0] + 1]
+        psi = np.where(treated, (dy - mean_treated) * (n / sizes[c + 1]), 0.0)
+        psi -= np.where(controls, (dy - mean_control) * (n / n_control), 0.0)
+        self.psi = psi
+
+    def se(self, influence: np.ndarray) -> np.ndarray:
+        return np.sqrt((influence ** 2).sum(axis=0)) / self.n
+
+    def weighted(self, keepers: np.ndarray, att: np.ndarray, psi: np.ndarray,
+                 groups: np.ndarray) -> tuple[float, np.ndarray]:
+        """Cohort-share weighted average of ``att[keepers]`` and its influence function.
+
+        The weights pg / sum(pg) are estimated, which adds
+        (A_c - theta * K_c) / S to the influence function of a unit in
+        cohort c, with A_c and K_c the sum and number of the kept estimates
+        of that cohort and S the sum of their cohort shares.
+        """
+        pg = self.pg[groups[keepers]]
+        total = pg.sum()
+        theta = float(pg @ att[keepers]) / total
+        sums = np.bincount(groups[keepers], weights=att[keepers], minlength=len(self.pg))
+        counts = np.bincount(groups[keepers], minlength=len(self.pg))
+        wif = np.append((sums - theta * counts) / total, 0.0)  # never treated: 0
+        return theta, psi[:, keepers] @ (pg / total) + wif[self.unit_group]
+
+    def aggregate(self, kind: str) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """(names, estimates, influence functions) of a ``csdid_stats`` aggregation."""
+        if kind == "attgt":
+            return self.names, self.att, self.psi
+        c, t = self.cell_group, self.cell_time
+        first = np.searchsorted(self.periods, self.groups)[c]
+        post = t >= first
+        if kind == "simple":
+            theta, inf = self.weighted(np.flatnonzero(post), self.att, self.psi, c)
+            return ["ATT"], np.array([theta]), inf[:, None]
+        if kind == "event":
+            event = t - first
+            names, est, inf = [], [], []
+            for e in np.unique(event):
+                theta, i = self.weighted(np.flatnonzero(event == e), self.att, self.psi, c)
+                names.append(f"Tm{-e}" if e < 0 else f"Tp{e}")
+                est.append(theta)
+                inf.append(i)
+            est, inf = np.array(est), np.column_stack(inf)
+            pre, after = np.unique(event) < 0, np.unique(event) >= 0
+            averages = np.column_stack([inf[:, pre].mean(axis=1), inf[:, after].mean(axis=1)])
+            return (["Pre_avg", "Post_avg", *names],
+                    np.concatenate([[est[pre].mean(), est[after].mean()], est]),
+                    np.column_stack([averages, inf]))
+        if kind == "group":
+            # Equal-weight average over each cohort's post-treatment cells
+            weights = np.zeros((len(c), len(self.groups)))
+            weights[np.flatnonzero(post), c[post]] = 1.0
+            weights /= weights.sum(axis=0)
+            est, inf = self.att @ weights, self.psi @ weights
+            cohorts = np.arange(len(self.groups))
+            theta, i = self.weighted(cohorts, est, inf, cohorts)
+            return (["GAverage", *(f"G{_label(g)}" for g in self.groups)],
+                    np.concatenate([[theta], est]), np.column_stack([i, inf]))
+        raise ValueError(f"unknown aggregation '{kind}' (use {', '.join(AGGREGATIONS)})")
+
+
+def _label(value: float) -> str:
+    return f"{value:g}"
+
+
+def group_time_att(df, y: str, ivar: str, tvar: str, gvar: str,
+                   control: str = "never") -> GroupTime:
+    return GroupTime(Panel(df, y, ivar, tvar, [gvar]), gvar, control)
+
+
+# ---------------------------------------------------------------------------
+# Goodman-Bacon decomposition
+# ---------------------------------------------------------------------------
+
+def bacon_decomposition(df, y: str, treatment: str, ivar: str, tvar: str) -> list[dict]:
+    """Every 2x2 DID behind the TWFE coefficient of ``treatment``, with its weight.
+
+    ``treatment`` must be binary and absorbing. Returns one dict per
+    comparison: ``{"type", "treated", "control", "estimate", "weight"}``,
+    cohorts labelled by their first treated period ("never" for U).
+    """
+    panel = Panel(df, y, ivar, tvar, [treatment])
+    d = panel.matrix(treatment)
+    if not np.isin(d, (0, 1)).all() or (np.diff(d, axis=1) < 0).any():
+        raise ValueError(f"'{treatment}' must be a binary, absorbing treatment")
+    n_periods = d.shape[1]
+    timing = np.where(d.any(axis=1), d.argmax(axis=1), n_periods)  # T: never treated
+
+    groups, codes, sizes = np.unique(timing, return_inverse=True, return_counts=True)
+    sums = np.bincount((codes[:, None] * n_periods + np.arange(n_periods)).ravel(),
+                       weights=panel.y.ravel(), minlength=len(groups) * n_periods)
+    means = sums.reshape(len(groups), n_periods) / sizes[:, None]
+    cum = np.concatenate([np.zeros((len(groups), 1)), np.cumsum(means, axis=1)], axis=1)
+
+    def window(k, start, stop):
+        """Mean over periods [start, stop) of cohort rows ``k``."""
+        return (cum[k, stop] - cum[k, start]) / (stop - start)
+
+    share = sizes / sizes.sum()
+    dbar = (n_periods - groups) / n_periods
+    treated = np.flatnonzero(groups < n_periods)
+    never = np.flatnonzero(groups == n_periods)
+    parts = []
+
+    # Treated vs never treated
+    if len(never):
+        u = never[0]
+        k = treated[groups[treated] > 0]
+        t_k = groups[k]
+        est = ((window(k, t_k, n_periods) - window(k, 0, t_k))
+               - (window(u, t_k, n_periods) - window(u, 0, t_k)))
+        nku = share[k] / (share[k] + share[u])
+        weight = (share[k] + share[u]) ** 2 * nku * (1 - nku) * dbar[k] * (1 - dbar[k])
+        parts.append(("Never_v_timing", k, np.full(len(k), u), est, weight))
+
+    # Pairs of treated cohorts, k treated before l
+    k, l = np.triu_indices(len(treated), 1)
+    k, l = treated[k], treated[l]
+    t_k, t_l = groups[k], groups[l]
+    nkl = share[k] / (share[k] + share[l])
+    scale = (share[k] + share[l]) ** 2 * nkl * (1 - nkl)
+
+    # Earlier k vs later l (not yet treated) over [0, t_l); needs a pre-period for k
+    early = t_k > 0
+    ke, le, tke, tle = k[early], l[early], t_k[early], t_l[early]
+    est = ((window(ke, tke, tle) - window(ke, 0, tke))
+           - (window(le, tke, tle) - window(le, 0, tke)))
+    weight = (scale[early] * (1 - dbar[le]) ** 2
+              * (dbar[ke] - dbar[le]) / (1 - dbar[le]) * (1 - dbar[ke]) / (1 - dbar[le]))
+    parts.append(("Timing_groups", ke, le, est, weight))
+
+    # Later l vs earlier k (already treated) over [t_k, T)
+    est = ((window(l, t_l, n_periods) - window(l, t_k, t_l))
+           - (window(k, t_l, n_periods) - window(k, t_k, t_l)))
+    weight = scale * dbar[k] ** 2 * dbar[l] / dbar[k] * (dbar[k] - dbar[l]) / dbar[k]
+    types = np.where(t_k == 0, "Always_v_timing", "Timing_groups")
+    parts.append((types, l, k, est, weight))
+
+    total = sum(float(p[4].sum()) for p in parts)
+    labels = [_label(p) for p in panel.periods] + ["never"]
+    comparisons = []
+    for kind, treated_rows, control_rows, est, weight in parts:
+        kinds = np.broadcast_to(kind, est.shape)
+        for t, a, b, e, w in zip(kinds, treated_rows, control_rows, est, weight):
+            comparisons.append({"type": str(t), "treated": labels[groups[a]],
+                                "control": labels[groups[b]], "estimate": float(e),
+                                "weight": float(w) / total})
+    return comparisons
+
+
+def bacon_summary(comparisons: list[dict]) -> dict[str, dict]:
+    """Weight and weighted-average estimate of each comparison type."""
+    summary = {}
+    for kind in BACON_TYPES:
+        rows = [c for c in comparisons if c["type"] == kind]
+        weight = sum(c["weight"] for c in rows)
+        if weight > 0:
+            summary[kind] = {"estimate": sum(c["weight"] * c["estimate"] for c in rows) / weight,
+                             "weight": weight}
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Backend
+# ---------------------------------------------------------------------------
+
+def fit_staggered(df, spec: dict) -> dict:
+    """Backend for specs with a ``did`` block (see manifest.py).
+
+    ATT aggregations read the outcome from ``y ~ 1``; ``bacon`` takes
+    ``y ~ D | unit + period`` and reports the decomposition's total as the
+    coefficient of D next to the per-type averages, with the TWFE
+    regression's standard error, N and R² (as ``bacondecomp`` prints).
+    """
+    options = spec["did"]
+    depvar, exog, fixef, endog, _ = parse_formula(spec["formula"])
+    if options["aggregate"] == "bacon":
+        if len(exog) != 1 or endog or set(fixef) != {options["ivar"], options["time"]}:
+            raise ValueError("bacon needs 'y ~ D | unit + period' with the did block's "
+                             "ivar and time")
+        comparisons = bacon_decomposition(df, depvar, exog[0], options["ivar"],
+                                          options["time"])
+        summary = bacon_summary(comparisons)
+        estimate = fit_numpy(df, spec)
+        estimate["coef"] = {exog[0]: sum(c["weight"] * c["estimate"] for c in comparisons),
+                            **{k: v["estimate"] for k, v in summary.items()}}
+        estimate["bacon"] = {"summary": summary, "comparisons": comparisons}
+        return estimate
+
+    if exog or fixef or endog:
+        raise ValueError("staggered ATTs are unconditional: use 'y ~ 1'")
+    result = group_time_att(df, depvar, options["ivar"], options["time"], options["gvar"],
+                            options["control"])
+    names, est, inf = result.aggregate(options["aggregate"])
+    se = result.se(inf)
+    return {"coef": dict(zip(names, map(float, est))),
+            "se": dict(zip(names, map(float, se))),
+            "n": result.n_obs, "r2": None, "r2_within": None}
@@ -0,0 +1,351 @@
+"""
+Stata estimation results read back from logs and .dta exports.
+
+Logs are scanned line by line: every estimation command echoed in the log
+(``reghdfe``, ``ivreghdfe``, ``xtreg``, ``csdid``, ...) opens a model, the
+header statistics and the coefficient table printed after it fill it in,
+and ``eststo`` / ``estimates store`` labels it. Models are then looked up by
+label, or by ``<command>#<k>`` (k-th run of that command) when unlabeled.
+
+Exports come in two shapes:
+
+- long, one row per model x term (``regsave`` / ``parmest`` style), with a
+  model label column when the file holds several models;
+- wide, a single row of ``coef_<term>`` / ``se_<term>`` columns, as written
+  by the ``stata_coefs.dta`` blocks in the .do files.
+
+Either way a model is a dict ``{"label", "command", "coef": {term: b},
+"se": {term: se}, "n", "r2", "r2_within", "boot_p", "h", "fs_f", "kp_f",
+"ar_f", "hansen_j"}``; ``boot_p`` is the p-value of the last ``boottest`` run
+after the model, ``h`` the bandwidth of an ``rdrobust`` fit, and the last
+four are the IV diagnostics printed by ``ivreg2`` / ``ivreghdfe`` (``fs_f``
+only comes from exports).
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+ESTIMATION_COMMANDS = {
+    "reg", "regr", "regre", "regres", "regress", "areg", "reghdfe", "ppmlhdfe",
+    "ivreghdfe", "ivreg2", "ivregress", "xtreg", "xtivreg", "xtivreg2",
+    "xtabond2", "csdid", "csdid_stats", "bacondecomp", "did_multiplegt", "logit", "probit",
+    "poisson", "rdrobust",
+}
+
+PREFIX = re.compile(
+    r"^(?:(?:qui(?:e|et|etl|etly)?|n(?:oi|ois|oisi|oisil|oisily))\b\s*:?\s*"
+    r"|cap(?:t|tu|tur|ture)?\b\s*:?\s*"
+    r"|(?:eststo|estpost)\s*(?P<label>\w*)\s*:\s*"
+    r"|(?:xi|by(?:sort)?\s[^:]*)\s*:\s*)"
+)
+STORE = re.compile(
+    r"^(?:eststo|est(?:i|im|ima|imat|imate|imates)?\s+sto(?:re)?)\s+(\w+)\s*(?:,.*)?$")
+ESTORE_OPTION = re.compile(r"\bestore\((\w+)\)")
+
+NUMBER = r"-?(?:\d[\d,]*\.?\d*|\.\d+)(?:e[-+]?\d+)?"
+STATS = [
+    ("n", re.compile(r"Number of obs\s*=\s*(" + NUMBER + ")")),
+    ("r2", re.compile(r"(?<!Adj )R-squared\s*=\s*(" + NUMBER + ")")),
+    ("r2_within", re.compile(r"Within R-sq\.\s*=\s*(" + NUMBER + ")")),
+    ("r2_within", re.compile(r"^\s*[Ww]ithin\s*=\s*(" + NUMBER + ")")),
+    ("h", re.compile(r"BW est\. \(h\)\s*\|\s*(" + NUMBER + ")")),
+    ("kp_f", re.compile(r"Kleibergen-Paap rk Wald F statistic\):\s*(" + NUMBER + ")")),
+    ("hansen_j", re.compile(r"Hansen J statistic \(overidentification test of all "
+                            r"instruments\):\s*(" + NUMBER + ")")),
+    ("ar_f", re.compile(r"Anderson-Rubin Wald test\s+F\(\s*\d+,\s*\d+\)\s*=\s*("
+                        + NUMBER + ")")),
+]
+# Header lines worth matching against STATS
+STATS_MARKERS = ("=", "BW est.", "statistic")
+BOOT_P = re.compile(r"Prob>\|[tz]\|\s*=\s*(" + NUMBER + ")")
+TABLE_HEADER_WORDS = ("Coefficient", "Coef.")
+
+# Scalar statistics carried by a model next to its coefficients
+SCALARS = ("n", "r2", "r2_within", "boot_p", "h", "fs_f", "kp_f", "ar_f", "hansen_j")
+VALUE = re.compile(r"^(?:" + NUMBER + r"|\.)$")
+SKIPPED_ROW = re.compile(r"\((?:omitted|base|empty)\)")
+
+
+def _number(text: str) -> float | None:
+    return None if text == "." else float(text.replace(",", ""))
+
+
+# ---------------------------------------------------------------------------
+# Log parsing
+# ---------------------------------------------------------------------------
+
+def _command_words(cmdline: str) -> tuple[str, str | None]:
+    """Strip prefixes; return (command, eststo label if any)."""
+    label = None
+    while True:
+        m = PREFIX.match(cmdline)
+        if not m:
+            break
+        label = m.group("label") or label
+        cmdline = cmdline[m.end():]
+    return cmdline.split(" ", 1)[0].rstrip(",:"), label
+
+
+def _resolve_abbreviation(name: str, cmdline: str) -> str:
+    """Stata shortens long names in tables (``unemploy~t``); expand from the command."""
+    if "~" not in name:
+        return name
+    head, tail = name.split("~", 1)
+    for token in re.findall(r"[A-Za-z_]\w*", cmdline):
+        if token.startswith(head) and token.endswith(tail) and len(token) > len(head) + len(tail):
+            return token
+    return name
+
+
+class _Model:
+    def __init__(self, command: str, cmdline: str, label: str | None, line: int):
+        self.command = command
+        self.cmdline = cmdline
+        self.label = label
+        self.line = line
+        self.depvar = None
+        self.coef = {}
+        self.se = {}
+        self.stats = {}
+
+    def as_dict(self) -> dict:
+        return {"label": self.label, "command": self.command, "cmdline": self.cmdline,
+                "line": self.line, "depvar": self.depvar, "coef": self.coef,
+                "se": self.se, **{k: self.stats.get(k) for k in SCALARS}}
+
+
+def parse_log_lines(lines) -> list[dict]:
+    """Models estimated in a Stata log, in order; unlabeled ones included.
+
+    Models whose output was suppressed (``quietly``) are tracked so that a
+    following ``estimates store`` labels the right estimation, but they are
+    not returned. Tables printed without an echoed command (loop bodies)
+    become unlabeled models of command ``?``. ``boottest`` p-values are
+    attached to the preceding model.
+    """
+    models: list[_Model] = []
+    current = None  # model receiving output; None after any other command
+    booted = None  # model tested by the boottest being printed
+    in_table = False
+    group = None
+    pending = None  # command text being joined across "> " continuation lines
+    pending_line = 0
+
+    def start_command(text: str, line: int):
+        nonlocal current, in_table, booted
+        in_table = False
+        booted = None
+        stored = STORE.match(text)
+        if stored:
+            if models and stored.group(1) != "clear":
+                models[-1].label = stored.group(1)
+            return
+        command, label = _command_words(text)
+        if command == "boottest" and models:
+            booted = models[-1]
+        if command in ESTIMATION_COMMANDS:
+            estore = ESTORE_OPTION.search(text)
+            current = _Model(command, text, label or (estore and estore.group(1)), line)
+            models.append(current)
+        else:
+            current = None
+
+    for number, raw in enumerate(lines, 1):
+        line = raw.rstrip("\r\n")
+
+        if pending is not None:
+            if line.startswith("> "):
+                pending = pending.rstrip("/ ") + " " + line[2:].strip()
+                continue
+            start_command(pending, pending_line)
+            pending = None
+        if line.startswith(". "):
+            pending, pending_line = line[2:].strip(), number
+            continue
+
+        if in_table:
+            if line.startswith("-"):
+                in_table = "+" in line  # "----+----" separates, plain dashes close
+                group = None
+                continue
+            name, bar, values = line.partition("|")
+            if not bar:
+                continue
+            name, rest = name.strip(), values.split()
+            if not name:
+                group = None  # blank row between factor-variable blocks
+                continue
+            if not rest:
+                group = name  # equation or factor-variable header
+                continue
+            if SKIPPED_ROW.search(values):
+                continue
+            if len(rest) < 2 or not (VALUE.match(rest[0]) and VALUE.match(rest[1])):
+                continue
+            name = _resolve_abbreviation(name, current.cmdline)
+            if group is not None:
+                name = (f"{name}.{group}" if name.replace(".", "").isdigit()
+                        else f"{group}:{name}")
+            current.coef[name] = _number(rest[0])
+            current.se[name] = _number(rest[1])
+            continue
+
+        name, bar, values = line.partition("|")
+        if bar and values.lstrip().startswith(TABLE_HEADER_WORDS):
+            if current is None:
+                current = _Model("?", "", None, number)
+                models.append(current)
+            elif current.coef:  # later table of the same command, e.g. after first stages
+                current.coef, current.se = {}, {}
+            current.depvar = name.strip() or None
+            in_table, group = True, None
+            continue
+
+        if booted is not None and "Prob>" in line:
+            m = BOOT_P.search(line)
+            if m:
+                booted.stats["boot_p"] = _number(m.group(1))
+            continue
+
+        if current is not None and any(marker in line for marker in STATS_MARKERS):
+            for key, pattern in STATS:
+                m = pattern.search(line)
+                if m:
+                    current.stats[key] = _number(m.group(1))
+
+    if pending is not None:
+        start_command(pending, pending_line)
+
+    counts = {}
+    result = []
+    for model in models:
+        counts[model.command] = counts.get(model.command, 0) + 1
+        if model.coef:
+            d = model.as_dict()
+            d["key"] = f"{model.command}#{counts[model.command]}"
+            result.append(d)
+    return result
+
+
+def parse_log(path: str | Path) -> list[dict]:
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        return parse_log_lines(fh)
+
+
+# ---------------------------------------------------------------------------
+# .dta exports
+# ---------------------------------------------------------------------------
+
+EXPORT_COLUMNS = {
+    "label": ("model", "label", "spec", "estimates", "name"),
+    "term": ("var", "term", "parm", "variable"),
+    "coef": ("coef", "estimate", "b"),
+    "se": ("stderr", "se", "std_err"),
+    "n": ("N", "n", "nobs"),
+    "r2": ("r2",),
+    "r2_within": ("r2_within", "r2_w", "r2within"),
+    "boot_p": ("boot_p", "p_boot", "boottest_p"),
+    "h": ("h", "bw", "bw_val", "bandwidth"),
+    "fs_f": ("fs_F", "fs_f", "first_F"),
+    "kp_f": ("kp_F", "kp_f", "widstat"),
+    "ar_f": ("ar_F", "ar_f"),
+    "hansen_j": ("hansen_j", "hansen_J"),
+}
+WIDE_COLUMN = re.compile(r"^(coef|b|se)_(\w+)$")
+
+
+def _find_column(frame, role: str) -> str | None:
+    for name in EXPORT_COLUMNS[role]:
+        if name in frame.columns:
+            return name
+    return None
+
+
+def read_estimates(path: str | Path) -> list[dict]:
+    """Models stored in a long or wide .dta export."""
+    import pandas as pd
+
+    frame = pd.read_stata(path)
+    default_label = Path(path).stem
+    term_col = _find_column(frame, "term")
+
+    if term_col is None:  # wide single-row export
+        if len(frame) != 1:
+            raise ValueError(f"{path}: wide export must have exactly one row")
+        row = frame.iloc[0]
+        model = {"label": default_label, "command": "export", "coef": {}, "se": {}}
+        for column in frame.columns:
+            m = WIDE_COLUMN.match(column)
+            if m:
+                key = "se" if m.group(1) == "se" else "coef"
+                model[key][m.group(2)] = float(row[column])
+        for role in SCALARS:
+            column = _find_column(frame, role)
+            model[role] = float(row[column]) if column else None
+        return [model]
+
+    coef_col = _find_column(frame, "coef")
+    if coef_col is None:
+        raise ValueError(f"{path}: no coefficient column ({'/'.join(EXPORT_COLUMNS['coef'])})")
+    se_col = _find_column(frame, "se")
+    label_col = _find_column(frame, "label")
+    models = {}
+    for label, rows in (frame.groupby(label_col, sort=False) if label_col
+                        else [(default_label, frame)]):
+        model = {"label": str(label), "command": "export",
+                 "coef": dict(zip(rows[term_col].astype(str), rows[coef_col].astype(float))),
+                 "se": (dict(zip(rows[term_col].astype(str), rows[se_col].astype(float)))
+                        if se_col else {})}
+        for role in SCALARS:
+            column = _find_column(frame, role)
+            model[role] = float(rows[column].iloc[0]) if column else None
+        models[str(label)] = model
+    return list(models.values())
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+def index_models(models: list[dict]) -> dict[str, dict]:
+    """Map labels and ``command#k`` keys to models; later runs win."""
+    index = {}
+    for model in models:
+        if model.get("key"):
+            index[model["key"]] = model
+        if model.get("label"):
+            index[model["label"]] = model
+    return index
+
+
+@lru_cache(maxsize=32)
+def _load_results(path: str, mtime_ns: int, size: int) -> dict[str, dict]:
+    if path.lower().endswith(".dta"):
+        return index_models(read_estimates(path))
+    return index_models(parse_log(path))
+
+
+def load_results(path: str | Path) -> dict[str, dict]:
+    """Index of the models in a .log or .dta file.
+
+    Cached on (path, mtime, size), so every spec of a manifest pointing at
+    the same log shares one parse.
+    """
+    st = Path(path).stat()
+    return _load_results(str(path), st.st_mtime_ns, st.st_size)
+
+
+def model_reference(model: dict, rename: dict | None = None) -> dict:
+    """Reference values for the engine: constant dropped, terms renamed."""
+    rename = rename or {}
+
+    def terms(values: dict) -> dict:
+        return {rename.get(k, k): v for k, v in values.items()
+                if k != "_cons" and v is not None}
+
+    reference = {"coef": terms(model["coef"]), "se": terms(model["se"])}
+    for key in SCALARS:
+        if model.get(key) is not None:
+            reference[key] = model[key]
+    return reference
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Runner for the Synthetic Test DGPs
+==============================================
+
+Draws R datasets from the data-generating processes behind tests/ (see
+scripts/synth/) in a process pool and reports bias, RMSE, the SD of the
+estimates against the mean SE, and CI coverage of the TWFE, 2SLS and RD
+estimators.
+
+Usage:
+  python scripts/monte_carlo.py
+  python scripts/monte_carlo.py twfe -R 10000 -j 8 --dgp effect_sd=10 --dgp dynamic=-5
+  python scripts/monte_carlo.py 2sls rdd -R 2000 --seed 1 --json
+"""
+
+import sys
+
+from synth.montecarlo import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,14 +15,29 @@ Usage:
   python scripts/quality_scorer.py v1/
   python scripts/quality_scorer.py v1/ --json
   python scripts/quality_scorer.py v1/ --verbose
+  python scripts/quality_scorer.py v1/ --incremental   # reuse v1/.score_cache.json
+  python scripts/quality_scorer.py --batch "projects/*/v*/" -j 8   # JSON Lines
+  python scripts/quality_scorer.py v1/ --watch
+  python scripts/quality_scorer.py v1/ --profile [--profile-out score.pstats]
+  python scripts/quality_scorer.py v1/ --include data/clean --exclude "*.bak"   # data/, explore/ pruned by default
 """
 
 import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import hashlib
 import json
 import os
 import re
+import select
+import struct
 import sys
-from pathlib import Path
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
 
 
 # ---------------------------------------------------------------------------
@@ -39,11 +54,175 @@ DIM_NAMES_CN = {
 }
 
 
+# ---------------------------------------------------------------------------
+# I/O and matching counters (reported per dimension by --profile)
+# ---------------------------------------------------------------------------
+
+class ScanCounters:
+    """Cumulative counters updated wherever the scorer reads or matches.
+
+    The counters are cheap enough to stay on permanently; ``--profile``
+    attributes them to dimensions by diffing snapshots.
+    """
+
+    def __init__(self):
+        self.files_read = 0
+        self.bytes_read = 0
+        self.regex_seconds = 0.0
+
+    def record_read(self, n_bytes: int) -> None:
+        self.files_read += 1
+        self.bytes_read += n_bytes
+
+    def snapshot(self) -> dict:
+        return {"files_read": self.files_read, "bytes_read": self.bytes_read,
+                "regex_seconds": self.regex_seconds}
+
+
+COUNTERS = ScanCounters()
+
+
 def find_files(base: Path, pattern: str) -> list[Path]:
     """Recursively find files matching a glob pattern."""
     return sorted(base.rglob(pattern))
 
 
+# Pruned by default: data/ and explore/ at the top of the version directory,
+# and VCS / bytecode directories at any depth. Patterns follow .gitignore
+# conventions: a leading "/" anchors to the version directory, a trailing "/"
+# matches directories only, and anything else matches a name at any depth.
+DEFAULT_EXCLUDES = ("/data/", "/explore/", ".git/", "__pycache__/")
+
+
+class WalkRules:
+    """Include/exclude rules for the scorer's directory walk.
+
+    Include patterns win over exclude patterns, so ``--include data/clean``
+    re-enables one subtree of an excluded ``data/`` without walking the rest.
+    """
+
+    def __init__(self, exclude=DEFAULT_EXCLUDES, include=()):
+        self.exclude = tuple(exclude)
+        self.include = tuple(include)
+        # Literal leading part of each include, to know which excluded
+        # directories must still be entered to reach it
+        self._include_prefixes = tuple(
+            re.split(r"[*?\[]", pattern.strip("/"), maxsplit=1)[0]
+            for pattern in self.include
+        )
+
+    @staticmethod
+    def _matches(pattern: str, rel: str, name: str, is_dir: bool) -> bool:
+        if pattern.endswith("/"):
+            if not is_dir:
+                return False
+            pattern = pattern.rstrip("/")
+        if pattern.startswith("/"):
+            return fnmatch.fnmatchcase(rel, pattern[1:])
+        if "/" in pattern:
+            return fnmatch.fnmatchcase(rel, pattern)
+        return fnmatch.fnmatchcase(name, pattern)
+
+    def included(self, rel: str, name: str, is_dir: bool) -> bool:
+        return any(self._matches(p, rel, name, is_dir) for p in self.include)
+
+    def excluded(self, rel: str, name: str, is_dir: bool) -> bool:
+        return any(self._matches(p, rel, name, is_dir) for p in self.exclude)
+
+    def leads_to_include(self, rel: str) -> bool:
+        """True if an include pattern lies strictly below directory ``rel``."""
+        return any(prefix.startswith(rel + "/") for prefix in self._include_prefixes)
+
+
+def walk_tree(base: Path, rules: WalkRules | None = None, top: str = ""):
+    """Walk ``base`` like os.walk, pruning excluded directories before entering them.
+
+    Yields ``(rel_dir, dirnames, filenames)`` with ``rel_dir`` relative to
+    ``base`` in POSIX form ("" for the root). Uses os.scandir so directory
+    type checks come from the directory listing rather than extra stats.
+    Symlinked directories are not followed.
+    """
+    rules = rules or WalkRules()
+    # (relative dir, restricted): inside an excluded directory only entries
+    # that are, or lead to, an include pattern are kept
+    stack = [(top.strip("/"), False)]
+    while stack:
+        rel, restricted = stack.pop()
+        dirnames, filenames = [], []
+        try:
+            it = os.scandir(base / rel if rel else base)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                child = f"{rel}/{name}" if rel else name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and entry.is_symlink() and entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                if rules.included(child, name, is_dir):
+                    child_restricted = False
+                elif restricted or rules.excluded(child, name, is_dir):
+                    if is_dir and rules.leads_to_include(child):
+                        stack.append((child, True))
+                    continue
+                else:
+                    child_restricted = False
+                if is_dir:
+                    dirnames.append(name)
+                    stack.append((child, child_restricted))
+                else:
+                    filenames.append(name)
+        yield rel, dirnames, filenames
+
+
+class FileIndex:
+    """In-memory index of a version directory, built from a single walk.
+
+    Files are grouped by suffix; queries restricted to a subdirectory
+    (e.g. ``output/tables``) are memoised, so every dimension shares one
+    traversal no matter how many times it asks for ``*.do`` or ``*.log``.
+    Directories excluded by ``rules`` (``data/`` etc. by default) are never
+    entered.
+    """
+
+    def __init__(self, base: Path, rules: WalkRules | None = None):
+        self.base = base
+        self._by_suffix: dict[str, list[Path]] = {}
+        self._dirs: set[str] = set()
+        self._memo: dict[tuple[str, str], list[Path]] = {}
+
+        for rel_root, dirnames, filenames in walk_tree(base, rules):
+            self._dirs.add(rel_root)
+            root = base / rel_root if rel_root else base
+            for name in filenames:
+                path = root / name
+                self._by_suffix.setdefault(path.suffix, []).append(path)
+
+        for paths in self._by_suffix.values():
+            paths.sort()
+        self.n_files = sum(len(paths) for paths in self._by_suffix.values())
+
+    def has_dir(self, subdir: str) -> bool:
+        """Return True if ``subdir`` (relative to base) was seen in the walk."""
+        return subdir.strip("/") in self._dirs
+
+    def files(self, suffix: str, subdir: str = "") -> list[Path]:
+        """Return sorted files with ``suffix`` (e.g. ".do") under ``subdir``."""
+        subdir = subdir.strip("/")
+        key = (suffix, subdir)
+        if key not in self._memo:
+            paths = self._by_suffix.get(suffix, [])
+            if subdir:
+                prefix = self.base / subdir
+                paths = [p for p in paths if prefix in p.parents]
+            self._memo[key] = paths
+        return self._memo[key]
+
+
 def read_text(path: Path) -> str:
     """Read file text, return empty string on failure."""
     try:
@@ -52,14 +231,347 @@ def read_text(path: Path) -> str:
         return ""
 
 
+class ContentCache:
+    """Per-run cache of decoded file contents with read-once semantics.
+
+    Entries are keyed by path and validated against (size, mtime), so a file
+    that changes between reads is decoded again. When ``max_bytes`` is set,
+    least-recently-used entries are evicted to stay within the budget; a
+    single file larger than the budget is returned but not retained.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[Path, tuple[int, int, str]] = OrderedDict()
+
+    def read(self, path: Path) -> str:
+        """Return file text, decoding it only on the first request."""
+        try:
+            st = path.stat()
+        except OSError:
+            return ""
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+            self._entries.move_to_end(path)
+            return entry[2]
+        if entry is not None:
+            self._evict(path)
+
+        content = read_text(path)
+        COUNTERS.record_read(st.st_size)
+        if self.max_bytes is None or st.st_size <= self.max_bytes:
+            self._entries[path] = (st.st_size, st.st_mtime_ns, content)
+            self.total_bytes += st.st_size
+            while self.max_bytes is not None and self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return content
+
+    def _evict(self, path: Path) -> None:
+        size, _, _ = self._entries.pop(path)
+        self.total_bytes -= size
+
+
+# ---------------------------------------------------------------------------
+# Streaming pattern scanning (bounded memory for multi-GB logs)
+# ---------------------------------------------------------------------------
+
+LOG_CHUNK_CHARS = 1 << 20   # characters decoded per read
+LOG_CHUNK_OVERLAP = 4096    # tail kept across reads; must exceed the longest match
+
+
+class PatternScanner:
+    """Match a set of labelled regexes in one pass over text or a streamed file.
+
+    Each pattern is counted on its own, as ``re.findall`` would: a line that
+    matches two patterns counts once for each. The patterns are also
+    compiled into a single alternation that serves as a prefilter, so text
+    with no hit at all (the common case for a clean log) is scanned once
+    regardless of how many patterns are registered; only chunks with a hit
+    are re-scanned pattern by pattern. Results map each matched label to
+    ``{"count": n, "first_line": k}``.
+    """
+
+    def __init__(self, patterns: list[tuple[str, str]]):
+        self.labels = [label for _, label in patterns]
+        self._patterns = [re.compile(pattern) for pattern, _ in patterns]
+        self._regex = re.compile("|".join(f"(?:{pattern})" for pattern, _ in patterns))
+
+    def _iter_hits(self, text: str):
+        """Yield (start, labels) for every match in ``text``, pattern by pattern."""
+        if self._regex.search(text) is None:
+            return
+        for pattern, label in zip(self._patterns, self.labels):
+            for m in pattern.finditer(text):
+                yield m.start(), (label,)
+
+    def _scan_into(self, text: str, hits: dict, line_base: int,
+                   limit: int | None = None) -> None:
+        t0 = time.perf_counter()
+        for start, labels in self._iter_hits(text):
+            if limit is not None and start >= limit:
+                continue
+            for label in labels:
+                hit = hits.get(label)
+                if hit is None:
+                    hits[label] = {"count": 1,
+                                   "first_line": line_base + text.count("\n", 0, start)}
+                else:
+                    hit["count"] += 1
+        COUNTERS.regex_seconds += time.perf_counter() - t0
+
+    def scan_text(self, text: str) -> dict:
+        """Scan an in-memory string."""
+        hits: dict = {}
+        self._scan_into(text, hits, 1)
+        return hits
+
+    def scan_file(self, path: Path, chunk_chars: int = LOG_CHUNK_CHARS,
+                  overlap: int = LOG_CHUNK_OVERLAP) -> dict:
+        """Scan a file in chunks; memory use is independent of file size.
+
+        Each chunk is cut after its last newline and the partial line is
+        carried into the next read. If a chunk has no newline at all, only
+        the trailing ``overlap`` characters are carried, so a match spanning
+        the boundary is still found as long as it is shorter than ``overlap``.
+        """
+        hits: dict = {}
+        line_base = 1
+        carry = ""
+        try:
+            fh = open(path, encoding="utf-8", errors="replace")
+        except OSError:
+            return hits
+        with fh:
+            COUNTERS.record_read(os.fstat(fh.fileno()).st_size)
+            while True:
+                try:
+                    chunk = fh.read(chunk_chars)
+                except OSError:
+                    break
+                buf = carry + chunk
+                if not chunk:
+                    self._scan_into(buf, hits, line_base)
+                    break
+                cut = buf.rfind("\n") + 1
+                if cut:
+                    self._scan_into(buf[:cut], hits, line_base)
+                else:
+                    cut = max(len(buf) - overlap, 0)
+                    self._scan_into(buf, hits, line_base, limit=cut)
+                line_base += buf.count("\n", 0, cut)
+                carry = buf[cut:]
+        return hits
+
+
+def _trie_pattern(node: dict) -> str:
+    """Render a character trie as a regex that prefers the longest keyword."""
+    alts = [re.escape(ch) + _trie_pattern(child)
+            for ch, child in sorted(node.items()) if ch]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class KeywordScanner(PatternScanner):
+    """Case-insensitive scan for literal keywords, overlapping hits included.
+
+    Keywords are compiled into a single trie-shaped regex, so the cost per
+    character does not grow with the number of keywords. Every start offset
+    is tried: a hit on "csdid_plot" also counts as "csdid", and "xtserial"
+    also yields "serial" at its own offset.
+    """
+
+    def __init__(self, keywords: list[str]):
+        keywords = [kw.lower() for kw in dict.fromkeys(keywords)]
+        self.labels = keywords
+        self._prefixes = {
+            kw: tuple(other for other in keywords if kw.startswith(other))
+            for kw in keywords
+        }
+        trie: dict = {}
+        for kw in keywords:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._regex = re.compile(_trie_pattern(trie))
+
+    def _iter_hits(self, text: str):
+        text = text.lower()
+        pos = 0
+        while True:
+            m = self._regex.search(text, pos)
+            if m is None:
+                return
+            yield m.start(), self._prefixes[m.group()]
+            pos = m.start() + 1
+
+
+# ---------------------------------------------------------------------------
+# Incremental scoring: persisted per-file check outcomes
+# ---------------------------------------------------------------------------
+
+SCORE_CACHE_NAME = ".score_cache.json"
+SCORE_CACHE_VERSION = 3
+# An entry recorded this close to its file's mtime may predate a same-tick write
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of a file, read in bounded chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        COUNTERS.record_read(os.fstat(fh.fileno()).st_size)
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Per-file check outcomes persisted across runs, keyed by content hash.
+
+    ``get(kind, path, compute)`` returns the stored result for ``path`` when
+    its content is unchanged, otherwise calls ``compute()`` and records the
+    result. (size, mtime) is checked first so unchanged files are never read;
+    a file whose stat changed but whose SHA-256 did not (e.g. a touch) is
+    still a hit. As in git's racy-index check, an entry cached within
+    ``RACY_WINDOW_NS`` of the file's mtime is not trusted on stat alone: a
+    write in the same timestamp tick would leave (size, mtime) unchanged, so
+    such entries are verified by SHA-256 until they age out of the window.
+    With ``path=None`` the cache lives only for the current run.
+    Results must be JSON-serialisable.
+    """
+
+    def __init__(self, path: Path | None = None, fingerprint: str = ""):
+        self.path = path
+        self.root = path.parent if path is not None else None
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._entries: dict[str, dict] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("fingerprint") == fingerprint:
+                self._entries = data.get("entries", {})
+
+    def _key(self, kind: str, path: Path) -> str:
+        if self.root is not None:
+            try:
+                path = path.relative_to(self.root)
+            except ValueError:
+                pass
+        return f"{kind}:{path.as_posix()}"
+
+    def get(self, kind: str, path: Path, compute):
+        """Return the cached result for ``path`` or compute and store it."""
+        key = self._key(kind, path)
+        try:
+            st = path.stat()
+        except OSError:
+            return compute()
+
+        entry = self._entries.get(key)
+        if (entry is not None
+                and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns)
+                and (self.path is None
+                     or entry.get("cached_ns", 0) - entry["mtime_ns"] >= RACY_WINDOW_NS)):
+            self.hits += 1
+            return entry["result"]
+
+        # Only hash when the result is persisted; in-memory runs key on stat
+        digest = file_digest(path) if self.path is not None else ""
+        if entry is not None and digest and entry["sha256"] == digest:
+            entry["mtime_ns"] = st.st_mtime_ns
+            entry["cached_ns"] = time.time_ns()
+            self._dirty = True
+            self.hits += 1
+            return entry["result"]
+
+        self.misses += 1
+        result = compute()
+        self._entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                              "cached_ns": time.time_ns(), "sha256": digest,
+                              "result": result}
+        self._dirty = True
+        return result
+
+    def save(self) -> None:
+        """Write the cache back, dropping entries for files that no longer exist."""
+        if self.path is None:
+            return
+        stale = [key for key in self._entries
+                 if not (self.root / key.split(":", 1)[1]).exists()]
+        for key in stale:
+            del self._entries[key]
+        if not (self._dirty or stale):
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps({"fingerprint": self.fingerprint,
+                                       "entries": self._entries},
+                                      ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"警告: 无法写入评分缓存 {self.path}: {e}", file=sys.stderr)
+        self._dirty = False
+
+
 # ---------------------------------------------------------------------------
 # Dimension 1: Code Conventions (15 pts)
 # ---------------------------------------------------------------------------
 
-def score_code_conventions(base: Path, verbose: bool = False) -> dict:
+def _check_do_file(name: str, content: str) -> dict[str, str | None]:
+    """Run the per-file convention checks; map check name -> failure detail."""
+    # Header check
+    header = None
+    if not ("Project:" in content and "Purpose:" in content):
+        header = f"缺少文件头: {name}"
+
+    # set seed
+    seed = None if "set seed" in content.lower() else f"未设置 set seed: {name}"
+
+    # Numbered naming
+    naming = None
+    if not (re.match(r"^\d{2}_", name) or name == "master.do"):
+        naming = f"未使用编号前缀: {name}"
+
+    # Log pattern
+    has_cap_log = "cap log close" in content or "capture log close" in content
+    has_log_using = "log using" in content
+    log = None if has_cap_log and has_log_using else f"缺少日志模式: {name}"
+
+    # vce(cluster); files without regressions pass
+    vce = None
+    if not ("vce(cluster" in content or "vce(cl " in content):
+        if re.search(r"(reghdfe|regress|xtreg|ivreghdfe|ivreg2)", content):
+            vce = f"回归未使用 vce(cluster): {name}"
+
+    return {
+        "headers_present": header,
+        "set_seed": seed,
+        "numbered_naming": naming,
+        "log_pattern": log,
+        "vce_cluster": vce,
+    }
+
+
+def score_code_conventions(base: Path, verbose: bool = False,
+                           index: FileIndex | None = None,
+                           cache: ContentCache | None = None,
+                           results: ResultCache | None = None) -> dict:
     """Check .do file headers, set seed, naming, logging pattern, vce(cluster)."""
-    do_files = find_files(base, "*.do")
-    py_files = find_files(base / "code", "*.py") if (base / "code").exists() else []
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
+    do_files = index.files(".do")
+    py_files = index.files(".py", "code")
 
     if not do_files and not py_files:
         return {"score": 0, "max": 15, "details": ["未找到代码文件"]}
@@ -73,47 +585,14 @@ def score_code_conventions(base: Path, verbose: bool = False) -> dict:
     }
 
     for f in do_files:
-        content = read_text(f)
-        name = f.name
-
-        # Header check
-        if "Project:" in content and "Purpose:" in content:
-            checks["headers_present"]["pass"] += 1
-        else:
-            checks["headers_present"]["fail"] += 1
-            checks["headers_present"]["details"].append(f"缺少文件头: {name}")
-
-        # set seed
-        if "set seed" in content.lower():
-            checks["set_seed"]["pass"] += 1
-        else:
-            checks["set_seed"]["fail"] += 1
-            checks["set_seed"]["details"].append(f"未设置 set seed: {name}")
-
-        # Numbered naming
-        if re.match(r"^\d{2}_", name) or name == "master.do":
-            checks["numbered_naming"]["pass"] += 1
-        else:
-            checks["numbered_naming"]["fail"] += 1
-            checks["numbered_naming"]["details"].append(f"未使用编号前缀: {name}")
-
-        # Log pattern
-        has_cap_log = "cap log close" in content or "capture log close" in content
-        has_log_using = "log using" in content
-        if has_cap_log and has_log_using:
-            checks["log_pattern"]["pass"] += 1
-        else:
-            checks["log_pattern"]["fail"] += 1
-            checks["log_pattern"]["details"].append(f"缺少日志模式: {name}")
-
-        # vce(cluster)
-        if "vce(cluster" in content or "vce(cl " in content:
-            checks["vce_cluster"]["pass"] += 1
-        elif re.search(r"(reghdfe|regress|xtreg|ivreghdfe|ivreg2)", content):
-            checks["vce_cluster"]["fail"] += 1
-            checks["vce_cluster"]["details"].append(f"回归未使用 vce(cluster): {name}")
-        else:
-            checks["vce_cluster"]["pass"] += 1  # No regressions in this file
+        outcome = results.get("conventions", f,
+                              lambda f=f: _check_do_file(f.name, cache.read(f)))
+        for check_name, failure in outcome.items():
+            if failure is None:
+                checks[check_name]["pass"] += 1
+            else:
+                checks[check_name]["fail"] += 1
+                checks[check_name]["details"].append(failure)
 
     # Score: 3 pts per check, weighted by pass rate
     total = 0
@@ -137,31 +616,41 @@ def score_code_conventions(base: Path, verbose: bool = False) -> dict:
 # Dimension 2: Log Cleanliness (15 pts)
 # ---------------------------------------------------------------------------
 
-def score_log_cleanliness(base: Path, verbose: bool = False) -> dict:
+LOG_ERROR_SCANNER = PatternScanner([
+    (r"r\(\d+\)", "Stata 错误"),
+    (r"variable .+ not found", "变量未找到"),
+    (r"command .+ is unrecognized", "命令无法识别"),
+    (r"no observations", "无观测值"),
+])
+
+
+def score_log_cleanliness(base: Path, verbose: bool = False,
+                          index: FileIndex | None = None,
+                          cache: ContentCache | None = None,
+                          results: ResultCache | None = None) -> dict:
     """Check .log files for r(xxx) errors, variable not found, command not found."""
-    log_files = find_files(base, "*.log")
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
+    log_files = index.files(".log")
 
     if not log_files:
         return {"score": 0, "max": 15, "details": ["未找到 .log 文件"]}
 
-    error_patterns = [
-        (r"r\(\d+\)", "Stata 错误"),
-        (r"variable .+ not found", "变量未找到"),
-        (r"command .+ is unrecognized", "命令无法识别"),
-        (r"no observations", "无观测值"),
-    ]
-
     clean_logs = 0
     total_logs = len(log_files)
     details = []
 
     for f in log_files:
-        content = read_text(f)
+        hits = results.get("log_errors", f,
+                           lambda f=f: LOG_ERROR_SCANNER.scan_file(f))
         errors_found = []
-        for pattern, label in error_patterns:
-            matches = re.findall(pattern, content)
-            if matches:
-                errors_found.append(f"{label}: {len(matches)} 处")
+        for label in LOG_ERROR_SCANNER.labels:
+            if label in hits:
+                hit = hits[label]
+                errors_found.append(
+                    f"{label}: {hit['count']} 处 (首次见第 {hit['first_line']} 行)"
+                )
         if errors_found:
             details.append(f"{f.name}: {'; '.join(errors_found)}")
         else:
@@ -180,18 +669,21 @@ def score_log_cleanliness(base: Path, verbose: bool = False) -> dict:
 # Dimension 3: Output Completeness (15 pts)
 # ---------------------------------------------------------------------------
 
-def score_output_completeness(base: Path, verbose: bool = False) -> dict:
+def score_output_completeness(base: Path, verbose: bool = False,
+                              index: FileIndex | None = None,
+                              cache: ContentCache | None = None,
+                              results: ResultCache | None = None) -> dict:
     """Check that expected tables, figures, and logs exist and are non-empty."""
-    tables_dir = base / "output" / "tables"
-    figures_dir = base / "output" / "figures"
-    logs_dir = base / "output" / "logs"
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
 
     checks = {"tables": 0, "figures": 0, "logs": 0}
     details = []
 
     # Tables: .tex files exist and non-empty
-    if tables_dir.exists():
-        tex_files = find_files(tables_dir, "*.tex")
+    if index.has_dir("output/tables"):
+        tex_files = index.files(".tex", "output/tables")
         non_empty = [f for f in tex_files if f.stat().st_size > 0]
         if non_empty:
             checks["tables"] = 5
@@ -201,8 +693,9 @@ def score_output_completeness(base: Path, verbose: bool = False) -> dict:
         details.append("未找到 output/tables/ 目录")
 
     # Figures: .pdf or .png files exist
-    if figures_dir.exists():
-        fig_files = find_files(figures_dir, "*.pdf") + find_files(figures_dir, "*.png")
+    if index.has_dir("output/figures"):
+        fig_files = (index.files(".pdf", "output/figures")
+                     + index.files(".png", "output/figures"))
         if fig_files:
             checks["figures"] = 5
         else:
@@ -211,15 +704,15 @@ def score_output_completeness(base: Path, verbose: bool = False) -> dict:
         details.append("未找到 output/figures/ 目录")
 
     # Logs: .log files exist
-    if logs_dir.exists():
-        log_files = find_files(logs_dir, "*.log")
+    if index.has_dir("output/logs"):
+        log_files = index.files(".log", "output/logs")
         if log_files:
             checks["logs"] = 5
         else:
             details.append("output/logs/ 中无 .log 文件")
     else:
         # Also check root for logs (Stata generates them in CWD)
-        root_logs = find_files(base, "*.log")
+        root_logs = index.files(".log")
         if root_logs:
             checks["logs"] = 3  # Partial credit — logs exist but not in output/logs/
             details.append("日志文件存在于根目录但不在 output/logs/ 中")
@@ -234,40 +727,86 @@ def score_output_completeness(base: Path, verbose: bool = False) -> dict:
 # Dimension 4: Cross-Validation (15 pts)
 # ---------------------------------------------------------------------------
 
-def score_cross_validation(base: Path, verbose: bool = False) -> dict:
+def _check_crossval_script(content: str) -> dict[str, bool]:
+    """Content checks for a (candidate) cross-validation script."""
+    lower = content.lower()
+    return {
+        "candidate": "pyfixest" in content or "cross" in lower,
+        "compare": "diff" in lower or "compare" in lower or "match" in lower,
+        "threshold": ("0.1" in content or "0.001" in content
+                      or "PASS" in content or "FAIL" in content),
+        "manifest": "crossval.json" in content,
+    }
+
+
+def _check_crossval_manifest(content: str) -> dict[str, bool]:
+    """Content checks for a crossval.json manifest (see scripts/crossval)."""
+    try:
+        manifest = json.loads(content)
+    except ValueError:
+        return {"compare": False, "threshold": False}
+    if not isinstance(manifest, dict):
+        return {"compare": False, "threshold": False}
+    specs = [s for s in manifest.get("specs", []) if isinstance(s, dict)]
+    defaults = manifest.get("defaults") or {}
+    compare = any("stata" in s for s in specs)
+    # Specs compared against Stata get the engine's DEFAULT_TOLERANCE if unset
+    return {
+        "compare": compare,
+        "threshold": compare or "tolerance" in defaults or any("tolerance" in s for s in specs),
+    }
+
+
+def score_cross_validation(base: Path, verbose: bool = False,
+                           index: FileIndex | None = None,
+                           cache: ContentCache | None = None,
+                           results: ResultCache | None = None) -> dict:
     """Check for Python cross-validation script and result documentation."""
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
     details = []
     score = 0
 
+    def check_script(f: Path) -> dict[str, bool]:
+        outcome = results.get("crossval", f,
+                              lambda: _check_crossval_script(cache.read(f)))
+        # Thin wrappers around scripts/crossval keep specs and thresholds in
+        # the crossval.json next to them
+        manifest = f.with_name("crossval.json")
+        if outcome["manifest"] and manifest.is_file():
+            found = results.get("crossval_manifest", manifest,
+                                lambda: _check_crossval_manifest(cache.read(manifest)))
+            outcome = {**outcome, **{k: outcome[k] or v for k, v in found.items()}}
+        return outcome
+
     # Check for cross-validation script
-    py_dir = base / "code" / "python"
     crossval_scripts = []
-    if py_dir.exists():
-        crossval_scripts = [f for f in find_files(py_dir, "*.py")
+    if index.has_dir("code/python"):
+        crossval_scripts = [f for f in index.files(".py", "code/python")
                            if "cross" in f.name.lower() or "crossval" in f.name.lower()
                            or "validate" in f.name.lower()]
 
     if not crossval_scripts:
         # Also check for any .py file containing pyfixest
-        all_py = find_files(base, "*.py")
+        all_py = index.files(".py")
         for f in all_py:
-            content = read_text(f)
-            if "pyfixest" in content or "cross" in content.lower():
+            if check_script(f)["candidate"]:
                 crossval_scripts.append(f)
                 break
 
     if crossval_scripts:
         score += 5
-        content = read_text(crossval_scripts[0])
+        outcome = check_script(crossval_scripts[0])
 
         # Check for coefficient comparison
-        if "diff" in content.lower() or "compare" in content.lower() or "match" in content.lower():
+        if outcome["compare"]:
             score += 5
         else:
             details.append("找到交叉验证脚本但未检测到比较逻辑")
 
         # Check for pass/fail threshold
-        if "0.1" in content or "0.001" in content or "PASS" in content or "FAIL" in content:
+        if outcome["threshold"]:
             score += 5
         else:
             details.append("交叉验证脚本中未找到通过/失败阈值")
@@ -281,15 +820,21 @@ def score_cross_validation(base: Path, verbose: bool = False) -> dict:
 # Dimension 5: Documentation (15 pts)
 # ---------------------------------------------------------------------------
 
-def score_documentation(base: Path, verbose: bool = False) -> dict:
+def score_documentation(base: Path, verbose: bool = False,
+                        index: FileIndex | None = None,
+                        cache: ContentCache | None = None,
+                        results: ResultCache | None = None) -> dict:
     """Check REPLICATION.md, _VERSION_INFO.md, data source documentation."""
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
     details = []
     score = 0
 
     # REPLICATION.md exists with non-template content
     repl = base / "REPLICATION.md"
     if repl.exists():
-        content = read_text(repl)
+        content = cache.read(repl)
         if len(content) > 200 and "[Dataset 1]" not in content:
             score += 6  # Full credit — has real content
         elif len(content) > 100:
@@ -304,7 +849,7 @@ def score_documentation(base: Path, verbose: bool = False) -> dict:
     # _VERSION_INFO.md exists
     vinfo = base / "_VERSION_INFO.md"
     if vinfo.exists():
-        content = read_text(vinfo)
+        content = cache.read(vinfo)
         if len(content) > 50:
             score += 5
         else:
@@ -314,14 +859,13 @@ def score_documentation(base: Path, verbose: bool = False) -> dict:
         details.append("未找到 _VERSION_INFO.md")
 
     # Data sources documented (check REPLICATION.md or docs/)
-    docs_dir = base / "docs"
     has_data_docs = False
     if repl.exists():
-        content = read_text(repl)
+        content = cache.read(repl)
         if "Source" in content and ("raw" in content.lower() or "data" in content.lower()):
             has_data_docs = True
-    if docs_dir.exists():
-        doc_files = find_files(docs_dir, "*.md")
+    if index.has_dir("docs"):
+        doc_files = index.files(".md", "docs")
         if doc_files:
             has_data_docs = True
 
@@ -337,189 +881,178 @@ def score_documentation(base: Path, verbose: bool = False) -> dict:
 # Dimension 6: Method Diagnostics (25 pts)
 # ---------------------------------------------------------------------------
 
-def detect_methods(base: Path) -> list[str]:
-    """Auto-detect econometric methods from .do file content."""
-    do_files = find_files(base, "*.do")
-    methods = set()
-
-    for f in do_files:
-        content = read_text(f).lower()
-        if any(kw in content for kw in ["csdid", "did_multiplegt", "did_imputation",
-                                         "bacondecomp", "event_study", "eventstudyinteract",
-                                         "parallel trend"]):
-            methods.add("DID")
-        if any(kw in content for kw in ["ivreghdfe", "ivreg2", "2sls", "instrument",
-                                         "first.stage", "first stage", "endogenous"]):
-            methods.add("IV")
-        if any(kw in content for kw in ["rdrobust", "rddensity", "rdplot", "cutoff",
-                                         "bandwidth", "discontinuity"]):
-            methods.add("RDD")
-        if any(kw in content for kw in ["xtset", "xtreg", "xtabond2", "hausman",
-                                         "panel"]):
-            methods.add("Panel")
-
-    return sorted(methods)
-
-
-def score_method_diagnostics(base: Path, verbose: bool = False) -> dict:
-    """Score method-specific diagnostics based on auto-detected methods."""
-    methods = detect_methods(base)
-    if not methods:
-        return {"score": 0, "max": 25, "details": ["未在 .do 文件中检测到计量经济学方法"],
-                "methods": []}
-
-    do_files = find_files(base, "*.do")
-    all_content = "\n".join(read_text(f) for f in do_files).lower()
-    log_files = find_files(base, "*.log")
-    all_logs = "\n".join(read_text(f) for f in log_files).lower()
-    combined = all_content + "\n" + all_logs
-
-    details = []
-    method_scores = {}
-
-    if "DID" in methods:
-        did_score = 0
-        did_max = 25
-
-        # Pre-trend F-test
-        if "testparm" in combined or "pre-trend" in combined or "pretrend" in combined:
-            did_score += 5
-        else:
-            details.append("DID: 未找到前趋势 F 检验")
-
-        # Event study
-        if "event" in combined and ("coefplot" in combined or "csdid_plot" in combined or "event_plot" in combined):
-            did_score += 5
-        else:
-            details.append("DID: 未找到事件研究图")
-
-        # Robust estimator alongside TWFE
-        if "csdid" in combined or "did_multiplegt" in combined or "did_imputation" in combined:
-            did_score += 5
-        else:
-            details.append("DID: 未在 TWFE 之外找到稳健 DID 估计量 (CS-DiD, dCDH, BJS)")
-
-        # Goodman-Bacon decomposition
-        if "bacondecomp" in combined:
-            did_score += 5
-        else:
-            details.append("DID: 未找到 Goodman-Bacon 分解")
-
-        # HonestDiD or wild cluster bootstrap
-        if "honestdid" in combined or "boottest" in combined:
-            did_score += 5
-        else:
-            details.append("DID: 未找到 HonestDiD 敏感性分析或野蛮聚类 bootstrap")
-
-        method_scores["DID"] = {"score": did_score, "max": did_max}
-
-    if "IV" in methods:
-        iv_score = 0
-        iv_max = 25
-
-        # First-stage F reported
-        if "first" in combined and ("f(" in combined or "f =" in combined or "f-stat" in combined
-                                    or "f stat" in combined):
-            iv_score += 6
-        else:
-            details.append("IV: 第一阶段 F 统计量未明确报告")
-
-        # KP F reported
-        if "kleibergen" in combined or "kp" in combined:
-            iv_score += 5
-        else:
-            details.append("IV: 未报告 Kleibergen-Paap F")
+# Declarative method registry. Each method lists the .do-file keywords that
+# detect it and the diagnostic checks scored once it is detected. A check
+# passes when every keyword group in "require" has at least one hit in the
+# .do files or logs ("min_hits" distinct hits for single-group checks); an
+# optional "partial" tier awards reduced credit. A method's maximum is the
+# sum of its check points. In-house methods can be added with
+# register_method() without touching the scoring control flow.
+METHOD_REGISTRY: dict[str, dict] = {
+    "DID": {
+        "detect": ["csdid", "did_multiplegt", "did_imputation", "bacondecomp",
+                   "event_study", "eventstudyinteract", "parallel trend"],
+        "checks": [
+            {"points": 5, "require": [["testparm", "pre-trend", "pretrend"]],
+             "missing": "DID: 未找到前趋势 F 检验"},
+            {"points": 5, "require": [["event"], ["coefplot", "csdid_plot", "event_plot"]],
+             "missing": "DID: 未找到事件研究图"},
+            {"points": 5, "require": [["csdid", "did_multiplegt", "did_imputation"]],
+             "missing": "DID: 未在 TWFE 之外找到稳健 DID 估计量 (CS-DiD, dCDH, BJS)"},
+            {"points": 5, "require": [["bacondecomp"]],
+             "missing": "DID: 未找到 Goodman-Bacon 分解"},
+            {"points": 5, "require": [["honestdid", "boottest"]],
+             "missing": "DID: 未找到 HonestDiD 敏感性分析或野蛮聚类 bootstrap"},
+        ],
+    },
+    "IV": {
+        "detect": ["ivreghdfe", "ivreg2", "2sls", "instrument", "first.stage",
+                   "first stage", "endogenous"],
+        "checks": [
+            {"points": 6, "require": [["first"], ["f(", "f =", "f-stat", "f stat"]],
+             "missing": "IV: 第一阶段 F 统计量未明确报告"},
+            {"points": 5, "require": [["kleibergen", "kp"]],
+             "missing": "IV: 未报告 Kleibergen-Paap F"},
+            {"points": 5, "require": [["liml"]],
+             "missing": "IV: 未找到 LIML 比较"},
+            {"points": 4, "require": [["exclusion", "instrument validity"]],
+             "missing": "IV: 未找到排除性限制讨论"},
+            {"points": 5, "require": [["hansen", "sargan", "anderson-rubin", "weakiv"]],
+             "missing": "IV: 未找到过度识别检验或弱工具变量稳健检验"},
+        ],
+    },
+    "RDD": {
+        "detect": ["rdrobust", "rddensity", "rdplot", "cutoff", "bandwidth",
+                   "discontinuity"],
+        "checks": [
+            {"points": 6, "require": [["rddensity", "mccrary"]],
+             "missing": "RDD: 未找到密度检验 (CJM/McCrary)"},
+            {"points": 6, "require": [["0.5", "0.75", "1.25", "1.5", "2.0", "bwselect"]],
+             "min_hits": 3,
+             "partial": {"min_hits": 1, "points": 3, "detail": "RDD: 带宽敏感性分析有限"},
+             "missing": "RDD: 未找到带宽敏感性分析"},
+            {"points": 5, "require": [["p(1)", "p(2)", "p(3)"]],
+             "missing": "RDD: 未找到多项式阶数敏感性分析"},
+            {"points": 4, "require": [["placebo", "fake"]],
+             "missing": "RDD: 未找到安慰剂断点检验"},
+            {"points": 4, "require": [["balance", "covariate"]],
+             "missing": "RDD: 未找到断点处协变量平衡检验"},
+        ],
+    },
+    "Panel": {
+        "detect": ["xtset", "xtreg", "xtabond2", "hausman", "panel"],
+        "checks": [
+            {"points": 7, "require": [["hausman"]],
+             "missing": "Panel: 未找到 Hausman 检验"},
+            {"points": 6, "require": [["xtserial", "wooldridge", "serial"]],
+             "missing": "Panel: 未找到序列相关检验"},
+            {"points": 6, "require": [["vce(cluster", "cluster("]],
+             "missing": "Panel: 未找到聚类标准误"},
+            {"points": 6, "require": [["r2_within", "within r", "xtabond2"]],
+             "missing": "Panel: 未报告组内 R 方或未考虑动态面板"},
+        ],
+    },
+}
 
-        # LIML comparison
-        if "liml" in combined:
-            iv_score += 5
-        else:
-            details.append("IV: 未找到 LIML 比较")
 
-        # Density/exclusion discussion
-        if "exclusion" in combined or "instrument validity" in combined:
-            iv_score += 4
-        else:
-            details.append("IV: 未找到排除性限制讨论")
+def _compile_method_scanner() -> KeywordScanner:
+    """Compile every detection and diagnostic keyword into one scanner."""
+    keywords = []
+    for spec in METHOD_REGISTRY.values():
+        keywords.extend(spec["detect"])
+        for check in spec["checks"]:
+            for group in check["require"]:
+                keywords.extend(group)
+    return KeywordScanner(keywords)
 
-        # Over-identification or AR test
-        if "hansen" in combined or "sargan" in combined or "anderson-rubin" in combined or "weakiv" in combined:
-            iv_score += 5
-        else:
-            details.append("IV: 未找到过度识别检验或弱工具变量稳健检验")
 
-        method_scores["IV"] = {"score": iv_score, "max": iv_max}
+METHOD_SCANNER = _compile_method_scanner()
 
-    if "RDD" in methods:
-        rdd_score = 0
-        rdd_max = 25
 
-        # Density test
-        if "rddensity" in combined or "mccrary" in combined:
-            rdd_score += 6
-        else:
-            details.append("RDD: 未找到密度检验 (CJM/McCrary)")
-
-        # Bandwidth sensitivity
-        bw_keywords = ["0.5", "0.75", "1.25", "1.5", "2.0", "bwselect"]
-        bw_count = sum(1 for kw in bw_keywords if kw in combined)
-        if bw_count >= 3:
-            rdd_score += 6
-        elif bw_count >= 1:
-            rdd_score += 3
-            details.append("RDD: 带宽敏感性分析有限")
-        else:
-            details.append("RDD: 未找到带宽敏感性分析")
+def register_method(name: str, detect: list[str], checks: list[dict]) -> None:
+    """Add (or replace) a method in the registry and recompile the scanner."""
+    global METHOD_SCANNER
+    METHOD_REGISTRY[name] = {"detect": list(detect), "checks": list(checks)}
+    METHOD_SCANNER = _compile_method_scanner()
 
-        # Polynomial sensitivity
-        if "p(1)" in combined or "p(2)" in combined or "p(3)" in combined:
-            rdd_score += 5
-        else:
-            details.append("RDD: 未找到多项式阶数敏感性分析")
 
-        # Placebo cutoffs
-        if "placebo" in combined or "fake" in combined:
-            rdd_score += 4
-        else:
-            details.append("RDD: 未找到安慰剂断点检验")
+def _scan_do_files(index: FileIndex, cache: ContentCache,
+                   results: ResultCache) -> set[str]:
+    """Return the registry keywords present in any .do file."""
+    hits = set()
+    for f in index.files(".do"):
+        hits.update(results.get(
+            "method_keywords", f,
+            lambda f=f: sorted(METHOD_SCANNER.scan_text(cache.read(f)))))
+    return hits
 
-        # Covariate balance
-        if "balance" in combined or "covariate" in combined:
-            rdd_score += 4
-        else:
-            details.append("RDD: 未找到断点处协变量平衡检验")
 
-        method_scores["RDD"] = {"score": rdd_score, "max": rdd_max}
+def _methods_from_hits(hits: set[str]) -> list[str]:
+    return sorted(name for name, spec in METHOD_REGISTRY.items()
+                  if any(kw in hits for kw in spec["detect"]))
 
-    if "Panel" in methods:
-        panel_score = 0
-        panel_max = 25
 
-        # Hausman test
-        if "hausman" in combined:
-            panel_score += 7
-        else:
-            details.append("Panel: 未找到 Hausman 检验")
-
-        # Serial correlation
-        if "xtserial" in combined or "wooldridge" in combined or "serial" in combined:
-            panel_score += 6
-        else:
-            details.append("Panel: 未找到序列相关检验")
+def detect_methods(base: Path, index: FileIndex | None = None,
+                   cache: ContentCache | None = None,
+                   results: ResultCache | None = None) -> list[str]:
+    """Auto-detect econometric methods from .do file content."""
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
+    return _methods_from_hits(_scan_do_files(index, cache, results))
+
+
+def _score_check(check: dict, hits: set[str]) -> tuple[int, str | None]:
+    """Return (points, detail) for one registry check against keyword hits."""
+    groups = check["require"]
+    if len(groups) == 1:
+        n_hits = sum(1 for kw in groups[0] if kw in hits)
+        if n_hits >= check.get("min_hits", 1):
+            return check["points"], None
+        partial = check.get("partial")
+        if partial and n_hits >= partial["min_hits"]:
+            return partial["points"], partial["detail"]
+        return 0, check["missing"]
+    if all(any(kw in hits for kw in group) for group in groups):
+        return check["points"], None
+    return 0, check["missing"]
+
+
+def score_method_diagnostics(base: Path, verbose: bool = False,
+                             index: FileIndex | None = None,
+                             cache: ContentCache | None = None,
+                             results: ResultCache | None = None) -> dict:
+    """Score method-specific diagnostics based on auto-detected methods."""
+    index = index or FileIndex(base)
+    cache = cache or ContentCache()
+    results = results or ResultCache()
+    do_hits = _scan_do_files(index, cache, results)
+    methods = _methods_from_hits(do_hits)
+    if not methods:
+        return {"score": 0, "max": 25, "details": ["未在 .do 文件中检测到计量经济学方法"],
+                "methods": []}
 
-        # Appropriate clustering
-        if "vce(cluster" in combined or "cluster(" in combined:
-            panel_score += 6
-        else:
-            details.append("Panel: 未找到聚类标准误")
+    # Registry keywords present anywhere in .do files or logs. Logs are
+    # streamed so multi-GB bootstrap logs never sit in memory.
+    hits = set(do_hits)
+    for f in index.files(".log"):
+        hits.update(results.get("method_keywords", f,
+                                lambda f=f: sorted(METHOD_SCANNER.scan_file(f))))
 
-        # Within R-squared or dynamic panels
-        if "r2_within" in combined or "within r" in combined or "xtabond2" in combined:
-            panel_score += 6
-        else:
-            details.append("Panel: 未报告组内 R 方或未考虑动态面板")
+    details = []
+    method_scores = {}
 
-        method_scores["Panel"] = {"score": panel_score, "max": panel_max}
+    for name, spec in METHOD_REGISTRY.items():
+        if name not in methods:
+            continue
+        method_score = 0
+        for check in spec["checks"]:
+            pts, detail = _score_check(check, hits)
+            method_score += pts
+            if detail:
+                details.append(detail)
+        method_max = sum(check["points"] for check in spec["checks"])
+        method_scores[name] = {"score": method_score, "max": method_max}
 
     # Combine: if multiple methods, average and scale to 25
     if method_scores:
@@ -542,8 +1075,38 @@ def score_method_diagnostics(base: Path, verbose: bool = False) -> dict:
 # Main scorer
 # ---------------------------------------------------------------------------
 
-def score_directory(base_path: str, verbose: bool = False) -> dict:
-    """Score a version directory on all 6 dimensions."""
+SCORERS = [
+    ("Code Conventions", score_code_conventions),
+    ("Log Cleanliness", score_log_cleanliness),
+    ("Output Completeness", score_output_completeness),
+    ("Cross-Validation", score_cross_validation),
+    ("Documentation", score_documentation),
+    ("Method Diagnostics", score_method_diagnostics),
+]
+
+
+def score_cache_fingerprint() -> str:
+    """Identify the check definitions so stale per-file results are discarded."""
+    spec = json.dumps({
+        "version": SCORE_CACHE_VERSION,
+        "log_errors": LOG_ERROR_SCANNER._regex.pattern,
+        "methods": METHOD_REGISTRY,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+def score_directory(base_path: str, verbose: bool = False,
+                    cache_bytes: int | None = None,
+                    incremental: bool = False,
+                    profile: bool = False,
+                    rules: WalkRules | None = None) -> dict:
+    """Score a version directory on all 6 dimensions.
+
+    ``rules`` controls which subtrees are walked (default: DEFAULT_EXCLUDES).
+    With ``profile=True`` the result gains a "profile" entry with the index
+    walk cost and, per dimension, wall time, files and bytes read, regex time
+    and per-file result cache hits.
+    """
     base = Path(base_path)
     if not base.exists():
         print(f"错误: 目录 '{base_path}' 不存在。", file=sys.stderr)
@@ -556,21 +1119,46 @@ def score_directory(base_path: str, verbose: bool = False) -> dict:
         "max_total": 100,
     }
 
-    scorers = [
-        ("Code Conventions", score_code_conventions),
-        ("Log Cleanliness", score_log_cleanliness),
-        ("Output Completeness", score_output_completeness),
-        ("Cross-Validation", score_cross_validation),
-        ("Documentation", score_documentation),
-        ("Method Diagnostics", score_method_diagnostics),
-    ]
-
-    for name, scorer in scorers:
-        result = scorer(base, verbose)
+    # One directory walk and one decode per file, shared by every dimension
+    t0 = time.perf_counter()
+    index = FileIndex(base, rules)
+    walk_seconds = time.perf_counter() - t0
+    cache = ContentCache(cache_bytes)
+    store = ResultCache(base / SCORE_CACHE_NAME if incremental else None,
+                        score_cache_fingerprint())
+
+    timings = {}
+    for name, scorer in SCORERS:
+        before = COUNTERS.snapshot()
+        hits_before = store.hits
+        t0 = time.perf_counter()
+        result = scorer(base, verbose, index, cache, store)
+        elapsed = time.perf_counter() - t0
         results["dimensions"][name] = result
         results["total"] += result["score"]
+        after = COUNTERS.snapshot()
+        timings[name] = {
+            "wall_seconds": round(elapsed, 6),
+            "files_read": after["files_read"] - before["files_read"],
+            "bytes_read": after["bytes_read"] - before["bytes_read"],
+            "regex_seconds": round(after["regex_seconds"] - before["regex_seconds"], 6),
+            "result_cache_hits": store.hits - hits_before,
+        }
 
-    # Status
+    store.save()
+    assign_status(results)
+
+    if profile:
+        results["profile"] = {
+            "index": {"wall_seconds": round(walk_seconds, 6),
+                      "files_indexed": index.n_files},
+            "dimensions": timings,
+        }
+    return results
+
+
+def assign_status(results: dict) -> None:
+    """Set status / status_cn from the total score."""
     total = results["total"]
     if total >= 95:
         results["status"] = "PUBLICATION READY"
@@ -585,8 +1173,6 @@ def score_directory(base_path: str, verbose: bool = False) -> dict:
         results["status"] = "REDO"
         results["status_cn"] = "重做"
 
-    return results
-
 
 def print_text_report(results: dict, verbose: bool = False) -> None:
     """Print human-readable report."""
@@ -629,44 +1215,435 @@ def print_text_report(results: dict, verbose: bool = False) -> None:
                     for detail in dim["details"][:3]:
                         print(f"      - {detail}")
 
+    if "profile" in results:
+        print_profile(results["profile"])
+
+    print()
+
+
+def print_profile(profile: dict) -> None:
+    """Print the per-dimension cost table collected by --profile."""
+    idx = profile["index"]
     print()
+    print(f"  性能剖析 (目录遍历 {idx['wall_seconds'] * 1000:.1f} ms, "
+          f"{idx['files_indexed']} 个文件)")
+    print(f"    {'维度':<12s} {'耗时ms':>9s} {'读文件':>6s} {'读取MB':>9s} "
+          f"{'正则ms':>9s} {'缓存命中':>6s}")
+    for name, t in profile["dimensions"].items():
+        display_name = DIM_NAMES_CN.get(name, name)
+        print(f"    {display_name:<12s} {t['wall_seconds'] * 1000:>9.1f} "
+              f"{t['files_read']:>6d} {t['bytes_read'] / 1e6:>9.2f} "
+              f"{t['regex_seconds'] * 1000:>9.1f} {t['result_cache_hits']:>6d}")
+
+
+def results_to_json(results: dict) -> dict:
+    """Reduce a score_directory() result to the --json output schema."""
+    output = {
+        "target": results["target"],
+        "total": results["total"],
+        "max_total": results["max_total"],
+        "status": results["status"],
+        "dimensions": {},
+    }
+    for name, dim in results["dimensions"].items():
+        output["dimensions"][name] = {
+            "score": dim["score"],
+            "max": dim["max"],
+            "details": dim.get("details", []),
+        }
+        if "methods" in dim:
+            output["dimensions"][name]["methods"] = dim["methods"]
+        if "method_scores" in dim:
+            output["dimensions"][name]["method_scores"] = {
+                k: {"score": v["score"], "max": v["max"]}
+                for k, v in dim["method_scores"].items()
+            }
+    if "profile" in results:
+        output["profile"] = results["profile"]
+    return output
+
+
+# ---------------------------------------------------------------------------
+# Batch mode: many version directories in a process pool
+# ---------------------------------------------------------------------------
+
+def expand_targets(patterns: list[str]) -> list[str]:
+    """Expand glob patterns (for shells that do not) into directory paths."""
+    targets = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(p for p in glob.glob(pattern) if os.path.isdir(p))
+            targets.extend(matches or [pattern])
+        else:
+            targets.append(pattern)
+    return list(dict.fromkeys(targets))
+
+
+def _score_target(target: str, options: dict) -> dict:
+    """Batch worker: score one directory, turning any failure into a record."""
+    if not os.path.isdir(target):
+        return {"target": target, "error": f"目录 '{target}' 不存在"}
+    try:
+        results = score_directory(target, **options)
+    except Exception as e:  # one bad project must not abort the batch
+        return {"target": target, "error": f"{type(e).__name__}: {e}"}
+    return results_to_json(results)
+
+
+def score_batch(targets: list[str], jobs: int | None = None, **options):
+    """Score targets in a process pool, yielding JSON records as they finish.
+
+    ``options`` are passed through to score_directory().
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(targets)))
+    if jobs == 1:
+        for target in targets:
+            yield _score_target(target, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_score_target, t, options): t for t in targets}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:  # e.g. a worker killed by the OOM killer
+                yield {"target": futures[future], "error": f"{type(e).__name__}: {e}"}
+
+
+# ---------------------------------------------------------------------------
+# Watch mode: stay resident and rescore on filesystem changes
+# ---------------------------------------------------------------------------
+
+WATCH_IGNORED = {SCORE_CACHE_NAME, SCORE_CACHE_NAME + ".tmp"}
+
+
+def dimensions_for_changes(changed: set[str] | None) -> list[str]:
+    """Map changed relative paths to the dimensions whose inputs they feed.
+
+    ``None`` means the change set is unknown (e.g. an inotify queue overflow)
+    and every dimension is rescored.
+    """
+    if changed is None:
+        return [name for name, _ in SCORERS]
+
+    dims = set()
+    for rel in changed:
+        path = PurePosixPath(rel)
+        suffix = path.suffix
+        top = path.parts[0] if path.parts else ""
+        # Created or removed directories (no suffix) gate whole checks,
+        # e.g. output/tables/, code/python/ or docs/
+        is_dir = not suffix
+        if suffix == ".do" or (suffix == ".py" and top == "code"):
+            dims.add("Code Conventions")
+        if suffix == ".log":
+            dims.update(("Log Cleanliness", "Output Completeness"))
+        if suffix in (".do", ".log"):
+            dims.add("Method Diagnostics")
+        if top == "output" or is_dir:
+            dims.add("Output Completeness")
+        if suffix == ".py" or path.name == "crossval.json" or is_dir:
+            dims.add("Cross-Validation")
+        if rel in ("REPLICATION.md", "_VERSION_INFO.md") or top == "docs" or is_dir:
+            dims.add("Documentation")
+    # Keep the report order stable
+    return [name for name, _ in SCORERS if name in dims]
+
+
+class PollingWatcher:
+    """Portable change detection by diffing (size, mtime) snapshots."""
+
+    def __init__(self, base: Path, interval: float = 1.0,
+                 rules: WalkRules | None = None):
+        self.base = base
+        self.interval = interval
+        self.rules = rules
+        self._snapshot = self._take()
+
+    def _take(self) -> dict[str, tuple[int, int]]:
+        snap = {}
+        for rel_root, dirnames, filenames in walk_tree(self.base, self.rules):
+            for name in filenames:
+                rel = f"{rel_root}/{name}" if rel_root else name
+                try:
+                    st = os.stat(self.base / rel)
+                except OSError:
+                    continue
+                snap[rel] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def wait(self, timeout: float | None) -> set[str]:
+        """Block up to ``timeout`` seconds (forever if None); return changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snap = self._take()
+            changed = {rel for rel in snap.keys() | self._snapshot.keys()
+                       if snap.get(rel) != self._snapshot.get(rel)}
+            self._snapshot = snap
+            changed -= WATCH_IGNORED
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            remaining = self.interval if deadline is None else min(
+                self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(remaining)
+
+
+class InotifyWatcher:
+    """Linux inotify watcher (via ctypes, no extra dependency).
+
+    Every directory the scorer walks gets a watch (pruned trees such as
+    ``data/`` are skipped, which also keeps large projects under the kernel's
+    watch limit); directories created later are added as they appear.
+    ``wait`` returns ``None`` when the kernel queue overflowed and the exact
+    change set is unknown.
+    """
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+            | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, base: Path, rules: WalkRules | None = None):
+        self.base = base
+        self.rules = rules or WalkRules()
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                                 use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        self._add_tree("")
+
+    def _add_tree(self, top: str) -> None:
+        for rel_root, dirnames, filenames in walk_tree(self.base, self.rules, top):
+            root = self.base / rel_root if rel_root else self.base
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(root), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {root}")
+            self._dirs[wd] = root
+
+    def wait(self, timeout: float | None) -> set[str] | None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 1 << 16)
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            rel = (parent / name).relative_to(self.base).as_posix()
+            is_dir = bool(mask & self.IN_ISDIR)
+            if (self.rules.excluded(rel, name, is_dir)
+                    and not self.rules.included(rel, name, is_dir)):
+                continue
+            if is_dir and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._add_tree(rel)
+            if name not in WATCH_IGNORED:
+                changed.add(rel)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(base: Path, poll_interval: float = 1.0,
+                 rules: WalkRules | None = None):
+    """Prefer inotify on Linux; fall back to polling anywhere else or on error."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(base, rules)
+        except (OSError, AttributeError) as e:
+            print(f"inotify 不可用 ({e})，改用轮询。", file=sys.stderr)
+    return PollingWatcher(base, poll_interval, rules)
+
+
+def print_score_diff(before: dict, after: dict, rescored: list[str]) -> None:
+    """Print per-dimension and total score changes after a rescore."""
+    for name in rescored:
+        old = before["dimensions"][name]["score"]
+        new = after["dimensions"][name]["score"]
+        delta = f"  ({new - old:+d})" if new != old else ""
+        print(f"  {DIM_NAMES_CN.get(name, name):<14s} {old:>2d} → {new:>2d}{delta}")
+        if new != old:
+            old_details = set(before["dimensions"][name].get("details", []))
+            new_details = after["dimensions"][name].get("details", [])
+            for detail in new_details:
+                if detail not in old_details:
+                    print(f"    + {detail}")
+            for detail in before["dimensions"][name].get("details", []):
+                if detail not in new_details:
+                    print(f"    - {detail}")
+    old, new = before["total"], after["total"]
+    delta = f"  ({new - old:+d})" if new != old else ""
+    print(f"  {'总分':<14s} {old:>2d} → {new:>2d}{delta}  状态: {after['status_cn']}")
+
+
+def watch_directory(base_path: str, verbose: bool = False,
+                    cache_bytes: int | None = None, incremental: bool = False,
+                    debounce: float = 1.0, poll_interval: float = 1.0,
+                    rules: WalkRules | None = None) -> None:
+    """Score once, then rescore changed dimensions after each burst of writes."""
+    base = Path(base_path)
+    if not base.exists():
+        print(f"错误: 目录 '{base_path}' 不存在。", file=sys.stderr)
+        sys.exit(1)
+
+    # Caches stay warm for the whole session; unchanged files are not re-read
+    cache = ContentCache(cache_bytes)
+    store = ResultCache(base / SCORE_CACHE_NAME if incremental else None,
+                        score_cache_fingerprint())
+    scorers = dict(SCORERS)
+
+    results = {"target": str(base), "dimensions": {}, "total": 0, "max_total": 100}
+    index = FileIndex(base, rules)
+    for name, scorer in SCORERS:
+        results["dimensions"][name] = scorer(base, verbose, index, cache, store)
+    results["total"] = sum(d["score"] for d in results["dimensions"].values())
+    assign_status(results)
+    store.save()
+    print_text_report(results, verbose=verbose)
+
+    watcher = make_watcher(base, poll_interval, rules)
+    print(f"监视 {base} 中 ({type(watcher).__name__})，Ctrl+C 退出。", flush=True)
+    try:
+        while True:
+            changed = watcher.wait(None)
+            if changed is not None and not changed:
+                continue
+            # Debounce: Stata writes logs in many small bursts
+            while changed is not None:
+                more = watcher.wait(debounce)
+                if more is None:
+                    changed = None
+                elif not more:
+                    break
+                else:
+                    changed |= more
+
+            rescored = dimensions_for_changes(changed)
+            if not rescored:
+                continue
+            before = results
+            results = {**before, "dimensions": dict(before["dimensions"])}
+            index = FileIndex(base, rules)
+            for name in rescored:
+                results["dimensions"][name] = scorers[name](base, verbose, index,
+                                                            cache, store)
+            results["total"] = sum(d["score"] for d in results["dimensions"].values())
+            assign_status(results)
+            store.save()
+
+            n_changed = "未知数量" if changed is None else str(len(changed))
+            names = ", ".join(DIM_NAMES_CN.get(n, n) for n in rescored)
+            print(f"\n[{time.strftime('%H:%M:%S')}] {n_changed} 个文件变更 → 重新评分: {names}")
+            print_score_diff(before, results, rescored)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\n已停止监视。")
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="对经济学研究版本目录进行 6 个质量维度评分。"
     )
-    parser.add_argument("directory", help="版本目录路径 (如 v1/)")
+    parser.add_argument("directory", nargs="+",
+                        help="版本目录路径 (如 v1/)；批量模式下可给多个目录或 glob")
     parser.add_argument("--json", action="store_true", help="以 JSON 格式输出结果")
     parser.add_argument("--verbose", "-v", action="store_true", help="显示详细发现")
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="文件内容缓存上限 (MB)，默认不限")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"复用 {SCORE_CACHE_NAME} 中未改动文件的检查结果")
+    parser.add_argument("--batch", action="store_true",
+                        help="批量评分，每个目录输出一行 JSON (JSON Lines)")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="批量模式的并行进程数，默认使用全部 CPU 核")
+    parser.add_argument("--watch", action="store_true",
+                        help="常驻监视单个目录，文件变更后只重新评分受影响的维度")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="监视模式的防抖间隔 (秒)，默认 1.0")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="额外跳过的路径 (.gitignore 风格，可重复)")
+    parser.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                        help="强制遍历的路径，优先于排除规则 (如 data/clean)")
+    parser.add_argument("--no-default-excludes", action="store_true",
+                        help=f"不使用默认排除规则 ({' '.join(DEFAULT_EXCLUDES)})")
+    parser.add_argument("--profile", action="store_true",
+                        help="报告各维度耗时、读取文件数/字节数和正则耗时")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="将 cProfile 统计写入 FILE (pstats 格式)")
 
     args = parser.parse_args()
 
-    results = score_directory(args.directory, verbose=args.verbose)
+    cache_bytes = int(args.cache_mb * 1024 * 1024) if args.cache_mb is not None else None
+    targets = expand_targets(args.directory)
+    excludes = () if args.no_default_excludes else DEFAULT_EXCLUDES
+    rules = WalkRules(exclude=(*excludes, *args.exclude), include=args.include)
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"--jobs 须为正整数，得到 {args.jobs}")
+    if args.profile_out and (args.watch or args.batch or len(targets) > 1):
+        parser.error("--profile-out 只用于单个目录的评分，不能与 --batch、--watch 或多个目录同用")
+
+    if args.watch:
+        if args.batch:
+            parser.error("--watch 不能与 --batch 同用")
+        if len(targets) > 1:
+            parser.error(f"--watch 只能监视一个目录，得到 {len(targets)} 个")
+        watch_directory(targets[0], verbose=args.verbose, cache_bytes=cache_bytes,
+                        incremental=args.incremental, debounce=args.debounce,
+                        rules=rules)
+        return
+
+    if args.batch or len(targets) > 1:
+        failed = 0
+        for record in score_batch(targets, jobs=args.jobs, verbose=args.verbose,
+                                  cache_bytes=cache_bytes,
+                                  incremental=args.incremental,
+                                  profile=args.profile, rules=rules):
+            failed += "error" in record
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        if failed:
+            print(f"批量评分: {failed}/{len(targets)} 个目录失败", file=sys.stderr)
+        sys.exit(1 if failed else 0)
+
+    profiler = None
+    if args.profile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    results = score_directory(targets[0], verbose=args.verbose,
+                              cache_bytes=cache_bytes,
+                              incremental=args.incremental,
+                              profile=args.profile, rules=rules)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_out)
+        print(f"cProfile 统计已写入 {args.profile_out} "
+              f"(查看: python -m pstats {args.profile_out})", file=sys.stderr)
 
     if args.json:
-        # Clean up non-serializable items
-        output = {
-            "target": results["target"],
-            "total": results["total"],
-            "max_total": results["max_total"],
-            "status": results["status"],
-            "dimensions": {},
-        }
-        for name, dim in results["dimensions"].items():
-            output["dimensions"][name] = {
-                "score": dim["score"],
-                "max": dim["max"],
-                "details": dim.get("details", []),
-            }
-            if "methods" in dim:
-                output["dimensions"][name]["methods"] = dim["methods"]
-            if "method_scores" in dim:
-                output["dimensions"][name]["method_scores"] = {
-                    k: {"score": v["score"], "max": v["max"]}
-                    for k, v in dim["method_scores"].items()
-                }
-        print(json.dumps(output, indent=2, ensure_ascii=False))
+        print(json.dumps(results_to_json(results), indent=2, ensure_ascii=False))
     else:
         print_text_report(results, verbose=args.verbose)
 
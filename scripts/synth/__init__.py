@@ -0,0 +1,37 @@
+"""
+Vectorized data-generating processes for the test datasets.
+
+Usage:
+  python tests/test4-panel/generate_synthetic_panel.py
+  python tests/test4-panel/generate_synthetic_panel.py --firms 1000000 --years 30 --seed 7
+  python tests/test1-did/generate_synthetic_data.py --units 1000000 --years 10 --dynamic -5
+  python tests/test2-rdd/generate_synthetic_rdd.py --n 50000000 --block 5000000 --out rdd.parquet
+
+Each DGP takes a ``np.random.Generator`` (or a legacy ``RandomState``) and
+the design dimensions and returns a pandas DataFrame; the ``generate_*.py``
+scripts under tests/ are thin command-line wrappers that pick the seed and
+write the .dta file.
+did.py, rdd.py, iv.py, panel.py and policy.py hold the DGPs of test1 to
+test5. Each can also draw any contiguous range of its units, which
+stream.py uses to generate and write datasets larger than memory block by
+block (``--block UNITS``) with one independent seed stream per block.
+skeleton.py lays out panels of units nested in clusters (ids, periods,
+broadcast cluster and unit effects, Categorical labels) for iv.py and
+policy.py. montecarlo.py (``scripts/monte_carlo.py``) fits the TWFE, 2SLS
+and RD estimators on many draws of these DGPs; it needs the crossval
+package and is not imported here.
+"""
+
+from .did import cohort_block, simulate_did
+from .iv import simulate_iv
+from .panel import ar1, simulate_panel
+from .policy import simulate_policy
+from .rdd import simulate_rdd
+from .skeleton import Skeleton
+from .stream import blocks, simulate_blocks, write_blocks, write_dta_chunks, write_parquet
+
+__all__ = [
+    "Skeleton", "ar1", "blocks", "cohort_block", "simulate_blocks", "simulate_did", "simulate_iv",
+    "simulate_panel", "simulate_policy", "simulate_rdd", "write_blocks", "write_dta_chunks",
+    "write_parquet",
+]
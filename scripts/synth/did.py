@@ -0,0 +1,88 @@
+"""
+State-year panel with staggered treatment adoption (test1-did).
+
+    consumption = 1000 + 10 (year - first_year) + 0.001 pop + 0.01 income
+                  + treated * tau_it + u,    u ~ N(0, 30)
+
+    tau_it = effect_g + dynamic (year - g) + a_i,    a_i ~ N(0, effect_sd)
+
+Units are split into len(cohorts) + 1 equal contiguous blocks: one block per
+adoption year g and a last, never-treated block (``treat_year`` 0). With the
+defaults (50 states, cohorts 2010/2012/2014/2016, a constant effect of -50)
+this is the original test1 design. ``effect`` may also give one effect per
+cohort, ``dynamic`` adds a linear effect in event time and ``effect_sd`` a
+unit-level random effect, so the two-way FE estimate is biased while
+Callaway-Sant'Anna ATT(g, t) recover the ``tau`` column averages.
+
+Cohorts follow from the unit index alone and every variable is one array
+draw, so a 10M-row panel takes a few seconds. ``legacy=True`` with
+``np.random.RandomState(42)`` instead draws row by row like the original
+``np.random.seed(42)`` script, rebuilding the data the committed Stata output
+(tab_did_comparison.tex) describes.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+COHORTS = (2010, 2012, 2014, 2016)
+EFFECT = -50.0
+
+
+def cohort_block(units: np.ndarray, n_units: int, n_cohorts: int) -> np.ndarray:
+    """Cohort position of 0-based unit indices; ``n_cohorts`` is never treated."""
+    return units * (n_cohorts + 1) // n_units
+
+
+def simulate_did(rng: np.random.Generator, n_units: int = 50, first_year: int = 2005,
+                 n_years: int = 15, cohorts: Sequence[int] = COHORTS,
+                 effect: float | Sequence[float] = EFFECT, dynamic: float = 0.0,
+                 effect_sd: float = 0.0, units: tuple[int, int] | None = None,
+                 legacy: bool = False) -> pd.DataFrame:
+    """One draw of the panel, sorted by unit and year; ``tau`` holds the
+    unit-year treatment effect (0 when untreated). ``units`` restricts the
+    draw to the 0-based units [start, stop) of ``n_units`` (see stream.py);
+    ``legacy`` selects the original row-by-row draw (see above)."""
+    if legacy and units is not None:
+        raise ValueError("the legacy draw is one stream over all rows; it cannot be streamed")
+    start, stop = units or (0, n_units)
+    n_obs = (stop - start) * n_years
+    k = len(cohorts)
+    effects = np.append(np.broadcast_to(np.asarray(effect, dtype=float), (k,)), 0.0)
+
+    ids = np.arange(start, stop, dtype=np.int32)
+    block = np.repeat(cohort_block(ids, n_units, k), n_years)
+    unit = np.repeat(np.arange(stop - start), n_years)
+    year = np.tile(np.arange(first_year, first_year + n_years, dtype=np.int32), stop - start)
+    treat_year = np.append(np.asarray(cohorts, dtype=np.int32), 0)[block]
+    ever = block < k
+    treated = ever & (year >= treat_year)
+
+    if legacy:
+        draws = np.array([(rng.lognormal(15, 0.5), rng.normal(50000, 10000), rng.beta(2, 8),
+                           rng.normal(0, 30)) for _ in range(n_obs)])
+        pop, income, unemployment, noise = draws.T.copy()
+    else:
+        pop = rng.lognormal(15, 0.5, n_obs)
+        income = rng.normal(50000, 10000, n_obs)
+        unemployment = rng.beta(2, 8, n_obs)
+        noise = rng.normal(0, 30, n_obs)
+    unit_effect = rng.normal(0, effect_sd, stop - start) if effect_sd else np.zeros(stop - start)
+
+    tau = np.where(treated, effects[block] + dynamic * (year - treat_year)
+                   + unit_effect[unit], 0.0)
+    consumption = (1000 + 10 * (year - first_year) + 0.001 * pop + 0.01 * income
+                   + tau + noise)
+    return pd.DataFrame({
+        "state_id": np.repeat(ids + 1, n_years),
+        "year": year,
+        "treat_year": treat_year,
+        "treated": treated.astype(np.int8),
+        "time_to_treat": np.where(ever, year - treat_year, np.nan),
+        "consumption": consumption,
+        "pop": pop,
+        "income": income,
+        "unemployment": unemployment,
+        "tau": tau,
+    }, copy=False)
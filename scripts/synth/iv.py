@@ -0,0 +1,67 @@
+"""
+County-year panel with an endogenous treatment and a strong instrument (test3-iv).
+
+    sci        = sci_s + slope_c (year - mid_year) + e1,           e1 ~ N(0, 0.3)
+    treatment  = 0.5 sci + confound_c + e2,                         e2 ~ N(0, 1)
+    employment = 60 + emp_s + 0.001 pop + 5 manufacturing + effect * treatment
+                 + 0.5 confound_c + 0.5 (year - first_year) + e3,   e3 ~ N(0, 2)
+
+Counties are nested in states. The county-specific SCI slopes survive the
+state and year fixed effects, which keeps the partial first-stage F far above
+23; the county confound enters treatment and employment, which biases OLS.
+The true IV effect is ``effect`` (-2.0). States are the units, so a state's
+counties are always drawn together.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .skeleton import Skeleton
+
+EFFECT = -2.0
+
+
+def simulate_iv(rng: np.random.Generator, n_states: int = 50, counties_per_state: int = 10,
+                first_year: int = 2010, n_years: int = 10, effect: float = EFFECT,
+                units: tuple[int, int] | None = None) -> pd.DataFrame:
+    """One draw of the panel, sorted by county and year; ``units`` restricts
+    it to the 0-based states [start, stop) of ``n_states`` (see stream.py)."""
+    panel = Skeleton(n_states, counties_per_state, first_year, n_years, clusters=units)
+    n_obs = panel.n_obs
+    year = panel.period()
+
+    # State level (absorbed by the state FE)
+    sci_base = panel.per_cluster(rng.uniform(1.0, 5.0, panel.n_clusters))
+    emp_base = panel.per_cluster(rng.normal(0, 3, panel.n_clusters))
+
+    # County level: slopes identify the instrument within state-year, the
+    # confound is drawn independently of them (instrument validity)
+    slope = panel.per_unit(rng.normal(0, 0.8, panel.n_units))
+    confound = panel.per_unit(rng.normal(0, 2.0, panel.n_units))
+
+    # Row level, accumulated in place on the noise draws
+    sci = rng.normal(0, 0.3, n_obs)
+    sci += sci_base
+    sci += slope * (year - (first_year + (n_years - 1) / 2))
+    pop = rng.lognormal(10, 0.8, n_obs)
+    manufacturing = rng.beta(2, 5, n_obs)
+    treatment = rng.normal(0, 1.0, n_obs)
+    treatment += confound
+    treatment += 0.5 * sci
+    employment = rng.normal(0, 2, n_obs)
+    employment += 60 + emp_base
+    employment += 0.001 * pop
+    employment += 5 * manufacturing
+    employment += effect * treatment
+    employment += 0.5 * confound
+    employment += 0.5 * (year - first_year)
+    return pd.DataFrame({
+        "county_id": panel.unit_id(),
+        "state_id": panel.cluster_id(),
+        "year": year,
+        "sci": sci,
+        "treatment": treatment,
+        "employment": employment,
+        "pop": pop,
+        "manufacturing": manufacturing,
+    }, copy=False)
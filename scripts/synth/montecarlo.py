@@ -0,0 +1,290 @@
+"""
+Monte Carlo bias, RMSE and coverage of the test estimators over the DGPs.
+
+Usage:
+  python scripts/monte_carlo.py                      # twfe, 2sls and rdd, 1,000 draws each
+  python scripts/monte_carlo.py twfe -R 10000 -j 8 --dgp effect_sd=10 --dgp dynamic=-5
+  python scripts/monte_carlo.py rdd -R 5000 --json
+
+Replication r of an experiment draws its dataset with the generator of
+``SeedSequence(seed, spawn_key=(r,))``, i.e. child r of
+``SeedSequence(seed).spawn``, so every draw has its own stream and the
+results do not depend on the number of workers or the chunking. The data
+never leave memory: each draw is fitted in-process with the crossval code
+that reproduces Stata (numpy backend for TWFE, IVModel for 2SLS, RDData for
+rdrobust) and reduced to a few running sums per term. Workers return the
+sums of a chunk of replications and the driver adds them up, keeping a
+bounded number of chunks in flight, so memory does not grow with R.
+
+Coverage uses the Stata critical values: t(G - 1) under CRV1 and the
+normal otherwise (rdrobust).
+"""
+
+import argparse
+import inspect
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from scipy import stats
+
+from crossval.iv import IVModel
+from crossval.numpy_backend import fit_numpy
+from crossval.parallel import limited_threads
+from crossval.rdd import RDData
+
+from . import iv, rdd
+from .did import simulate_did
+from .iv import simulate_iv
+from .rdd import simulate_rdd
+
+LEVEL = 0.95
+
+
+# ---------------------------------------------------------------------------
+# Experiments
+# ---------------------------------------------------------------------------
+
+def _fit_twfe(df, spec: dict, params: dict) -> dict:
+    fit = fit_numpy(df, spec)
+    return {t: (fit["coef"][t], fit["se"][t]) for t in spec["terms"]}
+
+
+def _fit_iv(df, spec: dict, params: dict) -> dict:
+    fit = IVModel(df, spec).fit(spec["iv"]["estimator"])
+    return {t: (fit["coef"][t], fit["se"][t]) for t in spec["terms"]}
+
+
+def _fit_rdd(df, spec: dict, params: dict) -> dict:
+    """Local polynomial fit at the cutoff the DGP was drawn with."""
+    options = spec["rdd"]
+    data = RDData(df["running"].to_numpy(np.float64), df["outcome"].to_numpy(np.float64),
+                  params.get("cutoff", options["cutoff"]))
+    fit = data.estimate(options["p"], options["kernel"], options["bwselect"])
+    return {t: (fit["coef"][t], fit["se"][t]) for t in spec["terms"]}
+
+
+def _att(df, params: dict) -> dict:
+    """Average effect on the treated unit-years of this draw."""
+    return {"treated": float(df.loc[df["treated"] == 1, "tau"].mean())}
+
+
+EXPERIMENTS = {
+    "twfe": {
+        "dgp": simulate_did,
+        "fit": _fit_twfe,
+        "truth": _att,
+        "spec": {"formula": "consumption ~ treated + pop + income + unemployment"
+                            " | state_id + year",
+                 "vcov": {"CRV1": "state_id"}, "weights": None, "terms": ["treated"]},
+    },
+    "2sls": {
+        "dgp": simulate_iv,
+        "fit": _fit_iv,
+        "truth": lambda df, params: {"treatment": params.get("effect", iv.EFFECT)},
+        "spec": {"formula": "employment ~ pop + manufacturing | state_id + year"
+                            " | treatment ~ sci",
+                 "vcov": {"CRV1": "state_id"}, "weights": None, "iv": {"estimator": "2sls"},
+                 "terms": ["treatment"]},
+    },
+    "rdd": {
+        "dgp": simulate_rdd,
+        "fit": _fit_rdd,
+        "truth": lambda df, params: dict.fromkeys(
+            ("Conventional", "Robust"), params.get("effect", rdd.EFFECT)),
+        "spec": {"formula": "outcome ~ running", "vcov": "iid", "weights": None,
+                 "rdd": {"cutoff": 0.0, "p": 1, "kernel": "triangular", "bwselect": "mserd"},
+                 "terms": ["Conventional", "Robust"]},
+    },
+}
+
+
+def critical_value(df, spec: dict) -> float:
+    vcov = spec["vcov"]
+    if isinstance(vcov, dict) and "CRV1" in vcov:
+        clusters = df[vcov["CRV1"]].nunique()
+        return float(stats.t.ppf(0.5 + LEVEL / 2, clusters - 1))
+    return float(stats.norm.ppf(0.5 + LEVEL / 2))
+
+
+# ---------------------------------------------------------------------------
+# Running sums
+# ---------------------------------------------------------------------------
+
+class Moments:
+    """Sums over replications of one term's error, squared error, SE and
+    coverage; adding two Moments pools their replications."""
+
+    FIELDS = ("reps", "failed", "truth", "error", "error2", "se", "covered")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, estimate: float, se: float, truth: float, crit: float) -> None:
+        if not (math.isfinite(estimate) and math.isfinite(se)):
+            self.failed += 1
+            return
+        error = estimate - truth
+        self.reps += 1
+        self.truth += truth
+        self.error += error
+        self.error2 += error * error
+        self.se += se
+        self.covered += abs(error) <= crit * se
+
+    def merge(self, other: "Moments") -> "Moments":
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def summary(self) -> dict:
+        r = self.reps
+        if r == 0:
+            return {"reps": 0, "failed": self.failed}
+        bias = self.error / r
+        sd = math.sqrt(max(self.error2 / r - bias ** 2, 0.0) * r / max(r - 1, 1))
+        coverage = self.covered / r
+        return {
+            "reps": r, "failed": self.failed, "truth": self.truth / r,
+            "mean": self.truth / r + bias, "bias": bias, "bias_mcse": sd / math.sqrt(r),
+            "rmse": math.sqrt(self.error2 / r), "sd": sd, "mean_se": self.se / r,
+            "coverage": coverage, "coverage_mcse": math.sqrt(coverage * (1 - coverage) / r),
+        }
+
+
+def run_chunk(name: str, params: dict, seed: int, start: int, stop: int) -> dict:
+    """Moments per term of replications [start, stop) of one experiment."""
+    experiment = EXPERIMENTS[name]
+    spec = experiment["spec"]
+    moments = {term: Moments() for term in spec["terms"]}
+    for r in range(start, stop):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(r,)))
+        df = experiment["dgp"](rng, **params)
+        truth = experiment["truth"](df, params)
+        try:
+            fits = experiment["fit"](df, spec, params)
+        except (ValueError, np.linalg.LinAlgError):
+            for m in moments.values():
+                m.failed += 1
+            continue
+        crit = critical_value(df, spec)
+        for term, (estimate, se) in fits.items():
+            moments[term].add(estimate, se, truth[term], crit)
+    return moments
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def simulate(name: str, reps: int, params: dict | None = None, seed: int = 0,
+             jobs: int | None = 1, chunk: int = 50) -> dict:
+    """Bias, RMSE and coverage per term of ``reps`` replications of ``name``."""
+    if name not in EXPERIMENTS:
+        raise ValueError(f"unknown experiment {name!r}; choose from {sorted(EXPERIMENTS)}")
+    params = params or {}
+    accepted = inspect.signature(EXPERIMENTS[name]["dgp"]).parameters
+    unknown = set(params) - set(accepted) | ({"rng", "units"} & set(params))
+    if unknown:
+        raise ValueError(f"{name}: unknown DGP argument(s) {sorted(unknown)}")
+    start_time = time.perf_counter()
+    ranges = iter([(s, min(s + chunk, reps)) for s in range(0, reps, chunk)])
+    totals = {term: Moments() for term in EXPERIMENTS[name]["spec"]["terms"]}
+
+    def collect(moments: dict) -> None:
+        for term, m in moments.items():
+            totals[term].merge(m)
+
+    cores = os.cpu_count() or 1
+    jobs = min(jobs or cores, -(-reps // chunk)) or 1
+    if jobs == 1:
+        for start, stop in ranges:
+            collect(run_chunk(name, params, seed, start, stop))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with limited_threads(max(1, cores // jobs)), \
+                ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            pending = set()
+            for start, stop in ranges:
+                pending.add(pool.submit(run_chunk, name, params, seed, start, stop))
+                if len(pending) >= 2 * jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+            for future in pending:
+                collect(future.result())
+
+    return {"experiment": name, "params": params, "seed": seed, "reps": reps, "jobs": jobs,
+            "seconds": time.perf_counter() - start_time,
+            "terms": {term: m.summary() for term, m in totals.items()}}
+
+
+def print_summary(result: dict) -> None:
+    params = ", ".join(f"{k}={v}" for k, v in result["params"].items()) or "defaults"
+    print(f"{result['experiment']}: {result['reps']} replications ({params}; "
+          f"seed {result['seed']}, {result['jobs']} job(s), {result['seconds']:.1f}s)")
+    print(f"  {'term':<14}{'truth':>10}{'mean':>10}{'bias':>16}{'rmse':>10}"
+          f"{'sd':>10}{'mean se':>10}{'coverage':>16}")
+    for term, s in result["terms"].items():
+        if not s["reps"]:
+            print(f"  {term:<14}all {s['failed']} replications failed")
+            continue
+        failed = f"  ({s['failed']} failed)" if s["failed"] else ""
+        print(f"  {term:<14}{s['truth']:>10.4f}{s['mean']:>10.4f}"
+              f"{s['bias']:>9.4f} ±{s['bias_mcse']:<5.3f}{s['rmse']:>10.4f}{s['sd']:>10.4f}"
+              f"{s['mean_se']:>10.4f}{s['coverage']:>9.3f} ±{s['coverage_mcse']:<5.3f}{failed}")
+
+
+def _param(text: str) -> tuple[str, object]:
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo bias, RMSE and coverage over the synthetic DGPs")
+    parser.add_argument("experiment", nargs="*", default=list(EXPERIMENTS),
+                        help=f"experiments to run (default: {' '.join(EXPERIMENTS)})")
+    parser.add_argument("-R", "--reps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=50,
+                        help="replications per task sent to a worker")
+    parser.add_argument("--dgp", type=_param, action="append", default=[],
+                        metavar="KEY=VALUE",
+                        help="DGP argument, e.g. n_units=500 or 'effect=[-30,-50,-70]'")
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    args = parser.parse_args(argv)
+    unknown = set(args.experiment) - set(EXPERIMENTS)
+    if unknown:
+        parser.error(f"unknown experiment(s) {sorted(unknown)}; choose from "
+                     f"{', '.join(EXPERIMENTS)}")
+
+    try:
+        results = [simulate(name, args.reps, dict(args.dgp), args.seed, args.jobs, args.chunk)
+                   for name in args.experiment]
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print_summary(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
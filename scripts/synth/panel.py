@@ -0,0 +1,101 @@
+"""
+Firm panel with firm effects and a heteroskedastic AR(1) error (test4-panel).
+
+    productivity = 10 + firm_fe + 0.8 rd_spending + 0.3 capital + 0.2 labor
+                   + 0.1 export_share + e
+
+    e_i1 = s_i eps_i1,   e_it = rho e_i,t-1 + s_i eps_it,   s_i = (size_i / m)^hetero
+
+Firm effects enter rd_spending (Hausman rejects RE), the AR(1) error makes
+the Wooldridge test reject, and the firm-size scale s_i the modified Wald
+test. ``m`` is the population median firm size exp(4), so a firm's draws
+do not depend on the other firms.
+
+Every variable is drawn as one array from a single ``np.random.Generator``
+in a fixed order, so a seed and the panel dimensions fix the output bit for
+bit. The innovations are drawn as a periods x firms block and the AR(1)
+recursion is a loop over periods only, each step updating all firms at once:
+1M firms x 30 years take seconds rather than hours.
+
+``legacy=True`` with ``np.random.RandomState(42)`` rebuilds the original
+``np.random.seed(42)`` script, whose data the committed Stata output
+(tab_panel_main.tex) describes: it scales by the sample median firm size and
+draws the innovations firm by firm, so it needs the whole population.
+"""
+
+import numpy as np
+import pandas as pd
+
+BETA = {"Intercept": 10.0, "rd_spending": 0.8, "capital": 0.3, "labor": 0.2,
+        "export_share": 0.1}
+RHO = 0.5
+HETERO = 0.5  # s_i = sqrt(size_i / median size), as in the original DGP
+FIRM_SIZE = (4.0, 0.8)  # lognormal (mu, sigma)
+
+
+def ar1(innovations: np.ndarray, rho: float) -> np.ndarray:
+    """AR(1) along axis 0 of a periods x units array, in place; the first
+    period is the innovation itself."""
+    for t in range(1, len(innovations)):
+        innovations[t] += rho * innovations[t - 1]
+    return innovations
+
+
+def simulate_panel(rng: np.random.Generator, n_firms: int = 200, first_year: int = 2005,
+                   n_years: int = 15, rho: float = RHO, hetero: float = HETERO,
+                   n_industries: int = 5, units: tuple[int, int] | None = None,
+                   effects: bool = False, legacy: bool = False) -> pd.DataFrame:
+    """One draw of the panel, sorted by firm and year, with ``L_productivity``.
+
+    ``units`` restricts the draw to the 0-based firms [start, stop) of the
+    ``n_firms`` population (see stream.py); ``effects`` adds the true
+    ``firm_fe`` column, which the draws do not depend on; ``legacy`` selects
+    the original draw (see above).
+    """
+    if legacy and units is not None:
+        raise ValueError("the legacy draw needs the whole population; it cannot be streamed")
+    start, stop = units or (0, n_firms)
+    firms = np.arange(start, stop, dtype=np.int32)
+    n_obs = len(firms) * n_years
+
+    # Firm level
+    firm_fe = rng.normal(0, 5, len(firms))
+    firm_size = rng.lognormal(*FIRM_SIZE, len(firms))
+    rd_firm = 2.0 + 0.5 * firm_fe + rng.normal(0, 1, len(firms))
+
+    # Firm-year level, firm-major like the panel rows
+    rd_spending = np.maximum(np.repeat(rd_firm, n_years) + rng.normal(0, 1, n_obs), 0.1)
+    capital = rng.lognormal(3, 0.5, n_obs)
+    labor = rng.lognormal(5, 0.3, n_obs)
+    export_share = rng.beta(2, 5, n_obs)
+
+    if legacy:
+        scale = (firm_size / np.median(firm_size)) ** hetero
+        innovations = rng.standard_normal((len(firms), n_years)).T
+    else:
+        scale = (firm_size / np.exp(FIRM_SIZE[0])) ** hetero
+        innovations = rng.standard_normal((n_years, len(firms)))
+    errors = ar1(innovations * scale, rho)
+
+    productivity = (BETA["Intercept"] + np.repeat(firm_fe, n_years)
+                    + BETA["rd_spending"] * rd_spending + BETA["capital"] * capital
+                    + BETA["labor"] * labor + BETA["export_share"] * export_share
+                    + errors.T.ravel())
+    lagged = np.full((len(firms), n_years), np.nan)
+    lagged[:, 1:] = productivity.reshape(len(firms), n_years)[:, :-1]
+
+    per_industry = -(-n_firms // n_industries)  # contiguous blocks of firms
+    df = pd.DataFrame({
+        "firm_id": np.repeat(firms + 1, n_years),
+        "year": np.tile(np.arange(first_year, first_year + n_years, dtype=np.int16), len(firms)),
+        "industry_id": np.repeat(firms // per_industry + 1, n_years),
+        "productivity": productivity,
+        "rd_spending": rd_spending,
+        "capital": capital,
+        "labor": labor,
+        "export_share": export_share,
+        "L_productivity": lagged.ravel(),
+    }, copy=False)
+    if effects:
+        df["firm_fe"] = np.repeat(firm_fe, n_years)
+    return df
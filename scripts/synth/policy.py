@@ -0,0 +1,56 @@
+"""
+State-year policy panel of the full-pipeline test (test5-full-pipeline).
+
+    consumption = 1000 + 10 (year - first_year) + 0.001 pop + 0.01 income
+                  + state_fe + effect * treated + u,    u ~ N(0, 30)
+
+Consecutive blocks of ``cohort_size`` states adopt in each of ``cohorts``
+(states 1-8 in 2013, 9-16 in 2015, 17-24 in 2017 by default); the remaining
+states are never treated. Values are rounded as in a raw administrative
+extract (integer pop, cents, four-digit unemployment rates).
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .skeleton import Skeleton
+
+COHORTS = (2013, 2015, 2017)
+EFFECT = -50.0
+
+
+def simulate_policy(rng: np.random.Generator, n_states: int = 30, first_year: int = 2010,
+                    n_years: int = 10, cohorts: Sequence[int] = COHORTS,
+                    cohort_size: int = 8, effect: float = EFFECT,
+                    units: tuple[int, int] | None = None) -> pd.DataFrame:
+    """One draw of the panel, sorted by state and year; ``units`` restricts
+    it to the 0-based states [start, stop) of ``n_states`` (see stream.py)."""
+    panel = Skeleton(n_states, 1, first_year, n_years, clusters=units)
+    n_obs = panel.n_obs
+    states = np.arange(panel.start, panel.start + panel.n_clusters)
+    adoption = np.array([*cohorts, 0], dtype=np.int16)
+    treat_year = panel.per_cluster(adoption[np.minimum(states // cohort_size, len(cohorts))])
+    year = panel.period()
+    treated = ((treat_year > 0) & (year >= treat_year)).astype(np.int8)
+
+    pop = np.round(rng.lognormal(12, 0.5, n_obs)).astype(np.int32)
+    income = np.round(rng.normal(50000, 10000, n_obs), 2)
+    unemployment = np.round(rng.beta(2, 20, n_obs), 4)
+    state_fe = panel.per_cluster(rng.normal(0, 50, panel.n_clusters))
+    noise = rng.normal(0, 30, n_obs)
+
+    consumption = np.round(1000 + 10 * (year - first_year) + 0.001 * pop + 0.01 * income
+                           + state_fe + effect * treated + noise, 2)
+    return pd.DataFrame({
+        "state_id": panel.cluster_id(),
+        "state_name": panel.cluster_labels("State_{:02d}"),
+        "year": year,
+        "consumption": consumption,
+        "pop": pop,
+        "income": income,
+        "unemployment": unemployment,
+        "treat_year": treat_year,
+        "treated": treated,
+    }, copy=False)
@@ -0,0 +1,37 @@
+"""
+Sharp regression discontinuity cross-section (test2-rdd).
+
+    outcome = 50 + 0.5 running + 0.1 age + 0.5 education + effect * treat + u
+
+    running ~ N(0, 10),  treat = 1[running >= cutoff],  u ~ N(0, 5)
+
+The true jump at the cutoff is ``effect`` (2.0). Observations are the units.
+"""
+
+import numpy as np
+import pandas as pd
+
+EFFECT = 2.0
+
+
+def simulate_rdd(rng: np.random.Generator, n: int = 5000, cutoff: float = 0.0,
+                 effect: float = EFFECT, units: tuple[int, int] | None = None) -> pd.DataFrame:
+    """One draw of the sample; ``units`` restricts it to the 0-based
+    observations [start, stop) of ``n`` (see stream.py)."""
+    start, stop = units or (0, n)
+    size = stop - start
+    running = rng.normal(0, 10, size)
+    age = rng.normal(40, 10, size)
+    education = rng.normal(12, 3, size)
+    noise = rng.normal(0, 5, size)
+
+    treat = (running >= cutoff).astype(np.int8)
+    outcome = 50 + 0.5 * running + 0.1 * age + 0.5 * education + effect * treat + noise
+    return pd.DataFrame({
+        "id": np.arange(start + 1, stop + 1, dtype=np.int32),
+        "running": running,
+        "treat": treat,
+        "outcome": outcome,
+        "age": age,
+        "education": education,
+    }, copy=False)
@@ -0,0 +1,69 @@
+"""
+Row layout of balanced panels with units nested in clusters.
+
+Rows are sorted by cluster, unit and period, and each cluster holds the
+same number of units (counties in states for test3-iv, one state per
+cluster for test5). Nothing is stored per row until asked for: ids and
+periods are built with ``np.repeat``/``np.tile``, and cluster- or
+unit-level draws are broadcast to rows the same way, which is cheaper than
+merging or mapping ids. String labels come back as a pandas Categorical
+(integer codes plus one label per cluster), so a 5M-row panel carries
+5M small integers instead of 5M Python strings.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def int_type(largest: int) -> type:
+    """Smallest signed integer dtype (at least int16) holding ``largest``."""
+    return np.int16 if largest < 2 ** 15 else np.int32 if largest < 2 ** 31 else np.int64
+
+
+class Skeleton:
+    """Clusters [start, stop) of ``n_clusters``, each with ``units_per_cluster``
+    units observed in periods ``first_period`` .. ``first_period + n_periods - 1``."""
+
+    def __init__(self, n_clusters: int, units_per_cluster: int = 1, first_period: int = 1,
+                 n_periods: int = 1, clusters: tuple[int, int] | None = None):
+        self.start, stop = clusters or (0, n_clusters)
+        self.n_clusters = stop - self.start
+        self.units_per_cluster = units_per_cluster
+        self.n_units = self.n_clusters * units_per_cluster
+        self.first_period = first_period
+        self.n_periods = n_periods
+        self.n_obs = self.n_units * n_periods
+        # dtypes follow the population, so every block of a stream agrees
+        self._unit_type = int_type(n_clusters * units_per_cluster)
+        self._cluster_type = int_type(n_clusters)
+
+    # Ids (1-based, global across blocks) and periods
+    def cluster_id(self) -> np.ndarray:
+        ids = np.arange(self.start + 1, self.start + self.n_clusters + 1,
+                        dtype=self._cluster_type)
+        return self.per_cluster(ids)
+
+    def unit_id(self) -> np.ndarray:
+        first = self.start * self.units_per_cluster + 1
+        ids = np.arange(first, first + self.n_units, dtype=self._unit_type)
+        return self.per_unit(ids)
+
+    def period(self) -> np.ndarray:
+        last = self.first_period + self.n_periods
+        periods = np.arange(self.first_period, last, dtype=int_type(max(last, 1)))
+        return np.tile(periods, self.n_units)
+
+    # Broadcasting draws to rows
+    def per_cluster(self, values: np.ndarray) -> np.ndarray:
+        """Rows of one value per cluster of the block."""
+        return np.repeat(values, self.units_per_cluster * self.n_periods)
+
+    def per_unit(self, values: np.ndarray) -> np.ndarray:
+        """Rows of one value per unit of the block."""
+        return np.repeat(values, self.n_periods)
+
+    def cluster_labels(self, template: str) -> pd.Categorical:
+        """``template.format(id)`` per row, e.g. ``"State_{:02d}"``, as a Categorical."""
+        ids = range(self.start + 1, self.start + self.n_clusters + 1)
+        codes = self.per_cluster(np.arange(self.n_clusters, dtype=np.int32))
+        return pd.Categorical.from_codes(codes, [template.format(i) for i in ids])
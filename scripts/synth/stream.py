@@ -0,0 +1,124 @@
+"""
+Block-wise simulation and incremental writers for datasets larger than memory.
+
+Every DGP of this package takes ``units=(start, stop)`` and then draws only
+those units of its population (firms, states, observations): unit-level
+quantities and ids depend on the global unit index, never on the other
+units. ``simulate_blocks`` cuts the population into blocks of ``block``
+units and gives each block its own generator from
+``SeedSequence(seed).spawn``, so the output is fixed by the seed and the
+block size, blocks never share a stream, and any block can be regenerated
+alone. (The in-memory draw of the test2, test3 and test5 scripts passes
+``np.random.RandomState(seed)`` instead, which reproduces the original
+``np.random.seed`` scripts value for value.)
+
+``write_blocks`` writes each block as soon as it is drawn and keeps at most
+one block in memory:
+
+  *.parquet   one file, one row group per block (needs pyarrow)
+  *.dta       one numbered file per block, ``stem_00001.dta`` ..., since a
+              .dta cannot be appended to; combine in Stata with ``append``
+              (categorical columns are written as strings)
+"""
+
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def blocks(n_units: int, block: int) -> list[tuple[int, int]]:
+    """[start, stop) ranges of at most ``block`` units covering ``n_units``."""
+    if block < 1:
+        raise ValueError(f"block size must be positive, got {block}")
+    return [(start, min(start + block, n_units)) for start in range(0, n_units, block)]
+
+
+def simulate_blocks(simulate: Callable[..., pd.DataFrame], n_units: int, block: int,
+                    seed: int | None, **kwargs) -> Iterator[pd.DataFrame]:
+    """Frames of ``simulate(rng, n_units, units=..., **kwargs)`` block by block."""
+    ranges = blocks(n_units, block)
+    streams = np.random.SeedSequence(seed).spawn(len(ranges))
+    for units, stream in zip(ranges, streams):
+        yield simulate(np.random.default_rng(stream), n_units, units=units, **kwargs)
+
+
+def write_parquet(frames: Iterator[pd.DataFrame], path: str | Path) -> int:
+    """Append each frame to ``path`` as a row group; returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    rows, writer = 0, None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(tmp, path)
+    return rows
+
+
+def write_dta_chunks(frames: Iterator[pd.DataFrame], path: str | Path,
+                     version: int = 118) -> list[Path]:
+    """Write frame k to ``<stem>_<k>.dta`` next to ``path``; returns the files."""
+    path = Path(path)
+    written = []
+    for k, frame in enumerate(frames, start=1):
+        # value labels would be numbered per chunk and clash on append
+        labels = frame.select_dtypes("category").columns
+        frame = frame.astype({column: str for column in labels})
+        chunk = path.with_name(f"{path.stem}_{k:05d}{path.suffix}")
+        frame.to_stata(chunk, write_index=False, version=version)
+        written.append(chunk)
+    return written
+
+
+def write_blocks(frames: Iterator[pd.DataFrame], path: str | Path) -> tuple[int, list[Path]]:
+    """Stream ``frames`` to ``path`` by its suffix; returns (rows, files written)."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return write_parquet(frames, path), [path]
+    if path.suffix == ".dta":
+        rows = 0
+
+        def counted():
+            nonlocal rows
+            for frame in frames:
+                rows += len(frame)
+                yield frame
+
+        files = write_dta_chunks(counted(), path)
+        return rows, files
+    raise ValueError(f"{path}: streaming writes .parquet or .dta files")
+
+
+# ---------------------------------------------------------------------------
+# Generator scripts
+# ---------------------------------------------------------------------------
+
+def add_block_argument(parser) -> None:
+    """The ``--block UNITS`` option shared by the tests/ generator scripts."""
+    parser.add_argument("--block", type=int, metavar="UNITS",
+                        help="stream: draw UNITS units at a time, each block with its own "
+                             "seed stream, and write them incrementally (.parquet, or "
+                             "numbered .dta chunks)")
+
+
+def stream_to(path: str | Path, simulate: Callable[..., pd.DataFrame], n_units: int,
+              block: int, seed: int | None, **kwargs) -> int:
+    """Simulate and write block by block, printing where the data went."""
+    rows, files = write_blocks(simulate_blocks(simulate, n_units, block, seed, **kwargs), path)
+    target = files[0] if len(files) == 1 else f"{files[0]} .. {files[-1].name}"
+    print(f"Streamed {rows} observations ({-(-n_units // block)} blocks of "
+          f"<= {block} units) to: {target}")
+    return rows
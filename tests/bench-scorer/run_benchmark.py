@@ -0,0 +1,318 @@
+"""
+Benchmark: quality_scorer.py on synthetic version directories
+=============================================================
+Generates synthetic vN/ trees of configurable size, scores each one with
+every dimension of scripts/quality_scorer.py, and reports:
+
+    - total and per-dimension latency (median over --repeat runs)
+    - throughput (MB of logs/code scanned per second, files indexed per second)
+    - peak RSS of the scoring process
+
+Each scenario is scored in a fresh worker process so peak RSS is not
+polluted by earlier scenarios. Results can be saved as a JSON baseline and
+later compared against it; regressions beyond --threshold are flagged and
+the script exits with status 1.
+
+Usage:
+    python run_benchmark.py                          # small + medium presets
+    python run_benchmark.py --preset large --save baseline.json
+    python run_benchmark.py --compare baseline.json --threshold 0.25
+    python run_benchmark.py --custom --do-files 200 --log-mb 500 --data-files 50000
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import quality_scorer as qs  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==============================================================================
+# Scenario presets
+# ==============================================================================
+PRESETS = {
+    "small": {"do_files": 6, "log_mb": 1, "n_logs": 3, "tables": 5,
+              "figures": 5, "data_files": 100, "data_depth": 2},
+    "medium": {"do_files": 40, "log_mb": 50, "n_logs": 10, "tables": 60,
+               "figures": 80, "data_files": 5000, "data_depth": 3},
+    "large": {"do_files": 200, "log_mb": 1000, "n_logs": 20, "tables": 300,
+              "figures": 500, "data_files": 50000, "data_depth": 4},
+}
+
+# Regression floor: ignore differences below this many seconds (timer noise)
+MIN_ABS_SECONDS = 0.005
+
+DO_TEMPLATE = """/*==============================================================================
+Project:    Benchmark
+Purpose:    Synthetic analysis script {i}
+==============================================================================*/
+clear all
+set seed 12345
+cap log close
+log using "output/logs/{name}.log", replace
+use "data/clean/panel.dta", clear
+xtset unit_id year
+reghdfe y treated x1 x2, absorb(unit_id year) vce(cluster unit_id)
+csdid y x1, ivar(unit_id) time(year) gvar(first_treat)
+estat pretrend
+ivreghdfe y x1 (treated = z), absorb(unit_id year) first vce(cluster unit_id)
+rdrobust y running, c(0) p(1) bwselect(mserd)
+log close
+"""
+
+LOG_LINES = [
+    ". reghdfe y treated x1 x2, absorb(unit_id year) vce(cluster unit_id)\n",
+    "(MWFE estimator converged in 3 iterations)\n",
+    "HDFE Linear regression                            Number of obs     =     75,000\n",
+    "     treated |  -48.06931   4.045206   -11.88   0.000    -56.19848   -39.94014\n",
+    "  bootstrap replication 1234 of 99999 ......... coef 0.123 se 0.456\n",
+    "Within R-sq.  =     0.9997     F(  4,    49) =   12345.67\n",
+    "Kleibergen-Paap rk Wald F statistic:             5316.123\n",
+]
+
+
+# ==============================================================================
+# Tree generation
+# ==============================================================================
+def generate_tree(base: Path, cfg: dict, seed: int = 42) -> int:
+    """Write a synthetic version directory; return total bytes written."""
+    rng = random.Random(seed)
+    written = 0
+
+    def write(path: Path, data: str | bytes) -> None:
+        nonlocal written
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path.write_bytes(data)
+        written += len(data)
+
+    # Code
+    for i in range(cfg["do_files"]):
+        name = f"{i:02d}_analysis_{i}" if i < 100 else f"analysis_{i}"
+        write(base / "code" / "stata" / f"{name}.do", DO_TEMPLATE.format(i=i, name=name))
+    write(base / "code" / "python" / "01_cross_validate.py",
+          "import pyfixest as pf\n# compare coef diff, PASS if < 0.1%\n")
+
+    # Logs: split log_mb across n_logs files, one error near the end of the last
+    n_logs = max(cfg["n_logs"], 1)
+    per_log = int(cfg["log_mb"] * 1e6 / n_logs)
+    for j in range(n_logs):
+        path = base / "output" / "logs" / f"{j:02d}_analysis.log"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            size = 0
+            block = "".join(rng.choice(LOG_LINES) for _ in range(2000))
+            while size < per_log:
+                fh.write(block)
+                size += len(block)
+            if j == n_logs - 1:
+                fh.write("variable foo not found\nr(111);\n")
+                size += 31
+        written += size
+
+    # Outputs
+    for i in range(cfg["tables"]):
+        write(base / "output" / "tables" / f"tab_{i:04d}.tex",
+              "\\begin{tabular}{lc}\n\\hline\n treated & -48.07 \\\\\n\\end{tabular}\n")
+    for i in range(cfg["figures"]):
+        write(base / "output" / "figures" / f"fig_{i:04d}.pdf", b"%PDF-1.4\n%%EOF\n")
+
+    # Nested data/ tree full of files no dimension ever reads
+    depth = max(cfg["data_depth"], 1)
+    for i in range(cfg["data_files"]):
+        parts = [f"d{(i >> (4 * k)) % 16:x}" for k in range(depth)]
+        write(base / "data" / "clean" / Path(*parts) / f"chunk_{i}.dta", b"\x00" * 64)
+
+    # Docs
+    write(base / "REPLICATION.md",
+          "# Replication\n\nSource: raw data from the benchmark generator.\n" + "x" * 300)
+    write(base / "_VERSION_INFO.md", "# Version info\n\nSynthetic benchmark tree.\n")
+    write(base / "docs" / "data_sources.md", "# Data sources\n")
+    return written
+
+
+# ==============================================================================
+# Measurement (runs in a fresh worker process per scenario)
+# ==============================================================================
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(target: str, repeat: int) -> dict:
+    """Score ``target`` ``repeat`` times; return medians and peak RSS."""
+    walls, index_walls, per_dim = [], [], {}
+    profile = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = qs.score_directory(target, profile=True)
+        walls.append(time.perf_counter() - t0)
+        profile = results["profile"]
+        index_walls.append(profile["index"]["wall_seconds"])
+        for name, t in profile["dimensions"].items():
+            per_dim.setdefault(name, []).append(t["wall_seconds"])
+
+    bytes_read = sum(t["bytes_read"] for t in profile["dimensions"].values())
+    wall = statistics.median(walls)
+    return {
+        "wall_seconds": round(wall, 6),
+        "index_seconds": round(statistics.median(index_walls), 6),
+        "files_indexed": profile["index"]["files_indexed"],
+        "bytes_read": bytes_read,
+        "throughput_mb_s": round(bytes_read / 1e6 / wall, 2) if wall > 0 else None,
+        "files_per_s": round(profile["index"]["files_indexed"] / wall, 1) if wall > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "score": results["total"],
+        "dimensions": {name: round(statistics.median(v), 6) for name, v in per_dim.items()},
+    }
+
+
+def run_scenario(name: str, cfg: dict, workdir: Path, repeat: int) -> dict:
+    target = workdir / name / "v1"
+    if target.exists():
+        shutil.rmtree(target)
+    t0 = time.perf_counter()
+    size = generate_tree(target, cfg)
+    gen_seconds = time.perf_counter() - t0
+    print(f"[{name}] generated {size / 1e6:.1f} MB in {gen_seconds:.1f}s; scoring...",
+          flush=True)
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        result = pool.submit(measure, str(target), repeat).result()
+    result["config"] = cfg
+    result["tree_mb"] = round(size / 1e6, 2)
+    return result
+
+
+# ==============================================================================
+# Reporting and baseline comparison
+# ==============================================================================
+def print_result(name: str, r: dict) -> None:
+    rss = f"{r['peak_rss_mb']:.1f} MB" if r["peak_rss_mb"] is not None else "n/a"
+    print(f"\n=== {name} ({r['tree_mb']} MB tree, {r['files_indexed']} files) ===")
+    print(f"  Total wall:     {r['wall_seconds'] * 1000:10.1f} ms")
+    print(f"  Index walk:     {r['index_seconds'] * 1000:10.1f} ms")
+    print(f"  Throughput:     {r['throughput_mb_s']} MB/s scanned, "
+          f"{r['files_per_s']} files/s indexed")
+    print(f"  Peak RSS:       {rss}")
+    for dim, seconds in r["dimensions"].items():
+        print(f"    {dim:22s} {seconds * 1000:10.1f} ms")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if base.get("config") != cur["config"]:
+            print(f"[{name}] config differs from baseline; skipping comparison")
+            continue
+        pairs = [("wall_seconds", cur["wall_seconds"], base["wall_seconds"])]
+        pairs += [(f"dimensions.{dim}", sec, base["dimensions"].get(dim))
+                  for dim, sec in cur["dimensions"].items()]
+        for metric, now, ref in pairs:
+            if ref is None:
+                continue
+            if now > ref * (1 + threshold) and now - ref > MIN_ABS_SECONDS:
+                regressions.append(f"{name}: {metric} {ref * 1000:.1f} ms -> "
+                                   f"{now * 1000:.1f} ms (+{(now / ref - 1) * 100:.0f}%)")
+        now_rss, ref_rss = cur.get("peak_rss_mb"), base.get("peak_rss_mb")
+        if now_rss and ref_rss and now_rss > ref_rss * (1 + threshold):
+            regressions.append(f"{name}: peak_rss_mb {ref_rss:.1f} -> {now_rss:.1f} "
+                               f"(+{(now_rss / ref_rss - 1) * 100:.0f}%)")
+        if cur["score"] != base.get("score"):
+            regressions.append(f"{name}: score changed {base.get('score')} -> {cur['score']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quality_scorer.py")
+    parser.add_argument("--preset", action="append", choices=sorted(PRESETS),
+                        help="scenario preset (repeatable; default: small, medium)")
+    parser.add_argument("--custom", action="store_true",
+                        help="add a 'custom' scenario built from the size knobs below")
+    parser.add_argument("--do-files", type=int, default=20)
+    parser.add_argument("--log-mb", type=float, default=10)
+    parser.add_argument("--n-logs", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--figures", type=int, default=20)
+    parser.add_argument("--data-files", type=int, default=1000)
+    parser.add_argument("--data-depth", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="scoring runs per scenario (median is reported)")
+    parser.add_argument("--workdir", help="where to generate trees (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep generated trees")
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown flagged as a regression (default 0.2)")
+    args = parser.parse_args()
+
+    scenarios = {name: PRESETS[name] for name in (args.preset or ["small", "medium"])}
+    if args.custom:
+        scenarios["custom"] = {
+            "do_files": args.do_files, "log_mb": args.log_mb, "n_logs": args.n_logs,
+            "tables": args.tables, "figures": args.figures,
+            "data_files": args.data_files, "data_depth": args.data_depth,
+        }
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="bench_scorer_"))
+    report = {
+        "scorer_fingerprint": qs.score_cache_fingerprint(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "scenarios": {},
+    }
+    try:
+        for name, cfg in scenarios.items():
+            result = run_scenario(name, cfg, workdir, args.repeat)
+            report["scenarios"][name] = result
+            print_result(name, result)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        print("\n" + "=" * 60)
+        if regressions:
+            print(f"REGRESSIONS (> {args.threshold:.0%} slower than {args.compare}):")
+            for line in regressions:
+                print(f"  [FAIL] {line}")
+            print("=" * 60)
+            sys.exit(1)
+        print(f"PASS: no regressions beyond {args.threshold:.0%} vs {args.compare}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,84 @@
 """
 Generate synthetic panel data for DID testing
 Mimics apep_0119 structure: state-year panel with staggered treatment
+(DGP in scripts/synth/did.py)
+
+Usage:
+    python generate_synthetic_data.py
+    python generate_synthetic_data.py --legacy-seed   # data of the committed Stata output
+    python generate_synthetic_data.py --units 1000000 --years 10 \
+        --cohorts 2008 2010 2012 --effect -30 -50 -70 --dynamic -5 --effect-sd 10
 """
-import pandas as pd
+import argparse
+import sys
+from pathlib import Path
+
 import numpy as np
 
-np.random.seed(42)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from synth.did import COHORTS, EFFECT, simulate_did
+from synth.stream import add_block_argument, stream_to
 
-# Parameters
-n_states = 50
-years = range(2005, 2020)  # 15 years
-treatment_years = [2010, 2012, 2014, 2016]  # Staggered adoption
 
-# Generate state-level data
-data = []
-for state_id in range(1, n_states + 1):
-    # Assign treatment cohort (or never-treated)
-    if state_id <= 10:
-        treat_year = 2010
-    elif state_id <= 20:
-        treat_year = 2012
-    elif state_id <= 30:
-        treat_year = 2014
-    elif state_id <= 40:
-        treat_year = 2016
-    else:
-        treat_year = 0  # Never treated
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the test1 staggered DID panel.")
+    parser.add_argument("--units", type=int, default=50)
+    parser.add_argument("--years", type=int, default=15)
+    parser.add_argument("--first-year", type=int, default=2005)
+    parser.add_argument("--cohorts", type=int, nargs="+", default=list(COHORTS),
+                        help="adoption years; units split equally, last block never treated")
+    parser.add_argument("--effect", type=float, nargs="+", default=[EFFECT],
+                        help="treatment effect, one value or one per cohort")
+    parser.add_argument("--dynamic", type=float, default=0.0,
+                        help="added effect per period since adoption")
+    parser.add_argument("--effect-sd", type=float, default=0.0,
+                        help="sd of unit-level effect heterogeneity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path,
+                        default=Path(__file__).resolve().parent / "synthetic_panel.dta")
+    parser.add_argument("--legacy-seed", action="store_true",
+                        help="rebuild the original np.random.seed(SEED) draw, which the "
+                             "committed Stata output and crossval.json fallback describe")
+    add_block_argument(parser)
+    args = parser.parse_args(argv)
+    if len(args.effect) not in (1, len(args.cohorts)):
+        parser.error("--effect takes one value or one per cohort")
+    if args.legacy_seed and args.block:
+        parser.error("--legacy-seed draws the whole panel at once; drop --block")
 
-    for year in years:
-        # Treatment indicator
-        treated = 1 if (treat_year > 0 and year >= treat_year) else 0
+    if args.block:
+        stream_to(args.out, simulate_did, args.units, args.block, args.seed,
+                  first_year=args.first_year, n_years=args.years, cohorts=args.cohorts,
+                  effect=args.effect, dynamic=args.dynamic, effect_sd=args.effect_sd)
+        return
 
-        # Time to treatment (for event study)
-        time_to_treat = year - treat_year if treat_year > 0 else np.nan
-
-        # Covariates
-        pop = np.random.lognormal(15, 0.5)  # Population
-        income = np.random.normal(50000, 10000)  # Per capita income
-        unemployment = np.random.beta(2, 8)  # Unemployment rate
+    if args.legacy_seed:
+        rng = np.random.RandomState(args.seed)
+    else:
+        rng = np.random.default_rng(args.seed)
+    df = simulate_did(rng, n_units=args.units, first_year=args.first_year, n_years=args.years,
+                      cohorts=args.cohorts, effect=args.effect, dynamic=args.dynamic,
+                      effect_sd=args.effect_sd, legacy=args.legacy_seed)
 
-        # Outcome: electricity consumption (with treatment effect)
-        base_consumption = 1000 + 10 * (year - 2005) + 0.001 * pop + 0.01 * income
-        treatment_effect = -50 * treated if treated else 0  # 50 unit reduction
-        noise = np.random.normal(0, 30)
-        consumption = base_consumption + treatment_effect + noise
+    # Save as Stata .dta
+    df.to_stata(args.out, write_index=False)
+    print(f"Generated synthetic panel: {len(df)} observations")
+    print(f"States: {args.units}, Years: {args.first_year}-{args.first_year + args.years - 1}")
+    cohorts = df.groupby("state_id")["treat_year"].first()
+    print(f"Treated states: {(cohorts > 0).sum()}")
+    print(f"Never-treated states: {(cohorts == 0).sum()}")
 
-        data.append({
-            'state_id': state_id,
-            'year': year,
-            'treat_year': treat_year,
-            'treated': treated,
-            'time_to_treat': time_to_treat,
-            'consumption': consumption,
-            'pop': pop,
-            'income': income,
-            'unemployment': unemployment
-        })
+    # Summary statistics
+    print("\n=== Treatment Adoption ===")
+    print(cohorts[cohorts > 0].value_counts().sort_index())
 
-df = pd.DataFrame(data)
+    print("\n=== True ATT by Cohort (treated unit-years) ===")
+    print(df[df["treated"] == 1].groupby("treat_year")["tau"].mean())
 
-# Save as Stata .dta
-df.to_stata('synthetic_panel.dta', write_index=False)
-print(f"Generated synthetic panel: {len(df)} observations")
-print(f"States: {n_states}, Years: {min(years)}-{max(years)}")
-print(f"Treated states: {len(df[df['treat_year'] > 0]['state_id'].unique())}")
-print(f"Never-treated states: {len(df[df['treat_year'] == 0]['state_id'].unique())}")
+    if args.years <= 30:
+        print("\n=== Mean Consumption by Treatment Status ===")
+        print(df.groupby(["year", "treated"])["consumption"].mean().unstack())
 
-# Summary statistics
-print("\n=== Treatment Adoption ===")
-print(df[df['treat_year'] > 0][['state_id', 'treat_year']].drop_duplicates()['treat_year'].value_counts().sort_index())
 
-print("\n=== Mean Consumption by Treatment Status ===")
-summary = df.groupby(['year', 'treated'])['consumption'].mean().unstack()
-print(summary)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Cross-validate the test2 rdrobust estimates against Stata, as listed in crossval.json."""
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[1] / "scripts"))
+
+from crossval import main
+
+if __name__ == "__main__":
+    sys.exit(main([str(HERE / "crossval.json"), *sys.argv[1:]]))
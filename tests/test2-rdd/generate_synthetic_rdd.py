@@ -1,53 +1,55 @@
 """
 Generate synthetic RDD data
 Mimics apep_0439 structure: running variable with cutoff at 0
+(DGP in scripts/synth/rdd.py; true effect +2.0 at the cutoff)
+
+Usage:
+    python generate_synthetic_rdd.py
+    python generate_synthetic_rdd.py --n 50000000 --block 5000000 --out /tmp/rdd.parquet
 """
-import pandas as pd
+import argparse
+import sys
+from pathlib import Path
+
 import numpy as np
 
-np.random.seed(42)
-
-# Parameters
-n = 5000
-cutoff = 0
-
-# Generate running variable (centered at cutoff)
-# Mix of values below and above cutoff
-running = np.random.normal(0, 10, n)
-
-# Treatment: 1 if running >= cutoff
-treat = (running >= cutoff).astype(int)
-
-# Generate covariates
-age = np.random.normal(40, 10, n)
-education = np.random.normal(12, 3, n)
-
-# Outcome with RDD effect
-# Base: linear in running var + covariates
-# Treatment effect: +2 units jump at cutoff
-base_outcome = 50 + 0.5 * running + 0.1 * age + 0.5 * education
-treatment_effect = 2.0 * treat  # True effect = 2.0
-noise = np.random.normal(0, 5, n)
-outcome = base_outcome + treatment_effect + noise
-
-# Create DataFrame
-df = pd.DataFrame({
-    'id': range(1, n + 1),
-    'running': running,
-    'treat': treat,
-    'outcome': outcome,
-    'age': age,
-    'education': education
-})
-
-# Save as Stata .dta
-df.to_stata('synthetic_rdd.dta', write_index=False)
-
-print(f"Generated synthetic RDD data: {n} observations")
-print(f"Cutoff: {cutoff}")
-print(f"Below cutoff: {sum(running < cutoff)}")
-print(f"Above cutoff: {sum(running >= cutoff)}")
-print(f"\n=== Outcome by treatment status ===")
-print(df.groupby('treat')['outcome'].agg(['mean', 'std', 'count']))
-print(f"\n=== Running variable stats ===")
-print(df['running'].describe())
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from synth.rdd import EFFECT, simulate_rdd
+from synth.stream import add_block_argument, stream_to
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the test2 RDD sample.")
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--cutoff", type=float, default=0.0)
+    parser.add_argument("--effect", type=float, default=EFFECT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path,
+                        default=Path(__file__).resolve().parent / "synthetic_rdd.dta")
+    add_block_argument(parser)
+    args = parser.parse_args(argv)
+
+    if args.block:
+        stream_to(args.out, simulate_rdd, args.n, args.block, args.seed,
+                  cutoff=args.cutoff, effect=args.effect)
+        return
+
+    # RandomState keeps the np.random.seed draw behind the committed Stata output
+    df = simulate_rdd(np.random.RandomState(args.seed), args.n, cutoff=args.cutoff,
+                      effect=args.effect)
+
+    # Save as Stata .dta
+    df.to_stata(args.out, write_index=False)
+
+    print(f"Generated synthetic RDD data: {args.n} observations")
+    print(f"Cutoff: {args.cutoff}")
+    print(f"Below cutoff: {(df['treat'] == 0).sum()}")
+    print(f"Above cutoff: {(df['treat'] == 1).sum()}")
+    print(f"\n=== Outcome by treatment status ===")
+    print(df.groupby('treat')['outcome'].agg(['mean', 'std', 'count']))
+    print(f"\n=== Running variable stats ===")
+    print(df['running'].describe())
+
+
+if __name__ == "__main__":
+    main()